@@ -0,0 +1,238 @@
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+from kubernetes import client
+
+# Synthetic cluster served through the same list/delete/patch methods the
+# bot calls on CoreV1Api, BatchV1Api and AppsV1Api. Objects are real
+# kubernetes client models so the monitors see exactly what the API returns.
+
+GPU_MODELS = ["NVIDIA-A100-SXM4-80GB", "NVIDIA-GeForce-RTX-3090", "NVIDIA-A10", "Tesla-T4"]
+
+class ListResult:
+    """Minimal V1*List stand-in: `items` plus `metadata._continue` / `resource_version`."""
+
+    def __init__(self, items, continueToken=None, resourceVersion="1"):
+        self.items = items
+        self.metadata = client.V1ListMeta(_continue=continueToken, resource_version=resourceVersion)
+
+def ownerReference(kind, obj):
+    return client.V1OwnerReference(
+        api_version="apps/v1" if kind in ("Deployment", "ReplicaSet") else "batch/v1",
+        kind=kind, name=obj.metadata.name, uid=obj.metadata.uid, controller=True,
+    )
+
+def metadata(rng, namespace, name, ageDays, owners=None, labels=None):
+    return client.V1ObjectMeta(
+        name=name,
+        namespace=namespace,
+        uid=str(uuid.UUID(int=rng.getrandbits(128))),
+        labels=labels or {"app": name},
+        owner_references=owners,
+        creation_timestamp=datetime.now(timezone.utc) - timedelta(days=ageDays, hours=rng.random()),
+        resource_version=str(rng.randint(1, 10**6)),
+    )
+
+def podSpec(rng, gpus):
+    requests = {"cpu": rng.choice(["500m", "1", "2", "4"]), "memory": rng.choice(["512Mi", "2Gi", "8Gi", "16Gi"])}
+    if gpus:
+        requests["nvidia.com/gpu"] = str(gpus)
+    return client.V1PodSpec(containers=[
+        client.V1Container(name="main", image="registry.example/lab/train:latest",
+                           resources=client.V1ResourceRequirements(requests=requests))
+    ])
+
+class FakeCluster:
+    """N namespaces, each with M deployments (-> ReplicaSet -> pods), jobs (-> pod) and bare pods.
+
+    Ages, GPU requests, failures and utilization are drawn from a seeded RNG
+    so every violation rule fires for some share of the objects and runs are
+    reproducible.
+    """
+
+    def __init__(self, namespaces=10, deploymentsPerNamespace=5, jobsPerNamespace=5, barePodsPerNamespace=5,
+                 replicas=2, seed=1234):
+        rng = random.Random(seed)
+        self.namespaces = [f"bench-ns-{index:04d}" for index in range(namespaces)]
+        self.pods, self.jobs, self.deployments, self.replicaSets = {}, {}, {}, {}
+        self.utilization = {}
+        self.deleted = []
+        self.patched = []
+
+        for namespace in self.namespaces:
+            pods, jobs, deployments, replicaSets = [], [], [], []
+            for index in range(deploymentsPerNamespace):
+                name = f"deploy-{index}"
+                deployment = client.V1Deployment(
+                    metadata=metadata(rng, namespace, name, rng.randint(0, 20)),
+                    spec=client.V1DeploymentSpec(
+                        replicas=replicas,
+                        selector=client.V1LabelSelector(match_labels={"app": name}),
+                        template=client.V1PodTemplateSpec(spec=podSpec(rng, 0)),
+                    ),
+                    status=client.V1DeploymentStatus(ready_replicas=replicas),
+                )
+                replicaSet = client.V1ReplicaSet(metadata=metadata(
+                    rng, namespace, f"{name}-{rng.getrandbits(32):08x}", rng.randint(0, 20),
+                    owners=[ownerReference("Deployment", deployment)],
+                ))
+                deployments.append(deployment)
+                replicaSets.append(replicaSet)
+                for replica in range(replicas):
+                    pods.append(self.makePod(rng, namespace, f"{replicaSet.metadata.name}-{replica}", [ownerReference("ReplicaSet", replicaSet)]))
+
+            for index in range(jobsPerNamespace):
+                failed = rng.random() < 0.2
+                succeeded = not failed and rng.random() < 0.5
+                job = client.V1Job(
+                    metadata=metadata(rng, namespace, f"job-{index}", rng.randint(0, 20)),
+                    status=client.V1JobStatus(
+                        failed=rng.randint(1, 4) if failed else None,
+                        succeeded=1 if succeeded else None,
+                        conditions=None if succeeded and rng.random() < 0.5 else [
+                            client.V1JobCondition(type="Failed" if failed else "Complete", status="True")
+                        ],
+                    ),
+                )
+                jobs.append(job)
+                pods.append(self.makePod(rng, namespace, f"job-{index}-{rng.getrandbits(20):05x}", [ownerReference("Job", job)]))
+
+            for index in range(barePodsPerNamespace):
+                pods.append(self.makePod(rng, namespace, f"pod-{index}", None))
+
+            self.pods[namespace] = pods
+            self.jobs[namespace] = jobs
+            self.deployments[namespace] = deployments
+            self.replicaSets[namespace] = replicaSets
+
+    def makePod(self, rng, namespace, name, owners):
+        gpus = rng.choice([0, 0, 0, 1, 2, 4])
+        pod = client.V1Pod(
+            metadata=metadata(rng, namespace, name, rng.randint(0, 20), owners=owners),
+            spec=podSpec(rng, gpus),
+            status=client.V1PodStatus(
+                phase="Running" if rng.random() < 0.95 else "Pending",
+                start_time=datetime.now(timezone.utc) - timedelta(days=rng.randint(0, 20)),
+            ),
+        )
+        # Roughly a third of the pods idle below the underutilization thresholds
+        idle = rng.random() < 0.33
+        self.utilization.setdefault(namespace, {})[name] = {
+            "cpu": f"{rng.randint(1, 40) if idle else rng.randint(200, 3000)}m",
+            "memory": f"{rng.randint(10, 40) if idle else rng.randint(500, 12000)}Mi",
+            "gpus": gpus,
+            "gpuUtilization": rng.uniform(0, 8) if idle else rng.uniform(20, 100),
+            "model": rng.choice(GPU_MODELS),
+        }
+        return pod
+
+    def counts(self):
+        return {
+            "namespaces": len(self.namespaces),
+            "pods": sum(len(pods) for pods in self.pods.values()),
+            "jobs": sum(len(jobs) for jobs in self.jobs.values()),
+            "deployments": sum(len(deployments) for deployments in self.deployments.values()),
+        }
+
+    # GPU metrics in the shape returned by scrapeGpuMetrics / queryGpuMetrics
+
+    def gpuMetrics(self, namespaces):
+        results = {}
+        for namespace in namespaces:
+            rows = [
+                {
+                    "model": usage["model"],
+                    "podName": podName,
+                    "gpuRequested": str(usage["gpus"]),
+                    "gpuUtilizationPercentage": f"{usage['gpuUtilization']:.1f}%",
+                }
+                for podName, usage in self.utilization.get(namespace, {}).items()
+                if usage["gpus"]
+            ]
+            results[namespace] = {"gpuMetrics": rows, "currentGpuUsage": "42.0%"} if rows else {"message": "No monitored instances to scrape"}
+        return results
+
+    def grafanaHtml(self, namespace):
+        """Render a namespace the way the Grafana GPU dashboard table does, for extractMetrics."""
+        cell = '<div class="css-cellContainerOverflow">{}</div>'
+        rows = "".join(
+            f'<div class="css-8fjwhi-row">{cell.format(row["model"])}{cell.format(row["podName"])}'
+            f'{cell.format(row["gpuRequested"])}{cell.format(row["gpuUtilizationPercentage"])}</div>'
+            for row in self.gpuMetrics([namespace])[namespace].get("gpuMetrics", [])
+        )
+        return f'<html><body><div class="panel"><span id="flotGaugeValue">42.0%</span></div><div class="table">{rows}</div></body></html>'
+
+class FakeUtilizationProvider:
+    """Utilization provider serving the cluster's synthetic per-pod usage."""
+
+    def __init__(self, cluster):
+        self.cluster = cluster
+
+    def getNamespaceUtilization(self, namespace):
+        return {
+            podName: {"cpu": usage["cpu"], "memory": usage["memory"], "containers": {"main": {"cpu": usage["cpu"], "memory": usage["memory"]}}}
+            for podName, usage in self.cluster.utilization.get(namespace, {}).items()
+        }
+
+def matches(obj, field_selector=None, label_selector=None):
+    if field_selector == "status.phase=Running" and obj.status.phase != "Running":
+        return False
+    if label_selector and label_selector.startswith("!") and label_selector[1:] in (obj.metadata.labels or {}):
+        return False
+    return True
+
+def page(items, limit=None, _continue=None, field_selector=None, label_selector=None, **kwargs):
+    items = [obj for obj in items if matches(obj, field_selector, label_selector)]
+    start = int(_continue or 0)
+    if not limit:
+        return ListResult(items[start:])
+    end = start + limit
+    return ListResult(items[start:end], str(end) if end < len(items) else None)
+
+class FakeCoreV1Api:
+    def __init__(self, cluster):
+        self.cluster = cluster
+
+    def list_namespace(self, label_selector=None, **kwargs):
+        return ListResult([client.V1Namespace(metadata=client.V1ObjectMeta(name=name)) for name in self.cluster.namespaces])
+
+    def list_namespaced_pod(self, namespace, **kwargs):
+        return page(self.cluster.pods.get(namespace, []), **kwargs)
+
+    def list_pod_for_all_namespaces(self, **kwargs):
+        return page([pod for pods in self.cluster.pods.values() for pod in pods], **kwargs)
+
+    def delete_namespaced_pod(self, name, namespace, **kwargs):
+        self.cluster.deleted.append(("Pod", namespace, name))
+
+class FakeBatchV1Api:
+    def __init__(self, cluster):
+        self.cluster = cluster
+
+    def list_namespaced_job(self, namespace, **kwargs):
+        return page(self.cluster.jobs.get(namespace, []), **kwargs)
+
+    def list_job_for_all_namespaces(self, **kwargs):
+        return page([job for jobs in self.cluster.jobs.values() for job in jobs], **kwargs)
+
+    def delete_namespaced_job(self, name, namespace, **kwargs):
+        self.cluster.deleted.append(("Job", namespace, name))
+
+class FakeAppsV1Api:
+    def __init__(self, cluster):
+        self.cluster = cluster
+
+    def list_namespaced_deployment(self, namespace, **kwargs):
+        return page(self.cluster.deployments.get(namespace, []), **kwargs)
+
+    def list_deployment_for_all_namespaces(self, **kwargs):
+        return page([deployment for deployments in self.cluster.deployments.values() for deployment in deployments], **kwargs)
+
+    def list_namespaced_replica_set(self, namespace, **kwargs):
+        return page(self.cluster.replicaSets.get(namespace, []), **kwargs)
+
+    def delete_namespaced_deployment(self, name, namespace, **kwargs):
+        self.cluster.deleted.append(("Deployment", namespace, name))
+
+    def patch_namespaced_deployment(self, name, namespace, body, **kwargs):
+        self.cluster.patched.append(("Deployment", namespace, name, body))
@@ -0,0 +1,229 @@
+"""Benchmark the bot end to end and per stage against a synthetic cluster.
+
+    python -m benchmarks.run                        # compare against benchmarks/baselines.json
+    python -m benchmarks.run --update-baseline      # record new baselines
+    python -m benchmarks.run --scales small --repeat 5
+
+Everything runs in a temporary working directory, so the logs, events,
+violation store and reports of the benchmark never touch the real ones.
+Exits with status 1 when a benchmark is slower than its baseline by more
+than the threshold, and refuses to run without a baseline to compare
+against: a benchmark without one is reported as an error rather than
+silently passing.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "baselines.json")
+
+# namespaces, deployments/jobs/bare pods per namespace (pods = deployments * 2 + jobs + bare pods)
+SCALES = {
+    "small": {"namespaces": 3, "deploymentsPerNamespace": 5, "jobsPerNamespace": 5, "barePodsPerNamespace": 5},
+    "medium": {"namespaces": 25, "deploymentsPerNamespace": 10, "jobsPerNamespace": 10, "barePodsPerNamespace": 10},
+    "large": {"namespaces": 100, "deploymentsPerNamespace": 20, "jobsPerNamespace": 20, "barePodsPerNamespace": 20},
+}
+
+# Seconds below which differences are treated as noise, whatever the threshold
+NOISE_FLOOR_SECONDS = 0.005
+
+def prepareEnvironment(workdir):
+    """Point every relative path at `workdir` and lift the cleanup rate limit before the bot's modules load."""
+    os.chdir(workdir)
+    os.environ["NAUTILUS_ENFORCEMENT_RATE_PER_SECOND"] = "1000000"
+    os.environ.setdefault("NAUTILUS_LIST_CLUSTER_WIDE_MIN_NAMESPACES", "20")
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+def installFakes(cluster):
+    """Route every API client factory, the GPU backend and the utilization source to the synthetic cluster."""
+    import main
+    import monitors.deploymentMonitor
+    import monitors.jobMonitor
+    import monitors.podMonitor
+    import utils.cleanResources
+    import utils.kubeClient
+    import utils.ownerIndex
+    import utils.pipeline
+    from benchmarks.fakeCluster import FakeCoreV1Api, FakeBatchV1Api, FakeAppsV1Api, FakeUtilizationProvider
+    from utils.utilizationProvider import setUtilizationProvider
+
+    factories = {
+        "coreV1Api": lambda: FakeCoreV1Api(cluster),
+        "batchV1Api": lambda: FakeBatchV1Api(cluster),
+        "appsV1Api": lambda: FakeAppsV1Api(cluster),
+    }
+    for module in (utils.kubeClient, utils.pipeline, utils.ownerIndex, utils.cleanResources,
+                   monitors.podMonitor, monitors.jobMonitor, monitors.deploymentMonitor):
+        for name, factory in factories.items():
+            if hasattr(module, name):
+                setattr(module, name, factory)
+    utils.pipeline.fetchGpuMetrics = cluster.gpuMetrics
+    main.resolveNamespaces = lambda: list(cluster.namespaces)
+    setUtilizationProvider(FakeUtilizationProvider(cluster))
+
+def seedWeek(cluster):
+    """Write a week of violation events and store rows, one run per day, from the cluster's own findings."""
+    from monitors.podMonitor import monitorPods
+    from monitors.jobMonitor import monitorJobs
+    from monitors.deploymentMonitor import monitorDeployments
+    from utils.violationEvents import buildViolationEvents, eventFilePath
+    from utils.violationStore import getViolationStore
+
+    resources = monitorPods(cluster.namespaces, cluster.gpuMetrics(cluster.namespaces)) + monitorJobs(cluster.namespaces) + monitorDeployments(cluster.namespaces)
+    store = getViolationStore()
+    records = [(resource["uid"], resource["namespace"], resource["name"], resource["violations"]) for resource in resources if resource["violations"]]
+    now = datetime.utcnow()
+    for daysAgo in range(6, -1, -1):
+        day = now - timedelta(days=daysAgo)
+        timestamp = day.isoformat()
+        os.makedirs(os.path.dirname(eventFilePath(day.date())), exist_ok=True)
+        with open(eventFilePath(day.date()), "a") as eventFile:
+            for resource in resources:
+                for event in buildViolationEvents(resource, timestamp):
+                    eventFile.write(json.dumps(event, separators=(",", ":")) + "\n")
+        store.recordViolations(records, timestamp=timestamp)
+    return sum(len(resource["violations"]) for resource in resources)
+
+def resetAggregates():
+    from utils.config import AGGREGATES_FILE
+    if os.path.exists(AGGREGATES_FILE):
+        os.remove(AGGREGATES_FILE)
+
+def benchmarksFor(cluster):
+    """(name, setup, func) for every benchmark; `setup` runs untimed before each repeat."""
+    import main
+    from monitors.podMonitor import monitorPods
+    from monitors.jobMonitor import monitorJobs
+    from monitors.deploymentMonitor import monitorDeployments
+    from utils.cleanResources import main as cleanResourcesMain
+    from utils.generateReport import generateWeeklyReport
+    from utils.scrapeGrafana import extractMetrics
+
+    gpuMetrics = cluster.gpuMetrics(cluster.namespaces)
+    pages = [cluster.grafanaHtml(namespace) for namespace in cluster.namespaces]
+    return [
+        ("grafana.extractMetrics", None, lambda: [extractMetrics(page) for page in pages]),
+        ("monitorPods", None, lambda: monitorPods(cluster.namespaces, gpuMetrics)),
+        ("monitorJobs", None, lambda: monitorJobs(cluster.namespaces)),
+        ("monitorDeployments", None, lambda: monitorDeployments(cluster.namespaces)),
+        ("main.main", None, lambda: main.main(shards=0)),
+        ("generateWeeklyReport", None, generateWeeklyReport),
+        ("cleanResources.main", resetAggregates, lambda: cleanResourcesMain()),
+    ]
+
+def timeBenchmark(setup, func, repeat):
+    """Run once untimed to warm caches and pools, then time `repeat` runs."""
+    samples = []
+    for run in range(repeat + 1):
+        if setup:
+            setup()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            func()
+            if run:
+                samples.append(time.perf_counter() - start)
+    return {"minSeconds": min(samples), "medianSeconds": statistics.median(samples), "repeat": repeat}
+
+def compare(results, baselines, threshold):
+    """Return the benchmarks slower than baseline * (1 + threshold).
+
+    Best-of-N times are compared: they are far less sensitive to other load
+    on the machine than medians.
+    """
+    regressions = []
+    for key, result in results.items():
+        baseline = baselines.get(key)
+        if baseline is None:
+            continue
+        limit = baseline["minSeconds"] * (1 + threshold)
+        if result["minSeconds"] > limit and result["minSeconds"] - baseline["minSeconds"] > NOISE_FLOOR_SECONDS:
+            regressions.append(key)
+    return regressions
+
+def formatTable(results, baselines, regressions):
+    lines = [f"{'benchmark':<40} {'best':>10} {'median':>10} {'baseline':>10} {'change':>8}"]
+    for key, result in results.items():
+        baseline = baselines.get(key, {}).get("minSeconds")
+        change = f"{(result['minSeconds'] / baseline - 1) * 100:+.0f}%" if baseline else "new"
+        marker = "  REGRESSION" if key in regressions else ""
+        baselineText = f"{baseline * 1000:.1f}ms" if baseline else "-"
+        lines.append(f"{key:<40} {result['minSeconds'] * 1000:>8.1f}ms {result['medianSeconds'] * 1000:>8.1f}ms "
+                     f"{baselineText:>10} {change:>8}{marker}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bot against a synthetic cluster.")
+    parser.add_argument("--scales", default="small,medium", help=f"Comma-separated scales ({', '.join(SCALES)}).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per benchmark; the best time is compared.")
+    parser.add_argument("--only", help="Comma-separated benchmark names to run.")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline file to compare against.")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run's results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed slowdown before a benchmark counts as a regression.")
+    parser.add_argument("--output", help="Also write the results as JSON to this file.")
+    args = parser.parse_args()
+
+    baselinePath = os.path.abspath(args.baseline)
+    outputPath = os.path.abspath(args.output) if args.output else None
+    baselines = {}
+    if os.path.exists(baselinePath):
+        with open(baselinePath, "r") as file:
+            baselines = json.load(file)["results"]
+    elif not args.update_baseline:
+        parser.error(f"baseline file {baselinePath} does not exist; record one with --update-baseline")
+
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="nautilus-bench-") as workdir:
+        prepareEnvironment(workdir)
+        from benchmarks.fakeCluster import FakeCluster
+        from utils.logger import logWriter
+
+        # Keep the daily log file handler (its cost is part of a run) but not the console flood
+        logWriter.handlers = [handler for handler in logWriter.handlers if not isinstance(handler, logging.StreamHandler)]
+
+        only = set(args.only.split(",")) if args.only else None
+        for scale in args.scales.split(","):
+            start = time.perf_counter()
+            cluster = FakeCluster(**SCALES[scale])
+            installFakes(cluster)
+            violations = seedWeek(cluster)
+            print(f"[{scale}] {cluster.counts()} generated and a week of {violations} violations/day seeded "
+                  f"in {time.perf_counter() - start:.1f}s")
+
+            for name, setup, func in benchmarksFor(cluster):
+                if only and name not in only:
+                    continue
+                results[f"{scale}/{name}"] = timeBenchmark(setup, func, args.repeat)
+                print(f"  {name:<30} {results[f'{scale}/{name}']['minSeconds'] * 1000:>9.1f}ms")
+
+    regressions = compare(results, baselines, args.threshold)
+    print()
+    print(formatTable(results, baselines, regressions))
+
+    document = {"python": sys.version.split()[0], "recordedAt": datetime.utcnow().isoformat(), "results": results}
+    if outputPath:
+        with open(outputPath, "w") as file:
+            json.dump(document, file, indent=2)
+    if args.update_baseline:
+        with open(baselinePath, "w") as file:
+            json.dump({**document, "results": {**baselines, **results}}, file, indent=2)
+        print(f"\nBaseline updated: {baselinePath}")
+        return 0
+    missing = [key for key in results if key not in baselines]
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+    if missing:
+        print(f"\n{len(missing)} benchmark(s) without a baseline in {baselinePath}: {', '.join(missing)}; "
+              f"record them with --update-baseline")
+    return 1 if regressions or missing else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,10 @@
-from utils.resourceUtil import parseCpu, parseMemory
-from utils.logger import logger
+from checks.ruleEngine import evaluateRules, toColumn
+from utils.tracing import traced
 
-def checkDeploymentViolations(deployment, deploymentAge):
-    """Check violations for a deployment."""
-    violations = []
-    
-    # Age Check
-    if deploymentAge > 12:
-        message = "Deployment approaching 2 weeks age. Address this soon."
-        # logger.critical(f"Critical Violation for Deployment '{job.metadata.name}' in '{job.metadata.namespace}': {message}")
-        violations.append(message)
-    
-    # Replicas Check
-    if deployment.status.ready_replicas == 0:
-        message = "Deployment has no ready replicas"
-        # logger.warning(f"Warning for Deployment '{job.metadata.name}' in '{job.metadata.namespace}': {message}")
-    
-    return violations
+@traced("deployment checks", "checks")
+def checkNamespaceDeploymentViolations(deployments, deploymentAges):
+    """Check violations for every deployment of a namespace at once."""
+    columns = {
+        "ageDays": toColumn([age if isinstance(age, int) else None for age in deploymentAges]),
+    }
+    return evaluateRules("Deployment", columns, len(deployments))
@@ -1,25 +1,12 @@
-from utils.logger import logger
+from checks.ruleEngine import evaluateRules, toColumn
+from utils.tracing import traced
 
-def checkJobViolations(job, jobAge):
-    """Check violations for a job."""
-    violations = []
-    
-    # Age Check
-    if jobAge > 12:
-        message = "Job approaching 2 weeks age. Address this soon."
-        # logger.critical(f"Critical Violation for Job '{job.metadata.name}' in '{job.metadata.namespace}': {message}")
-        violations.append(message)
-    
-    # Failed Status Check
-    if job.status.failed:
-        message = f"Job failed {job.status.failed} times"
-        # logger.warning(f"Warning for Job '{job.metadata.name}' in '{job.metadata.namespace}': {message}")
-        violations.append(message)
-    
-    # Cleanup Check
-    if job.status.succeeded and not job.status.conditions:
-        message = "Job succeeded but not cleaned up"
-        # logger.warning(f"Warning for Job '{job.metadata.name}' in '{job.metadata.namespace}': {message}")
-        violations.append(message)
-    
-    return violations
+@traced("job checks", "checks")
+def checkNamespaceJobViolations(jobs, jobAges):
+    """Check violations for every job of a namespace at once."""
+    columns = {
+        "ageDays": toColumn([age if isinstance(age, int) else None for age in jobAges]),
+        "failed": toColumn([job.status.failed or 0 for job in jobs]),
+        "succeededWithoutConditions": toColumn([int(bool(job.status.succeeded and not job.status.conditions)) for job in jobs]),
+    }
+    return evaluateRules("Job", columns, len(jobs))
@@ -1,42 +1,43 @@
+import numpy as np
+from checks.ruleEngine import evaluateRules, toColumn
 from utils.resourceUtil import parseCpu, parseMemory
-from utils.logger import logger
+from utils.tracing import traced
 
-def checkPodViolations(pod, podAge, requestedResources, utilizedResources):
-    """Check violations for a pod."""
-    violations = []
-    
-    # GPU Check: Requesting more than 2 GPUs
-    if "nvidia.com/gpu" in requestedResources:
-        requestedGpus = int(requestedResources["nvidia.com/gpu"])
-        if requestedGpus > 2:
-            message = f"Requested GPUs exceed 2 (requested: {requestedGpus})"
-            # logger.critical(f"Critical Violation for Pod '{pod.metadata.name}' in '{pod.metadata.namespace}': {message}")
-            violations.append(message)
+def percentOfRequested(used, requested):
+    """Usage as a percentage of the request, NaN where either side is missing."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(requested > 0, used / requested * 100, np.nan)
 
-    # GPU Checks
-    if "gpuUtilizationPercentage" in utilizedResources:
-        gpuUtilizationPercentage = float(utilizedResources["gpuUtilizationPercentage"].replace("%", ""))
-        if gpuUtilizationPercentage < 10: 
-            message = "GPU underutilized (<10% of capacity)"
-            # logger.warning(f"Warning for Pod '{pod.metadata.name}' in '{pod.metadata.namespace}': {message}")
-            violations.append(message)
+def podColumns(requestedResourcesList, utilizedResourcesList, podUids=None, history=None):
+    """Build columnar arrays of requested/used CPU, memory and GPU for a namespace.
 
-    # CPU Checks
-    if "cpu" in requestedResources and "cpu" in utilizedResources:
-        requestedCpu = parseCpu(requestedResources["cpu"])
-        utilizedCpu = parseCpu(utilizedResources["cpu"])
-        if utilizedCpu < 0.1 * requestedCpu:
-            message = "CPU underutilized (<10% of requested)"
-            # logger.warning(f"Warning for Pod '{pod.metadata.name}' in '{pod.metadata.namespace}': {message}")
-            violations.append(message)
+    With a utilization `history`, the current samples are recorded and the
+    usage columns become means over the history window instead of the
+    instant reading, so one quiet scrape does not flag a busy pod.
+    """
+    def quantities(resourcesList, key, parse):
+        return toColumn([parse(resources[key]) if key in resources else None for resources in resourcesList])
 
-    # Memory Checks
-    if "memory" in requestedResources and "memory" in utilizedResources:
-        requestedMemory = parseMemory(requestedResources["memory"])
-        utilizedMemory = parseMemory(utilizedResources["memory"])
-        if utilizedMemory < 0.1 * requestedMemory:
-            message = "Memory underutilized (<10% of requested)"
-            # logger.warning(f"Warning for Pod '{pod.metadata.name}' in '{pod.metadata.namespace}': {message}")
-            violations.append(message)
+    requestedCpu = quantities(requestedResourcesList, "cpu", parseCpu)
+    utilizedCpu = quantities(utilizedResourcesList, "cpu", parseCpu)
+    requestedMemory = quantities(requestedResourcesList, "memory", parseMemory)
+    utilizedMemory = quantities(utilizedResourcesList, "memory", parseMemory)
+    utilizedGpu = quantities(utilizedResourcesList, "gpuUtilizationPercentage", lambda value: float(str(value).replace("%", "")))
+    if history is not None and podUids is not None:
+        history.record(podUids, utilizedCpu, utilizedMemory, utilizedGpu)
+        utilizedCpu = history.windowMean(podUids, "cpu")
+        utilizedMemory = history.windowMean(podUids, "memory")
+        utilizedGpu = history.windowMean(podUids, "gpu")
+    return {
+        "requestedGpus": quantities(requestedResourcesList, "nvidia.com/gpu", int),
+        "gpuUtilizationPercentage": utilizedGpu,
+        "cpuUsedPercentOfRequested": percentOfRequested(utilizedCpu, requestedCpu),
+        "memoryUsedPercentOfRequested": percentOfRequested(utilizedMemory, requestedMemory),
+    }
 
-    return violations
+@traced("pod checks", "checks")
+def checkNamespacePodViolations(podAges, requestedResourcesList, utilizedResourcesList, podUids=None, history=None):
+    """Check violations for every pod of a namespace at once."""
+    columns = podColumns(requestedResourcesList, utilizedResourcesList, podUids, history)
+    columns["ageDays"] = toColumn([age if isinstance(age, int) else None for age in podAges])
+    return evaluateRules("Pod", columns, len(podAges))
@@ -0,0 +1,129 @@
+import json
+import operator
+import os
+import re
+import numpy as np
+from utils.config import RULES_FILE
+from utils.logger import logger
+
+COMPARATORS = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# Columns the check modules build per kind, which rules can compare against
+FIELDS = {
+    "Pod": {"requestedGpus", "gpuUtilizationPercentage", "cpuUsedPercentOfRequested", "memoryUsedPercentOfRequested", "ageDays"},
+    "Job": {"ageDays", "failed", "succeededWithoutConditions"},
+    "Deployment": {"ageDays"},
+}
+SEVERITIES = ("info", "warning", "critical")
+CODE_PATTERN = re.compile(r"[A-Z][A-Z0-9_]*")
+
+# Default policy table. Each rule compares one column against a threshold;
+# `message` is formatted with {value} and {threshold}. A JSON list with the
+# same keys in RULES_FILE replaces this table without code edits.
+DEFAULT_RULES = [
+    {"kind": "Pod", "code": "GPU_REQUEST_EXCEEDED", "field": "requestedGpus", "comparator": ">", "threshold": 2,
+     "severity": "critical", "message": "Requested GPUs exceed {threshold:g} (requested: {value:g})"},
+    {"kind": "Pod", "code": "GPU_UNDERUTILIZED", "field": "gpuUtilizationPercentage", "comparator": "<", "threshold": 10,
+     "severity": "warning", "message": "GPU underutilized (<{threshold:g}% of capacity)"},
+    {"kind": "Pod", "code": "CPU_UNDERUTILIZED", "field": "cpuUsedPercentOfRequested", "comparator": "<", "threshold": 10,
+     "severity": "warning", "message": "CPU underutilized (<{threshold:g}% of requested)"},
+    {"kind": "Pod", "code": "MEMORY_UNDERUTILIZED", "field": "memoryUsedPercentOfRequested", "comparator": "<", "threshold": 10,
+     "severity": "warning", "message": "Memory underutilized (<{threshold:g}% of requested)"},
+    {"kind": "Job", "code": "AGE_LIMIT_APPROACHING", "field": "ageDays", "comparator": ">", "threshold": 12,
+     "severity": "critical", "message": "Job approaching 2 weeks age. Address this soon."},
+    {"kind": "Job", "code": "JOB_FAILED", "field": "failed", "comparator": ">", "threshold": 0,
+     "severity": "warning", "message": "Job failed {value:g} times"},
+    {"kind": "Job", "code": "JOB_NOT_CLEANED_UP", "field": "succeededWithoutConditions", "comparator": "==", "threshold": 1,
+     "severity": "warning", "message": "Job succeeded but not cleaned up"},
+    {"kind": "Deployment", "code": "AGE_LIMIT_APPROACHING", "field": "ageDays", "comparator": ">", "threshold": 12,
+     "severity": "critical", "message": "Deployment approaching 2 weeks age. Address this soon."},
+]
+
+def validateRules(rules, source):
+    """Raise ValueError naming the first rule of `source` that the engine could not evaluate."""
+    if not isinstance(rules, list):
+        raise ValueError(f"Check rules in '{source}' must be a JSON list of rules")
+    seen = set()
+    for index, rule in enumerate(rules):
+        where = f"Check rule {index} in '{source}'"
+        if not isinstance(rule, dict):
+            raise ValueError(f"{where} must be a JSON object")
+        missing = {"kind", "code", "field", "comparator", "threshold", "severity", "message"} - set(rule)
+        if missing:
+            raise ValueError(f"{where} is missing {', '.join(sorted(missing))}")
+        if rule["kind"] not in FIELDS:
+            raise ValueError(f"{where} has unknown kind '{rule['kind']}' (expected one of {', '.join(FIELDS)})")
+        if not isinstance(rule["code"], str) or not CODE_PATTERN.fullmatch(rule["code"]):
+            raise ValueError(f"{where} has invalid code {rule['code']!r} (expected UPPER_SNAKE_CASE)")
+        if (rule["kind"], rule["code"]) in seen:
+            raise ValueError(f"{where} repeats code '{rule['code']}' for kind '{rule['kind']}'")
+        seen.add((rule["kind"], rule["code"]))
+        if rule["field"] not in FIELDS[rule["kind"]]:
+            raise ValueError(f"{where} has unknown field '{rule['field']}' for {rule['kind']} "
+                             f"(expected one of {', '.join(sorted(FIELDS[rule['kind']]))})")
+        if rule["comparator"] not in COMPARATORS:
+            raise ValueError(f"{where} has unknown comparator '{rule['comparator']}' (expected one of {' '.join(COMPARATORS)})")
+        threshold = rule["threshold"]
+        if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or not np.isfinite(threshold):
+            raise ValueError(f"{where} has non-numeric threshold {threshold!r}")
+        if rule["severity"] not in SEVERITIES:
+            raise ValueError(f"{where} has unknown severity '{rule['severity']}' (expected one of {', '.join(SEVERITIES)})")
+        try:
+            rule["message"].format(value=0.0, threshold=threshold)
+        except (AttributeError, KeyError, IndexError, ValueError) as e:
+            raise ValueError(f"{where} has a message that cannot be formatted with {{value}} and {{threshold}}: {e}")
+    return rules
+
+def loadRules(path=RULES_FILE):
+    """Load and validate the rule table from `path` when one is configured, else use the defaults."""
+    if not path:
+        return DEFAULT_RULES
+    path = os.path.abspath(os.path.expanduser(path))
+    with open(path, "r") as file:
+        try:
+            rules = json.load(file)
+        except ValueError as e:
+            raise ValueError(f"Check rules in '{path}' are not valid JSON: {e}")
+    validateRules(rules, path)
+    logger.info(f"Loaded {len(rules)} check rules from '{path}'")
+    return rules
+
+RULES = loadRules()
+
+def toColumn(values):
+    """Convert a list of numbers (None for missing) to a float64 column with NaN gaps."""
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+def evaluateRules(kind, columns, rows, rules=None):
+    """Evaluate every rule for `kind` over whole columns at once.
+
+    `columns` maps field names to equal-length arrays; NaN means the field
+    does not apply to that row. Returns one violation list per row.
+    """
+    violations = [[] for _ in range(rows)]
+    for rule in rules if rules is not None else RULES:
+        if rule["kind"] != kind or rule["field"] not in columns:
+            continue
+        column = columns[rule["field"]]
+        with np.errstate(invalid="ignore"):
+            mask = COMPARATORS[rule["comparator"]](column, rule["threshold"]) & ~np.isnan(column)
+        indexes = np.flatnonzero(mask)
+        messages = {}  # Values repeat a lot (e.g., requested GPUs), so format each one once
+        for index, value in zip(indexes.tolist(), column[indexes].tolist()):
+            message = messages.get(value)
+            if message is None:
+                message = messages[value] = rule["message"].format(value=value, threshold=rule["threshold"])
+            violations[index].append({
+                "code": rule["code"],
+                "severity": rule["severity"],
+                "message": message,
+                "values": {rule["field"]: value, "threshold": rule["threshold"]},
+            })
+    return violations
@@ -1,56 +1,59 @@
-from monitors.podMonitor import monitorPods
-from monitors.jobMonitor import monitorJobs
-from monitors.deploymentMonitor import monitorDeployments
-from utils.scrapeGrafana import scrapeGpuMetrics
-from utils.trackViolations import updateUidViolationLog
+import argparse
+from utils.config import SHARD_WORKERS, TRACE_ENABLED, PROFILE_MODE
+from utils.metricsExporter import updateViolationGauges, writeMetricsFile
+from utils.pipeline import runPipeline
+from utils.runSnapshots import writeRunSnapshot, logRunSummary
+from utils.sharding import runShardedPipeline
+from utils.tracing import startTracing, stopTracing
+from utils.namespaces import resolveNamespaces
+from utils.trackViolations import trackRunViolations
+from utils.violationEvents import writeViolationEvents
+from utils.utilizationHistory import getUtilizationHistory
 from utils.logger import logger
-import json
-
-def formatResourceOutput(resources, resourceType):
-    """Format resource output for better readability."""
-    formattedOutput = []
-    for resource in resources:
-        updateUidViolationLog(resource["uid"], resource["namespace"], resource["name"], resource["violations"])
-
-        formattedResource = {
-            "Name": resource["name"],
-            "UID": resource["uid"],
-            "Age": f"{resource['age']} days",
-            "Status": resource.get("status", ""),
-            "Requested Resources": resource["requestedResources"],
-            "Utilized Resources": resource.get("utilizedResources", {}),
-            "Violations": resource["violations"],
-        }
-        formattedOutput.append(formattedResource)
-    logger.info(f"{resourceType}:")
-    logger.info(json.dumps(formattedOutput, indent=4))
-
-def main():
+
+def main(shards=SHARD_WORKERS):
     logger.info("Starting Nautilus Bot...")
 
-    # Namespaces to monitor
-    namespaces = ["gilpin-lab", "aiea-auditors", "aiea-interns"]
+    # Namespaces to monitor (NAUTILUS_NAMESPACES or NAUTILUS_NAMESPACE_LABEL_SELECTOR)
+    namespaces = resolveNamespaces()
 
-    # Scrape GPU metrics
-    gpuMetrics = scrapeGpuMetrics(namespaces)
+    if shards > 1:
+        # Spread namespaces over worker processes; each keeps its own utilization history
+        podData, jobData, deploymentData, timings = runShardedPipeline(namespaces, shards)
+    else:
+        # Scrape GPU metrics and monitor resources, running independent stages concurrently
+        podData, jobData, deploymentData, timings = runPipeline(namespaces)
 
-    # Monitor resources
-    podData = monitorPods(namespaces, gpuMetrics)
-    jobData = monitorJobs(namespaces)
-    deploymentData = monitorDeployments(namespaces)
+        # Persist utilization samples; pods that stopped reporting age out of the history
+        history = getUtilizationHistory()
+        history.evict()
+        history.flush()
 
-    # Group output by namespace
-    for namespace in namespaces:
-        namespacePods = [pod for pod in podData if pod["namespace"] == namespace]
-        namespaceJobs = [job for job in jobData if job["namespace"] == namespace]
-        namespaceDeployments = [deployment for deployment in deploymentData if deployment["namespace"] == namespace]
+    # Record this run's violations in one batch
+    trackRunViolations(podData + jobData + deploymentData)
+    writeViolationEvents(podData + jobData + deploymentData)
+    updateViolationGauges(podData + jobData + deploymentData, namespaces, ["Pod", "Job", "Deployment"])
+    writeMetricsFile("nautilus_bot")
 
-        logger.info(f"Namespace: {namespace}")
-        formatResourceOutput(namespacePods, "Pods")
-        formatResourceOutput(namespaceJobs, "Jobs")
-        formatResourceOutput(namespaceDeployments, "Deployments")
+    # Full records go to the run snapshot; the log only gets per-namespace summaries
+    snapshot = writeRunSnapshot(podData + jobData + deploymentData)
+    logRunSummary(podData + jobData + deploymentData, namespaces, snapshot)
 
     logger.info("Nautilus Bot execution completed.")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Monitor Nautilus namespaces for resource violations.")
+    parser.add_argument("--daemon", action="store_true", help="Keep running and poll each namespace on an adaptive schedule.")
+    parser.add_argument("--shards", type=int, default=SHARD_WORKERS, help="Number of worker processes to shard namespaces over.")
+    parser.add_argument("--trace", action="store_true", default=TRACE_ENABLED, help="Write a Chrome trace-event JSON file of the run.")
+    parser.add_argument("--profile", choices=["cprofile", "sample"], default=PROFILE_MODE, help="Profile the run with cProfile or a stack sampler.")
+    args = parser.parse_args()
+    startTracing(args.trace, args.profile)
+    try:
+        if args.daemon:
+            from utils.daemon import runDaemon
+            runDaemon()
+        else:
+            main(shards=args.shards)
+    finally:
+        stopTracing("daemon" if args.daemon else "run")
@@ -1,45 +1,57 @@
-from kubernetes import client
-from utils.kubeClient import loadKubeConfig
+from utils.kubeClient import appsV1Api
+from utils.listing import listResources
+from utils.ownerIndex import directOwner
 from utils.resourceUtil import calculateAge
-from checks.deploymentChecks import checkDeploymentViolations
+from checks.deploymentChecks import checkNamespaceDeploymentViolations
 from utils.logger import logger
 
+def monitorNamespaceDeployments(namespace, appsV1):
+    """Monitor deployments in a single namespace."""
+    deploymentData = []
+
+    logger.info(f"Monitoring deployments in namespace '{namespace}'...")
+    deployments = list(listResources("deployments", namespace, appsV1.list_namespaced_deployment))
+    namespaceDeploymentViolationCount = 0
+
+    deploymentAges = [calculateAge(deployment.metadata.creation_timestamp) for deployment in deployments]
+    namespaceViolations = checkNamespaceDeploymentViolations(deployments, deploymentAges)
+
+    for deployment, deploymentAge, violationDetails in zip(deployments, deploymentAges, namespaceViolations):
+        requestedResources = deployment.spec.template.spec.containers[0].resources.requests or {}
+        violations = [violation["message"] for violation in violationDetails]
+        owner = directOwner(deployment)
+
+        deploymentData.append(
+            {
+                "kind": "Deployment",
+                "namespace": namespace,
+                "name": deployment.metadata.name,
+                "uid": deployment.metadata.uid,
+                "age": deploymentAge,
+                "replicas": deployment.status.ready_replicas,
+                "owner": {"kind": owner[0], "name": owner[1]} if owner else None,
+                "requestedResources": requestedResources,
+                "violations": violations,
+                "violationDetails": violationDetails,
+            }
+        )
+
+        # Log violations and count
+        for violation in violationDetails:
+            namespaceDeploymentViolationCount += 1
+            if violation["severity"] == "critical":
+                logger.critical(f"CRITICAL: Deployment '{deployment.metadata.name}' in namespace '{namespace}' violation: {violation['message']}")
+            else:
+                logger.warning(f"WARNING: Deployment '{deployment.metadata.name}' in namespace '{namespace}' violation: {violation['message']}")
+
+    logger.info(f"Finished monitoring deployments in namespace '{namespace}'. Total violations: {namespaceDeploymentViolationCount}")
+    return deploymentData
+
 def monitorDeployments(namespaces):
     """Monitor deployments and their resource usage."""
-    loadKubeConfig()
-    appsV1 = client.AppsV1Api()
+    appsV1 = appsV1Api()
     deploymentData = []
 
     for namespace in namespaces:
-        logger.info(f"Monitoring deployments in namespace '{namespace}'...")
-        deployments = appsV1.list_namespaced_deployment(namespace)
-        namespaceDeploymentViolationCount = 0
-        
-        for deployment in deployments.items:
-            deploymentAge = calculateAge(deployment.metadata.creation_timestamp)
-            requestedResources = deployment.spec.template.spec.containers[0].resources.requests or {}
-
-            violations = checkDeploymentViolations(deployment, deploymentAge)
-
-            deploymentData.append(
-                {
-                    "namespace": namespace,
-                    "name": deployment.metadata.name,
-                    "uid": deployment.metadata.uid,
-                    "age": deploymentAge,
-                    "replicas": deployment.status.ready_replicas,
-                    "requestedResources": requestedResources,
-                    "violations": checkDeploymentViolations(deployment, deploymentAge),
-                }
-            )
-
-            # Log violations and count
-            for violation in violations:
-                namespaceDeploymentViolationCount += 1
-                if "approaching 2 weeks" in violation:
-                    logger.critical(f"CRITICAL: Deployment '{deployment.metadata.name}' in namespace '{namespace}' violation: {violation}")
-                else:
-                    logger.warning(f"WARNING: Deployment '{deployment.metadata.name}' in namespace '{namespace}' violation: {violation}")
-
-        logger.info(f"Finished monitoring deployments in namespace '{namespace}'. Total violations: {namespaceDeploymentViolationCount}")
+        deploymentData.extend(monitorNamespaceDeployments(namespace, appsV1))
     return deploymentData
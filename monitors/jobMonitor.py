@@ -1,43 +1,55 @@
-from kubernetes import client
-from utils.kubeClient import loadKubeConfig
+from utils.kubeClient import batchV1Api
+from utils.listing import listResources
+from utils.ownerIndex import directOwner
 from utils.resourceUtil import calculateAge
-from checks.jobChecks import checkJobViolations
+from checks.jobChecks import checkNamespaceJobViolations
 from utils.logger import logger
 
+def monitorNamespaceJobs(namespace, batchV1):
+    """Monitor jobs in a single namespace."""
+    jobData = []
+
+    logger.info(f"Monitoring jobs in namespace '{namespace}'...")
+    jobs = list(listResources("jobs", namespace, batchV1.list_namespaced_job))
+    namespaceJobViolationCount = 0
+
+    jobAges = [calculateAge(job.metadata.creation_timestamp) for job in jobs]
+    namespaceViolations = checkNamespaceJobViolations(jobs, jobAges)
+
+    for job, jobAge, violationDetails in zip(jobs, jobAges, namespaceViolations):
+        violations = [violation["message"] for violation in violationDetails]
+        owner = directOwner(job)
+
+        jobData.append(
+            {
+                "kind": "Job",
+                "namespace": namespace,
+                "name": job.metadata.name,
+                "uid": job.metadata.uid,
+                "age": jobAge,
+                "status": job.status.conditions[0].type if job.status.conditions else "Unknown",
+                "owner": {"kind": owner[0], "name": owner[1]} if owner else None,
+                "violations": violations,
+                "violationDetails": violationDetails,
+            }
+        )
+
+        # Log violations and count
+        for violation in violationDetails:
+            namespaceJobViolationCount += 1
+            if violation["severity"] == "critical":
+                logger.critical(f"CRITICAL: Job '{job.metadata.name}' in namespace '{namespace}' violation: {violation['message']}")
+            else:
+                logger.warning(f"WARNING: Job '{job.metadata.name}' in namespace '{namespace}' violation: {violation['message']}")
+
+    logger.info(f"Finished monitoring jobs in namespace '{namespace}'. Total violations: {namespaceJobViolationCount}")
+    return jobData
+
 def monitorJobs(namespaces):
     """Monitor jobs and their resource usage."""
-    loadKubeConfig()
-    batchV1 = client.BatchV1Api()
+    batchV1 = batchV1Api()
     jobData = []
 
     for namespace in namespaces:
-        logger.info(f"Monitoring jobs in namespace '{namespace}'...")
-        jobs = batchV1.list_namespaced_job(namespace)
-        namespaceJobViolationCount = 0
-
-        for job in jobs.items:
-            jobAge = calculateAge(job.metadata.creation_timestamp)
-
-            violations = checkJobViolations(job, jobAge, requestedResources)
-            
-            jobData.append(
-                {
-                    "namespace": namespace,
-                    "name": job.metadata.name,
-                    "uid": job.metadata.uid,
-                    "age": jobAge,
-                    "status": job.status.conditions[0].type if job.status.conditions else "Unknown",
-                    "violations": checkJobViolations(job, jobAge),
-                }
-            )
-
-            # Log violations and count
-            for violation in violations:
-                namespaceJobViolationCount += 1
-                if "approaching 2 weeks" in violation:
-                    logger.critical(f"CRITICAL: Job '{job.metadata.name}' in namespace '{namespace}' violation: {violation}")
-                else:
-                    logger.warning(f"WARNING: Job '{job.metadata.name}' in namespace '{namespace}' violation: {violation}")
-
-        logger.info(f"Finished monitoring jobs in namespace '{namespace}'. Total violations: {namespaceJobViolationCount}")
+        jobData.extend(monitorNamespaceJobs(namespace, batchV1))
     return jobData
@@ -1,99 +1,108 @@
-from kubernetes import client
-from utils.kubeClient import loadKubeConfig
-from utils.resourceUtil import calculateAge, getPodUtilization
-from checks.podChecks import checkPodViolations
+from utils.gpuMetricsCache import indexByPod
+from utils.kubeClient import coreV1Api, appsV1Api
+from utils.listing import listResources
+from utils.ownerIndex import buildOwnerIndex
+from utils.resourceUtil import calculateAge
+from utils.utilizationProvider import getNamespaceUtilization
+from utils.utilizationHistory import getUtilizationHistory
+from checks.podChecks import checkNamespacePodViolations
 from utils.logger import logger
 
-def getDeploymentForReplicaSet(replicaSetName, namespace):
-    """Retrieve the Deployment managing a given ReplicaSet."""
-    loadKubeConfig()
-    apps_v1 = client.AppsV1Api()
-    deployments = apps_v1.list_namespaced_deployment(namespace)
-    for deployment in deployments.items:
-        if deployment.metadata.name in replicaSetName:
-            return deployment.metadata.name
-    return None
+def monitorNamespacePods(namespace, gpuMetrics, v1, appsV1):
+    """Monitor pods in a single namespace."""
+    podData = []
+
+    logger.info(f"Monitoring pods in namespace '{namespace}'...")
+    pods = listResources("pods", namespace, v1.list_namespaced_pod)
+    namespaceGpuMetrics = gpuMetrics.get(namespace, {})
+    podGpuMetrics = namespaceGpuMetrics.get("podMetrics") or indexByPod(namespaceGpuMetrics)
+    namespaceUtilization = getNamespaceUtilization(namespace)
+    ownerIndex = buildOwnerIndex(namespace, appsV1)
+    namespacePodViolationCount = 0
+    candidates = []
+
+    for pod in pods:
+        podStatus = pod.status.phase
+
+        # Skip non-Running pods
+        if podStatus not in ["Running"]:
+            logger.error(f"Skipping pod '{pod.metadata.name}' in namespace '{namespace}' as it is not running (state: {podStatus})")
+            continue
+
+        # Skip pods in Error state
+        if podStatus == "Error":
+            logger.error(f"Skipping pod '{pod.metadata.name}' in namespace '{namespace}' as it is in Error state")
+            continue
+
+        # Resolve the top-level owner (ReplicaSets resolve to their Deployment)
+        owner = ownerIndex.resolvePodOwner(pod)
+        ownerInfo = f"managed by {owner[0]} '{owner[1]}'" if owner else "independent"
+
+        podAge = calculateAge(pod.status.start_time)
+        requestedResources = pod.spec.containers[0].resources.requests or {}
+        podUtilization = namespaceUtilization.get(pod.metadata.name)
+        if podUtilization:
+            utilizedResources = {"cpu": podUtilization["cpu"], "memory": podUtilization["memory"]}
+        else:
+            utilizedResources = {"cpu": "Unknown", "memory": "Unknown"}
+
+        # Add GPU metrics to utilized resources if available
+        gpuUtilization = podGpuMetrics.get(pod.metadata.name)
+        if gpuUtilization:
+            utilizedResources["gpuUtilizationPercentage"] = gpuUtilization["gpuUtilizationPercentage"]
+
+        # Skip pods where utilization cannot be retrieved
+        if utilizedResources["cpu"] == "Unknown" or utilizedResources["memory"] == "Unknown":
+            logger.error(f"Skipping pod '{pod.metadata.name}' in namespace '{namespace}' due to missing utilization data")
+            continue
+
+        candidates.append((pod, owner, ownerInfo, podAge, requestedResources, utilizedResources))
+
+    # Evaluate the check rules for the whole namespace at once, over the utilization history window
+    namespaceViolations = checkNamespacePodViolations(
+        [candidate[3] for candidate in candidates],
+        [candidate[4] for candidate in candidates],
+        [candidate[5] for candidate in candidates],
+        podUids=[candidate[0].metadata.uid for candidate in candidates],
+        history=getUtilizationHistory(),
+    )
+
+    for (pod, owner, ownerInfo, podAge, requestedResources, utilizedResources), violationDetails in zip(candidates, namespaceViolations):
+        violations = [violation["message"] for violation in violationDetails]
+
+        podData.append(
+            {
+                "kind": "Pod",
+                "namespace": namespace,
+                "name": pod.metadata.name,
+                "uid": pod.metadata.uid,
+                "age": podAge,
+                "status": pod.status.phase,
+                "owner": {"kind": owner[0], "name": owner[1]} if owner else None,
+                "requestedResources": requestedResources,
+                "utilizedResources": utilizedResources,
+                "violations": violations,
+                "violationDetails": violationDetails,
+            }
+        )
+
+        # Log violations and count
+        for violation in violationDetails:
+            namespacePodViolationCount += 1
+            if violation["severity"] == "critical":
+                logger.critical(f"CRITICAL: Pod '{pod.metadata.name}' in namespace '{namespace}' ({ownerInfo}) violation: {violation['message']}")
+            else:
+                logger.warning(f"WARNING: Pod '{pod.metadata.name}' in namespace '{namespace}' ({ownerInfo}) violation: {violation['message']}")
+
+    logger.info(f"Finished monitoring pods in namespace '{namespace}'. Total violations: {namespacePodViolationCount}")
+    return podData
 
 def monitorPods(namespaces, gpuMetrics):
     """Monitor pods and their resource usage."""
-    loadKubeConfig()
-    v1 = client.CoreV1Api()
+    v1 = coreV1Api()
+    appsV1 = appsV1Api()
     podData = []
 
     for namespace in namespaces:
-        logger.info(f"Monitoring pods in namespace '{namespace}'...")
-        pods = v1.list_namespaced_pod(namespace)
-        namesapceGpuMetrics = gpuMetrics.get(namespace, {}).get("gpuMetrics", [])
-        namespacePodViolationCount = 0
-
-        for pod in pods.items:
-            podStatus = pod.status.phase
-
-            # Skip non-Running pods
-            if podStatus not in ["Running"]:
-                logger.error(f"Skipping pod '{pod.metadata.name}' in namespace '{namespace}' as it is not running (state: {podStatus})")
-                continue
-
-            # Skip pods in Error state
-            if podStatus == "Error":
-                logger.error(f"Skipping pod '{pod.metadata.name}' in namespace '{namespace}' as it is in Error state")
-                continue
-
-            # Check for Owner References
-            owner = pod.metadata.owner_references[0] if pod.metadata.owner_references else None
-            # ownerInfo = f"managed by {owner.kind} '{owner.name}'" if owner else "independent"
-            ownerInfo = "independent"
-            if owner:
-                if owner.kind == "ReplicaSet":
-                    deploymentName = getDeploymentForReplicaSet(owner.name, namespace)
-                    if deploymentName:
-                        ownerInfo = f"managed by Deployment '{deploymentName}'"
-                    else:
-                        ownerInfo = f"managed by ReplicaSet '{owner.name}'"
-                else:
-                    ownerInfo = f"managed by {owner.kind} '{owner.name}'"
-
-            podAge = calculateAge(pod.status.start_time)
-            requestedResources = pod.spec.containers[0].resources.requests or {}
-            utilizedResources = getPodUtilization(namespace, pod.metadata.name)
-
-            # Add GPU metrics to utilized resources if available
-            gpuUtilization = next(
-                (gpu for gpu in namesapceGpuMetrics if gpu["podName"] == pod.metadata.name),
-                None
-            )
-            if gpuUtilization:
-                utilizedResources["gpuUtilizationPercentage"] = gpuUtilization["gpuUtilizationPercentage"]
-
-            # Skip pods where utilization cannot be retrieved
-            if utilizedResources["cpu"] == "Unknown" or utilizedResources["memory"] == "Unknown":
-                logger.error(f"Skipping pod '{pod.metadata.name}' in namespace '{namespace}' due to missing utilization data")
-                continue
-
-            violations = checkPodViolations(pod, podAge, requestedResources, utilizedResources)
-
-            podData.append(
-                {
-                    "namespace": namespace,
-                    "name": pod.metadata.name,
-                    "uid": pod.metadata.uid,
-                    "age": podAge,
-                    "status": pod.status.phase,
-                    "requestedResources": requestedResources,
-                    "utilizedResources": utilizedResources,
-                    "violations": checkPodViolations(
-                        pod, podAge, requestedResources, utilizedResources
-                    ),
-                }
-            )
-
-            # Log violations and count
-            for violation in violations:
-                namespacePodViolationCount += 1
-                if "requesting more than 2 GPUs" in violation:
-                    logger.critical(f"CRITICAL: Pod '{pod.metadata.name}' in namespace '{namespace}' ({ownerInfo}) violation: {violation}")
-                else:
-                    logger.warning(f"WARNING: Pod '{pod.metadata.name}' in namespace '{namespace}' ({ownerInfo}) violation: {violation}")
-
-        logger.info(f"Finished monitoring pods in namespace '{namespace}'. Total violations: {namespacePodViolationCount}")
+        podData.extend(monitorNamespacePods(namespace, gpuMetrics, v1, appsV1))
     return podData
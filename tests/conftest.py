@@ -0,0 +1,33 @@
+import os
+import shutil
+import sys
+import tempfile
+
+# utils.config reads the environment once, when it is first imported, and
+# utils.logger starts writing as soon as it is imported; so every output path
+# is pointed at a scratch directory here, before any test module imports them.
+
+SCRATCH_DIR = tempfile.mkdtemp(prefix="nautilus-tests-")
+
+OUTPUT_PATHS = {
+    "NAUTILUS_LOGS_DIR": "dailyLogs",
+    "NAUTILUS_GPU_METRICS_CACHE_FILE": "gpuMetrics/snapshots.json",
+    "NAUTILUS_GRAFANA_DRIVER_CACHE_FILE": "browser/chromedriver.path",
+    "NAUTILUS_VIOLATIONS_DB": "violations/violations.db",
+    "NAUTILUS_EVENTS_DIR": "events",
+    "NAUTILUS_RUN_SNAPSHOTS_DIR": "runs",
+    "NAUTILUS_AGGREGATES_FILE": "violations/aggregates.json",
+    "NAUTILUS_REPORT_AGGREGATES_DIR": "reports",
+    "NAUTILUS_UTILIZATION_HISTORY_FILE": "utilization/history.dat",
+    "NAUTILUS_TRACE_DIR": "traces",
+}
+
+for name, path in OUTPUT_PATHS.items():
+    os.environ[name] = os.path.join(SCRATCH_DIR, path)
+
+def pytest_unconfigure(config):
+    # Flush the log writer before its directory goes away, instead of at interpreter exit
+    logger = sys.modules.get("utils.logger")
+    if logger is not None:
+        logger.logWriter.stop()
+    shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
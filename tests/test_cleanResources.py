@@ -0,0 +1,95 @@
+import unittest
+from datetime import datetime, timedelta
+
+from kubernetes.client.rest import ApiException
+
+from utils.cleanResources import UNDERUTILIZED_DELETE_HOURS, buildPlan, executePlan
+from utils.violationAggregator import ViolationAggregator
+
+class FakeCluster:
+    """Objects by (namespace, name), each holding its current UID; answers like the API server does."""
+
+    def __init__(self, objects):
+        self.objects = dict(objects)
+        self.calls = []
+
+    def live(self, namespace, name):
+        if (namespace, name) not in self.objects:
+            raise ApiException(status=404, reason="Not Found")
+        return self.objects[(namespace, name)]
+
+    def delete(self, name, namespace, body):
+        self.calls.append(("delete", namespace, name))
+        if self.live(namespace, name)["uid"] != body.preconditions.uid:
+            raise ApiException(status=409, reason="Conflict")
+        del self.objects[(namespace, name)]
+
+    def patch(self, name, namespace, body):
+        self.calls.append(("patch", namespace, name))
+        live = self.live(namespace, name)
+        for op in body:
+            if op["op"] == "test" and live[op["path"].split("/")[-1]] != op["value"]:
+                raise ApiException(status=422, reason="Unprocessable Entity")
+        live["replicas"] = 0
+
+class FakeClients:
+    def __init__(self, cluster):
+        self.coreV1 = type("CoreV1", (), {"delete_namespaced_pod": staticmethod(cluster.delete)})()
+        self.batchV1 = type("BatchV1", (), {"delete_namespaced_job": staticmethod(cluster.delete)})()
+        self.appsV1 = type("AppsV1", (), {
+            "delete_namespaced_deployment": staticmethod(cluster.delete),
+            "patch_namespaced_deployment": staticmethod(cluster.patch),
+        })()
+
+def violation(uid, kind, name, code, timestamp, values=None):
+    return {"uid": uid, "kind": kind, "namespace": "lab", "name": name, "code": code,
+            "timestamp": timestamp.isoformat(), "values": values or {}}
+
+class CleanupPlanTest(unittest.TestCase):
+    def setUp(self):
+        self.now = datetime.utcnow().replace(minute=30)
+        self.aggregator = ViolationAggregator(path=None)
+
+    def hoursAgo(self, hours):
+        return self.now - timedelta(hours=hours)
+
+    def test_underutilized_pod_needs_distinct_hours(self):
+        for minute in range(60):
+            self.aggregator.add(violation("uid-busy", "Pod", "polled", "GPU_UNDERUTILIZED", self.now - timedelta(minutes=minute)))
+        for hour in range(UNDERUTILIZED_DELETE_HOURS):
+            self.aggregator.add(violation("uid-idle", "Pod", "idle", "GPU_UNDERUTILIZED", self.hoursAgo(hour)))
+
+        plan = {entry["uid"]: entry["action"] for entry in buildPlan(self.aggregator)}
+        self.assertEqual(plan, {"uid-idle": "delete"})
+
+    def test_actions_only_hit_the_planned_uid(self):
+        for hour in range(UNDERUTILIZED_DELETE_HOURS):
+            self.aggregator.add(violation("uid-old-db", "Pod", "db-0", "GPU_UNDERUTILIZED", self.hoursAgo(hour)))
+            self.aggregator.add(violation("uid-idle", "Pod", "idle", "GPU_UNDERUTILIZED", self.hoursAgo(hour)))
+        for hour in range(2):
+            self.aggregator.add(violation("uid-old-web", "Deployment", "web", "AGE_LIMIT_APPROACHING", self.hoursAgo(hour), {"ageDays": 13}))
+            self.aggregator.add(violation("uid-old-api", "Deployment", "api", "AGE_LIMIT_APPROACHING", self.hoursAgo(hour), {"ageDays": 13}))
+        cluster = FakeCluster({
+            ("lab", "db-0"): {"uid": "uid-new-db"},  # Recreated by its StatefulSet
+            ("lab", "idle"): {"uid": "uid-idle"},
+            ("lab", "web"): {"uid": "uid-new-web", "replicas": 2},  # Re-applied
+            ("lab", "api"): {"uid": "uid-old-api", "replicas": 2},
+        })
+
+        outcomes = executePlan(buildPlan(self.aggregator), clients=FakeClients(cluster), ratePerSecond=0)
+
+        self.assertEqual(outcomes, {"done": 2, "alreadyGone": 0, "alreadyReplaced": 2, "failed": 0})
+        self.assertEqual(cluster.objects, {
+            ("lab", "db-0"): {"uid": "uid-new-db"},
+            ("lab", "web"): {"uid": "uid-new-web", "replicas": 2},
+            ("lab", "api"): {"uid": "uid-old-api", "replicas": 0},
+        })
+
+    def test_missing_resource_is_already_gone(self):
+        for hour in range(UNDERUTILIZED_DELETE_HOURS):
+            self.aggregator.add(violation("uid-idle", "Pod", "idle", "GPU_UNDERUTILIZED", self.hoursAgo(hour)))
+        outcomes = executePlan(buildPlan(self.aggregator), clients=FakeClients(FakeCluster({})), ratePerSecond=0)
+        self.assertEqual(outcomes["alreadyGone"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
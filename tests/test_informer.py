@@ -0,0 +1,98 @@
+import unittest
+
+from kubernetes.client import V1ListMeta, V1ObjectMeta, V1OwnerReference, V1Pod, V1PodList
+from kubernetes.client.rest import ApiException
+
+from utils.informer import Informer, ResourceStore
+
+def pod(name, uid, resourceVersion, owner=None):
+    ownerReferences = [V1OwnerReference(api_version="apps/v1", kind="ReplicaSet", name=owner, uid=owner)] if owner else None
+    return V1Pod(metadata=V1ObjectMeta(name=name, namespace="lab", uid=uid, resource_version=resourceVersion,
+                                       owner_references=ownerReferences))
+
+def bookmark(resourceVersion):
+    # The client leaves BOOKMARK objects undeserialized
+    return {"type": "BOOKMARK", "object": {"kind": "Pod", "apiVersion": "v1", "metadata": {"resourceVersion": resourceVersion}}}
+
+class FakeApi:
+    """A list function plus a scripted watch stream; each watch call plays the next session.
+
+    A session is a list of events, optionally ending with an exception to
+    raise. Once every session has been played the informer is stopped.
+    """
+
+    def __init__(self, listings, sessions):
+        self.listings = list(listings)
+        self.sessions = list(sessions)
+        self.lists = 0
+        self.watchedFrom = []
+        self.informer = None
+
+    def list(self, **kwargs):
+        self.lists += 1
+        items, resourceVersion = self.listings.pop(0)
+        return V1PodList(items=items, metadata=V1ListMeta(resource_version=resourceVersion))
+
+    def watch(self, listFunc, resourceVersion, **kwargs):
+        self.watchedFrom.append(resourceVersion)
+        if not self.sessions:
+            self.informer.stop()
+            return
+        for event in self.sessions.pop(0):
+            if isinstance(event, Exception):
+                raise event
+            yield event
+
+    def run(self, store=None):
+        self.informer = Informer("pods", self.list, store or ResourceStore(), namespace="lab", watchStream=self.watch)
+        self.informer.run()
+        return self.informer
+
+class InformerTest(unittest.TestCase):
+    def test_events_update_the_store(self):
+        api = FakeApi([([pod("a", "uid-a", "1"), pod("b", "uid-b", "1", owner="rs-1")], "1")], [[
+            {"type": "ADDED", "object": pod("c", "uid-c", "2", owner="rs-1")},
+            {"type": "MODIFIED", "object": pod("a", "uid-a", "3", owner="rs-2")},
+            {"type": "DELETED", "object": pod("b", "uid-b", "4", owner="rs-1")},
+        ]])
+        store = ResourceStore()
+        informer = api.run(store)
+
+        self.assertTrue(informer.synced.is_set())
+        self.assertEqual(sorted(obj.metadata.name for obj in store.listByNamespace("lab")), ["a", "c"])
+        self.assertEqual([obj.metadata.name for obj in store.listByOwner("rs-1")], ["c"])
+        self.assertEqual([obj.metadata.name for obj in store.listByOwner("rs-2")], ["a"])
+        self.assertEqual(store.get("uid-a").metadata.resource_version, "3")
+        self.assertEqual(informer.resourceVersion, "4")
+
+    def test_bookmark_advances_resource_version(self):
+        api = FakeApi([([pod("a", "uid-a", "1")], "1")], [
+            [{"type": "MODIFIED", "object": pod("a", "uid-a", "5")}, bookmark("999")],
+            [],
+        ])
+        informer = api.run()
+
+        self.assertEqual(api.watchedFrom, ["1", "999", "999"])
+        self.assertEqual(informer.resourceVersion, "999")
+        self.assertEqual(api.lists, 1)
+
+    def test_gone_watch_relists(self):
+        api = FakeApi(
+            [([pod("a", "uid-a", "1"), pod("b", "uid-b", "1")], "1"), ([pod("b", "uid-b", "7"), pod("d", "uid-d", "8")], "8")],
+            [
+                [{"type": "ADDED", "object": pod("c", "uid-c", "2")}, ApiException(status=410, reason="Gone")],
+                [{"type": "MODIFIED", "object": pod("d", "uid-d", "9")}],
+            ],
+        )
+        store = ResourceStore()
+        informer = api.run(store)
+
+        self.assertEqual(api.lists, 2)
+        self.assertEqual(api.watchedFrom, ["1", "8", "9"])
+        # The relist replaced everything seen before it, including objects deleted while the watch was gone
+        self.assertEqual(sorted(obj.metadata.name for obj in store.listByNamespace("lab")), ["b", "d"])
+        self.assertEqual(store.get("uid-d").metadata.resource_version, "9")
+        self.assertEqual(informer.resourceVersion, "9")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import json
+import re
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from utils.config import NAMESPACES
+from utils.prometheusMetrics import queryGpuMetrics
+
+# Escapes Go's strconv.Unquote (and so PromQL) accepts in a double-quoted string
+STRING_ESCAPES = {"a": "\a", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t", "v": "\v", "\\": "\\", '"': '"', "'": "'"}
+MATCHER = re.compile(r'namespace=~"((?:[^"\\]|\\.)*)"')
+
+def unquote(literal):
+    """Decode a PromQL string literal body, rejecting invalid escapes like Prometheus does."""
+    decoded, index = [], 0
+    while index < len(literal):
+        char = literal[index]
+        if char == "\\":
+            escaped = literal[index + 1]
+            if escaped not in STRING_ESCAPES:
+                raise ValueError(f"invalid escape sequence \\{escaped}")
+            decoded.append(STRING_ESCAPES[escaped])
+            index += 2
+        else:
+            decoded.append(char)
+            index += 1
+    return "".join(decoded)
+
+class StubPrometheus(BaseHTTPRequestHandler):
+    """Answers /api/v1/query with one GPU pod per namespace matched by the query's namespace regex."""
+
+    queries = []
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"])).decode()
+        query = parse_qs(body)["query"][0]
+        StubPrometheus.queries.append(query)
+        try:
+            pattern = re.compile(unquote(MATCHER.search(query).group(1)))
+        except (ValueError, re.error) as e:
+            self.reply(400, {"status": "error", "errorType": "bad_data", "error": str(e)})
+            return
+
+        namespaces = [namespace for namespace in self.server.clusterNamespaces if pattern.fullmatch(namespace)]
+        self.server.matched.update(namespaces)
+        if query.startswith("sum by (namespace, pod)"):
+            result = [{"metric": {"namespace": namespace, "pod": f"{namespace}-trainer"}, "value": [0, "2"]} for namespace in namespaces]
+        elif query.startswith("avg by (namespace, pod, modelName)"):
+            result = [{"metric": {"namespace": namespace, "pod": f"{namespace}-trainer", "modelName": "NVIDIA-A10"}, "value": [0, "37.25"]} for namespace in namespaces]
+        else:
+            result = [{"metric": {"namespace": namespace}, "value": [0, "50"]} for namespace in namespaces]
+        self.reply(200, {"status": "success", "data": {"resultType": "vector", "result": result}})
+
+    def reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+class QueryGpuMetricsTest(unittest.TestCase):
+    def setUp(self):
+        StubPrometheus.queries = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubPrometheus)
+        self.server.clusterNamespaces = list(NAMESPACES) + ["gilpin-lab-other", "unmonitored"]
+        self.server.matched = set()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.baseUrl = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_hyphenated_default_namespaces(self):
+        self.assertTrue(all("-" in namespace for namespace in NAMESPACES))
+        results = queryGpuMetrics(NAMESPACES, self.baseUrl)
+
+        self.assertEqual(len(StubPrometheus.queries), 3)
+        self.assertEqual(self.server.matched, set(NAMESPACES))
+        self.assertEqual(set(results), set(NAMESPACES))
+        for namespace in NAMESPACES:
+            self.assertEqual(results[namespace], {
+                "gpuMetrics": [{
+                    "model": "NVIDIA-A10",
+                    "podName": f"{namespace}-trainer",
+                    "gpuRequested": "2",
+                    "gpuUtilizationPercentage": "37.2%",
+                }],
+                "currentGpuUsage": "50.0%",
+            })
+
+    def test_metacharacters_match_literally(self):
+        self.server.clusterNamespaces = ["a.b", "axb"]
+        results = queryGpuMetrics(["a.b"], self.baseUrl)
+        self.assertEqual(results["a.b"]["gpuMetrics"][0]["podName"], "a.b-trainer")
+        self.assertEqual(self.server.matched, {"a.b"})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import os
+import tempfile
+import unittest
+
+from checks.ruleEngine import DEFAULT_RULES, evaluateRules, loadRules, toColumn, validateRules
+
+class RuleEngineTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "rules.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def writeRules(self, rules):
+        with open(self.path, "w") as file:
+            json.dump(rules, file)
+
+    def rule(self, **overrides):
+        return {"kind": "Job", "code": "JOB_FAILED", "field": "failed", "comparator": ">=", "threshold": 3,
+                "severity": "critical", "message": "Job failed {value:g} times", **overrides}
+
+    def test_defaults_without_a_rules_file(self):
+        self.assertIs(loadRules(None), DEFAULT_RULES)
+        self.assertIs(validateRules(DEFAULT_RULES, "defaults"), DEFAULT_RULES)
+
+    def test_rules_file_replaces_defaults(self):
+        self.writeRules([self.rule()])
+        rules = loadRules(self.path)
+        columns = {"failed": toColumn([1, 3, None])}
+        self.assertEqual([[violation["message"] for violation in row] for row in evaluateRules("Job", columns, 3, rules)],
+                         [[], ["Job failed 3 times"], []])
+
+    def test_missing_rules_file_is_an_error(self):
+        with self.assertRaises(FileNotFoundError):
+            loadRules(self.path)
+
+    def test_invalid_rules_are_rejected(self):
+        cases = {
+            "JSON list": {"rules": []},
+            "missing severity": [{key: value for key, value in self.rule().items() if key != "severity"}],
+            "unknown kind": [self.rule(kind="StatefulSet")],
+            "invalid code": [self.rule(code="job failed")],
+            "repeats code": [self.rule(), self.rule(threshold=5)],
+            "unknown field": [self.rule(field="readyReplicas")],
+            "unknown comparator": [self.rule(comparator="=>")],
+            "non-numeric threshold": [self.rule(threshold="3")],
+            "unknown severity": [self.rule(severity="fatal")],
+            "cannot be formatted": [self.rule(message="Job failed {count} times")],
+        }
+        for expected, rules in cases.items():
+            with self.subTest(expected):
+                self.writeRules(rules)
+                with self.assertRaisesRegex(ValueError, expected):
+                    loadRules(self.path)
+
+        with open(self.path, "w") as file:
+            file.write("[{")
+        with self.assertRaisesRegex(ValueError, "not valid JSON"):
+            loadRules(self.path)
+
+if __name__ == "__main__":
+    unittest.main()
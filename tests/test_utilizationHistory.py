@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from utils.utilizationHistory import UtilizationHistory
+
+# One-hour window in four 15-minute buckets; START is aligned to a bucket
+START = 900 * 2_000_000
+
+class UtilizationHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "history.dat")
+        self.history = UtilizationHistory(self.path, slots=4, maxPods=3, windowHours=1).open()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def recordEveryMinute(self, uids, minutes, start=START):
+        for minute in range(minutes):
+            self.history.record(uids, [minute] * len(uids), [1.0] * len(uids), [np.nan] * len(uids), timestamp=start + minute * 60)
+
+    def test_window_spans_its_hours_whatever_the_sampling_rate(self):
+        self.recordEveryMinute(["a"], 120)
+        now = START + 119 * 60
+        # The latest sample of each 15-minute bucket of the last hour (minutes 74, 89, 104, 119),
+        # not the last four samples, which would only cover four minutes
+        self.assertEqual(self.history.windowMean(["a"], "cpu", hours=1, now=now)[0], 96.5)
+        self.assertEqual(self.history.windowPercentile(["a"], "cpu", 0, hours=1, now=now)[0], 74)
+
+    def test_sparse_samples_and_unknown_pods(self):
+        self.history.record(["a", "b"], [2.0, 4.0], [1.0, 1.0], [50.0, np.nan], timestamp=START)
+        self.history.record(["a"], [6.0], [1.0], [70.0], timestamp=START + 1800)
+        means = self.history.windowMean(["a", "b", "c"], "cpu", hours=1, now=START + 1800)
+        self.assertEqual(list(means[:2]), [4.0, 4.0])
+        self.assertTrue(np.isnan(means[2]))
+        self.assertEqual(self.history.windowMean(["a", "b"], "gpu", hours=1, now=START + 1800)[0], 60.0)
+        self.assertTrue(np.isnan(self.history.windowMean(["b"], "gpu", hours=1, now=START + 1800)[0]))
+        # Samples that left the window no longer count
+        self.assertTrue(np.isnan(self.history.windowMean(["b"], "cpu", hours=1, now=START + 2 * 3600)[0]))
+
+    def test_survives_reopen_and_evicts_stale_pods(self):
+        self.recordEveryMinute(["a", "b"], 30)
+        self.history.flush()
+        reopened = UtilizationHistory(self.path, slots=4, maxPods=3, windowHours=1).open()
+        self.assertEqual(reopened.windowMean(["a"], "cpu", hours=1, now=START + 29 * 60)[0], 21.5)
+
+        reopened.record(["b"], [1.0], [1.0], [1.0], timestamp=START + 3 * 3600)
+        self.assertEqual(reopened.evict(maxAgeHours=1, now=START + 3 * 3600), 1)
+        self.assertEqual(set(reopened.rows), {"b"})
+
+    def test_full_history_evicts_least_recently_sampled_pod(self):
+        for index, uid in enumerate(["a", "b", "c"]):
+            self.history.record([uid], [1.0], [1.0], [1.0], timestamp=START + index)
+        self.history.record(["d"], [1.0], [1.0], [1.0], timestamp=START + 10)
+        self.assertEqual(set(self.history.rows), {"b", "c", "d"})
+
+if __name__ == "__main__":
+    unittest.main()
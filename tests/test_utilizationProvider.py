@@ -0,0 +1,84 @@
+import unittest
+from unittest import mock
+
+from kubernetes.client.rest import ApiException
+
+import utils.utilizationProvider
+from utils.utilizationProvider import METRICS_API_MAX_RETRY_SECONDS, METRICS_API_RETRY_SECONDS, MetricsApiUtilizationProvider
+
+def podMetrics(name, *usages):
+    containers = [{"name": f"c{index}", "usage": {"cpu": cpu, "memory": memory}} for index, (cpu, memory) in enumerate(usages)]
+    return {"metadata": {"name": name}, "containers": containers}
+
+class FakeMetricsApi:
+    """Serves PodMetrics, or raises the next scripted ApiException status."""
+
+    def __init__(self, failures=()):
+        self.failures = list(failures)
+        self.calls = 0
+
+    def list_namespaced_custom_object(self, group, version, namespace, plural):
+        self.calls += 1
+        if self.failures:
+            raise ApiException(status=self.failures.pop(0))
+        return {"items": [podMetrics("a", ("1500u", "1536Ki"), ("1500u", "1536Ki"))]}
+
+class MetricsApiUtilizationProviderTest(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch.object(utils.utilizationProvider.time, "monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def provider(self, api):
+        provider = MetricsApiUtilizationProvider(api)
+        provider.fetchFromKubectl = mock.Mock(return_value={"fallback": {}})
+        return provider
+
+    def test_containers_are_summed_before_rounding(self):
+        provider = self.provider(FakeMetricsApi())
+        self.assertEqual(provider.getNamespaceUtilization("lab")["a"], {
+            "cpu": "3m",
+            "memory": "3Mi",
+            "containers": {"c0": {"cpu": "2m", "memory": "1Mi"}, "c1": {"cpu": "2m", "memory": "1Mi"}},
+        })
+
+    def test_unavailable_api_is_retried_after_a_backoff(self):
+        api = FakeMetricsApi([503, 503])
+        provider = self.provider(api)
+
+        with self.assertLogs("NautilusBot", "ERROR"):
+            self.assertEqual(provider.getNamespaceUtilization("lab"), {"fallback": {}})
+        # Within the backoff the API is not called again
+        self.now += METRICS_API_RETRY_SECONDS - 1
+        self.assertEqual(provider.getNamespaceUtilization("lab"), {"fallback": {}})
+        self.assertEqual(api.calls, 1)
+
+        # Still down: the next wait doubles
+        self.now += 1
+        with self.assertLogs("NautilusBot", "ERROR"):
+            provider.getNamespaceUtilization("lab")
+        self.assertEqual(provider.retryAt, self.now + 2 * METRICS_API_RETRY_SECONDS)
+
+        # Back up: live usage again, and the backoff resets
+        self.now = provider.retryAt
+        self.assertIn("a", provider.getNamespaceUtilization("lab"))
+        self.assertEqual(api.calls, 3)
+        self.assertEqual(provider.retryDelay, METRICS_API_RETRY_SECONDS)
+
+    def test_backoff_is_capped(self):
+        provider = self.provider(FakeMetricsApi([404] * 20))
+        with self.assertLogs("NautilusBot", "ERROR"):
+            for _ in range(20):
+                self.now = provider.retryAt
+                provider.getNamespaceUtilization("lab")
+        self.assertEqual(provider.retryDelay, METRICS_API_MAX_RETRY_SECONDS)
+
+    def test_other_errors_are_raised(self):
+        provider = self.provider(FakeMetricsApi([500]))
+        with self.assertRaises(ApiException):
+            provider.getNamespaceUtilization("lab")
+        provider.fetchFromKubectl.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
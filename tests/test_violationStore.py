@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+from contextlib import closing
+from datetime import datetime, timedelta
+
+import utils.violationStore
+from utils.config import WEEKLY_VIOLATION_ALERT_THRESHOLD
+from utils.trackViolations import trackRunViolations
+from utils.violationStore import ViolationStore
+
+class ViolationStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = ViolationStore(os.path.join(self.directory.name, "violations.db"))
+        self.now = datetime.utcnow()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def rowCount(self):
+        with closing(self.store.connect()) as connection:
+            return connection.execute("SELECT COUNT(*) FROM violations").fetchone()[0]
+
+    def test_records_counts_per_uid_and_namespace(self):
+        self.store.recordViolations([
+            ("uid-a", "lab", "a", ["GPU_UNDERUTILIZED", "AGE_LIMIT_APPROACHING"]),
+            ("uid-b", "lab", "b", []),
+            ("uid-c", "other", "c", ["GPU_UNDERUTILIZED"]),
+        ])
+        self.store.recordViolations([("uid-a", "lab", "a", ["GPU_UNDERUTILIZED"])])
+
+        self.assertEqual(self.store.activeDays(), {
+            "uid-a": {"GPU_UNDERUTILIZED": 1, "AGE_LIMIT_APPROACHING": 1},
+            "uid-c": {"GPU_UNDERUTILIZED": 1},
+        })
+        self.assertEqual(self.store.countsByNamespace(), {
+            "lab": {"GPU_UNDERUTILIZED": 2, "AGE_LIMIT_APPROACHING": 1},
+            "other": {"GPU_UNDERUTILIZED": 1},
+        })
+
+    def test_rows_past_retention_are_dropped(self):
+        for daysAgo in (30, 8, 6):
+            self.store.recordViolations([("uid-a", "lab", "a", ["GPU_UNDERUTILIZED"])],
+                                        timestamp=(self.now - timedelta(days=daysAgo)).isoformat())
+        self.store.recordViolations([("uid-a", "lab", "a", ["GPU_UNDERUTILIZED"])])
+
+        self.assertEqual(self.rowCount(), 2)
+        self.assertEqual(self.store.activeDays(), {"uid-a": {"GPU_UNDERUTILIZED": 2}})
+        # All-time totals are kept
+        self.assertEqual(self.store.totalCounts("uid-a"), {"GPU_UNDERUTILIZED": 4})
+
+    def test_legacy_json_is_imported_once(self):
+        path = os.path.join(self.directory.name, "violationsByUid.json")
+        with open(path, "w") as file:
+            json.dump({"uid-a": {
+                "namespace": "lab",
+                "name": "a",
+                "violations": [{"timestamp": self.now.isoformat(), "type": "GPU_UNDERUTILIZED"}],
+                "totalCounts": {"GPU_UNDERUTILIZED": 5},
+            }}, file)
+
+        self.assertEqual(self.store.importLegacyJson(path), 1)
+        self.assertEqual(self.store.importLegacyJson(path), 0)
+        self.assertEqual(ViolationStore(self.store.path).importLegacyJson(path), 0)
+        self.assertEqual(self.store.totalCounts("uid-a"), {"GPU_UNDERUTILIZED": 5})
+        self.assertEqual(self.rowCount(), 1)
+
+class WeeklyAlertTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = ViolationStore(os.path.join(self.directory.name, "violations.db"))
+        self.previousStore, utils.violationStore._store = utils.violationStore._store, self.store
+        self.resource = {"uid": "uid-a", "namespace": "lab", "name": "a", "violations": ["GPU_UNDERUTILIZED"]}
+
+    def tearDown(self):
+        utils.violationStore._store = self.previousStore
+        self.directory.cleanup()
+
+    def alerts(self, runs):
+        with self.assertLogs("NautilusBot", "INFO") as logs:
+            for _ in range(runs):
+                trackRunViolations([self.resource])
+            logging.getLogger("NautilusBot").info("done")
+        return [record for record in logs.records if record.levelno == logging.CRITICAL]
+
+    def test_frequent_runs_within_a_day_do_not_alert(self):
+        self.assertEqual(self.alerts(10 * WEEKLY_VIOLATION_ALERT_THRESHOLD), [])
+
+    def test_alerts_once_a_day_after_enough_days(self):
+        for daysAgo in range(1, WEEKLY_VIOLATION_ALERT_THRESHOLD):
+            self.store.recordViolations([("uid-a", "lab", "a", ["GPU_UNDERUTILIZED"])],
+                                        timestamp=(datetime.utcnow() - timedelta(days=daysAgo)).isoformat())
+        alerts = self.alerts(5)
+        self.assertEqual(len(alerts), 1)
+        self.assertIn(f"on {WEEKLY_VIOLATION_ALERT_THRESHOLD} days", alerts[0].getMessage())
+
+if __name__ == "__main__":
+    unittest.main()
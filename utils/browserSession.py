@@ -0,0 +1,190 @@
+import atexit
+import os
+import threading
+from queue import Queue, Empty
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
+from utils.config import (
+    GRAFANA_CHROMEDRIVER_PATH, GRAFANA_DRIVER_CACHE_FILE, GRAFANA_BROWSER_PROFILE_DIR,
+    GRAFANA_RECYCLE_PAGES, GRAFANA_PAGE_TIMEOUT,
+)
+from utils.logger import logger
+
+_driverPathLock = threading.Lock()
+_driverPath = None
+_driverPathCached = False
+
+def resolveDriverPath():
+    """Find the chromedriver binary once per process, without the network when possible.
+
+    Order: the pinned GRAFANA_CHROMEDRIVER_PATH, the path cached by an earlier run,
+    then webdriver_manager (which checks versions online) as a last resort.
+    """
+    global _driverPath, _driverPathCached
+    with _driverPathLock:
+        if _driverPath:
+            return _driverPath
+        if GRAFANA_CHROMEDRIVER_PATH:
+            if not os.path.exists(GRAFANA_CHROMEDRIVER_PATH):
+                raise FileNotFoundError(f"Pinned chromedriver not found at '{GRAFANA_CHROMEDRIVER_PATH}'")
+            _driverPath = GRAFANA_CHROMEDRIVER_PATH
+            return _driverPath
+        if os.path.exists(GRAFANA_DRIVER_CACHE_FILE):
+            with open(GRAFANA_DRIVER_CACHE_FILE, "r") as file:
+                cachedPath = file.read().strip()
+            if os.path.exists(cachedPath):
+                _driverPath = cachedPath
+                _driverPathCached = True
+                return _driverPath
+
+        from webdriver_manager.chrome import ChromeDriverManager
+        _driverPath = ChromeDriverManager().install()
+        os.makedirs(os.path.dirname(GRAFANA_DRIVER_CACHE_FILE) or ".", exist_ok=True)
+        with open(GRAFANA_DRIVER_CACHE_FILE, "w") as file:
+            file.write(_driverPath)
+        logger.info(f"Resolved chromedriver at '{_driverPath}' and cached its path")
+        return _driverPath
+
+def forgetCachedDriverPath(path):
+    """Drop a cached chromedriver path that failed, so the next resolve asks webdriver_manager again.
+
+    Returns False when `path` was not taken from the cache (it is pinned or
+    was just resolved), as resolving again would give the same driver.
+    """
+    global _driverPath, _driverPathCached
+    with _driverPathLock:
+        if _driverPath != path:
+            return True  # Another session already dropped it
+        if not _driverPathCached:
+            return False
+        _driverPath = None
+        _driverPathCached = False
+        try:
+            os.remove(GRAFANA_DRIVER_CACHE_FILE)
+        except FileNotFoundError:
+            pass
+        return True
+
+def createDriver(profileDir=None):
+    """Start a headless Chrome driver."""
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")  # Enable headless mode; remove for debugging
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--window-size=1920,1080")
+    chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/113.0.0.0 Safari/537.36")
+    if profileDir:
+        # A persistent profile keeps the Grafana login cookies across browser restarts
+        chrome_options.add_argument(f"--user-data-dir={profileDir}")
+
+    driverPath = resolveDriverPath()
+    try:
+        driver = webdriver.Chrome(service=Service(driverPath), options=chrome_options)
+    except WebDriverException as e:
+        # A cached driver no longer matches Chrome after a browser update
+        if not forgetCachedDriverPath(driverPath):
+            raise
+        logger.warning(f"Cached chromedriver '{driverPath}' could not start a session ({e.msg}); resolving it again")
+        driver = webdriver.Chrome(service=Service(resolveDriverPath()), options=chrome_options)
+    driver.set_page_load_timeout(GRAFANA_PAGE_TIMEOUT * 3)
+    return driver
+
+class BrowserSession:
+    """A long-lived browser that is health-checked before use and recycled after N pages."""
+
+    def __init__(self, index, recycleAfter=GRAFANA_RECYCLE_PAGES, profileDir=GRAFANA_BROWSER_PROFILE_DIR):
+        self.index = index
+        self.recycleAfter = recycleAfter
+        # Chrome locks its profile directory, so every session gets its own
+        self.profileDir = os.path.join(profileDir, f"session-{index}") if profileDir else None
+        self.driver = None
+        self.pagesLoaded = 0
+
+    def start(self):
+        self.driver = createDriver(self.profileDir)
+        self.pagesLoaded = 0
+        logger.info(f"Started browser session {self.index}")
+
+    def quit(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except WebDriverException:
+                pass
+            self.driver = None
+
+    def healthy(self):
+        if self.driver is None:
+            return False
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except WebDriverException:
+            return False
+
+    def acquire(self):
+        """Return a working driver, restarting the browser when it is dead or due for recycling."""
+        if self.driver is not None and self.recycleAfter and self.pagesLoaded >= self.recycleAfter:
+            logger.info(f"Recycling browser session {self.index} after {self.pagesLoaded} pages")
+            self.quit()
+        elif self.driver is not None and not self.healthy():
+            logger.warning(f"Browser session {self.index} is unresponsive; restarting it")
+            self.quit()
+        if self.driver is None:
+            self.start()
+        self.pagesLoaded += 1
+        return self.driver
+
+class BrowserPool:
+    """Warm browser sessions shared by every scrape cycle of the process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.sessions = []
+        self.idle = Queue()
+
+    def ensureSize(self, size):
+        """Grow the pool to `size` sessions; browsers start lazily on first use."""
+        with self.lock:
+            while len(self.sessions) < size:
+                session = BrowserSession(len(self.sessions))
+                self.sessions.append(session)
+                self.idle.put(session)
+
+    def checkout(self):
+        return self.idle.get()
+
+    def checkin(self, session):
+        self.idle.put(session)
+
+    def close(self):
+        with self.lock:
+            while True:
+                try:
+                    self.idle.get_nowait()
+                except Empty:
+                    break
+            for session in self.sessions:
+                session.quit()
+            self.sessions = []
+
+_pool = None
+_poolLock = threading.Lock()
+
+def getBrowserPool(size):
+    """Return the process-wide browser pool with at least `size` sessions."""
+    global _pool
+    with _poolLock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(closeBrowserPool)
+    _pool.ensureSize(size)
+    return _pool
+
+def closeBrowserPool():
+    global _pool
+    with _poolLock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -1,153 +1,191 @@
-import os
-import json
-import re
-from datetime import datetime, timedelta
-from kubernetes import client, config
+import argparse
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from kubernetes.client import V1DeleteOptions, V1Preconditions
+from kubernetes.client.rest import ApiException
+from utils.kubeClient import coreV1Api, batchV1Api, appsV1Api
+from utils.config import ENFORCEMENT_MAX_WORKERS, ENFORCEMENT_RATE_PER_SECOND, ENFORCEMENT_ESTIMATED_CALL_SECONDS
+from utils.metricsExporter import CLEANUP_ACTIONS, writeMetricsFile
+from utils.rateLimiter import RateLimiter
+from utils.violationAggregator import loadAggregates
 from utils.logger import logger
 
-LOGS_DIR = "logs/dailyLogs"
-VIOLATIONS_FILE = "logs/violations/violationsByUid.json"
-WARNING_THRESHOLD = 3
+# Evidence is counted in distinct hours with a violation, not in events: the
+# daemon polls every minute when violations rise, so event counts would
+# depend on the polling rate rather than on how long a problem lasted.
+WARNING_HOURS = 3
+UNDERUTILIZED_DELETE_HOURS = 6
+AGE_EVIDENCE_HOURS = 2
 CRITICAL_GPU_THRESHOLD = 2
 AGE_THRESHOLD = 14  # days
 ALERT_WARNING_AGE = 12  # days
 
-def loadViolations():
-    """Load violations from the violations JSON file."""
-    if not os.path.exists(VIOLATIONS_FILE):
-        return {}
-    with open(VIOLATIONS_FILE, "r") as file:
-        return json.load(file)
-
-def saveViolations(data):
-    """Save updated violations back to the JSON file."""
-    with open(VIOLATIONS_FILE, "w") as file:
-        json.dump(data, file, indent=4)
-
-def loadLogs():
-    """Load all logs from the past week."""
-    logs = []
-    one_week_ago = datetime.utcnow() - timedelta(weeks=1)
-    for filename in os.listdir(LOGS_DIR):
-        if filename.startswith("daily_log_") and filename.endswith(".log"):
-            file_date_str = filename.split("_")[2].replace(".log", "")
-            file_date = datetime.strptime(file_date_str, "%Y-%m-%d")
-            if file_date >= one_week_ago:
-                with open(os.path.join(LOGS_DIR, filename), "r") as log_file:
-                    logs.extend(log_file.readlines())
-    return logs
-
-def parseLogs(logs):
-    """Parse logs to extract violations."""
-    resources = {"pods": [], "jobs": [], "deployments": []}
-    for line in logs:
-        if "WARNING: Pod" in line or "CRITICAL: Pod" in line:
-            resources["pods"].append(line)
-        elif "WARNING: Job" in line or "CRITICAL: Job" in line:
-            resources["jobs"].append(line)
-        elif "WARNING: Deployment" in line or "CRITICAL: Deployment" in line:
-            resources["deployments"].append(line)
-    return resources
-
-def deletePod(namespace, pod_name):
+class EnforcementClients:
+    """API clients shared by every action of a cleanup run."""
+
+    def __init__(self):
+        self.coreV1 = coreV1Api()
+        self.batchV1 = batchV1Api()
+        self.appsV1 = appsV1Api()
+
+def uidPrecondition(uid):
+    """Delete options that make the API server refuse if the name now belongs to a different object."""
+    return V1DeleteOptions(preconditions=V1Preconditions(uid=uid))
+
+def deletePod(clients, namespace, pod_name, uid):
     """Delete a pod."""
-    config.load_kube_config()
-    v1 = client.CoreV1Api()
-    try:
-        logger.info(f"Deleting pod '{pod_name}' in namespace '{namespace}'...")
-        v1.delete_namespaced_pod(name=pod_name, namespace=namespace)
-        logger.info(f"Pod '{pod_name}' deleted successfully.")
-    except Exception as e:
-        logger.error(f"Failed to delete pod '{pod_name}': {e}")
+    clients.coreV1.delete_namespaced_pod(name=pod_name, namespace=namespace, body=uidPrecondition(uid))
 
-def deleteJob(namespace, job_name):
+def deleteJob(clients, namespace, job_name, uid):
     """Delete a job."""
-    config.load_kube_config()
-    batch_v1 = client.BatchV1Api()
-    try:
-        logger.info(f"Deleting job '{job_name}' in namespace '{namespace}'...")
-        batch_v1.delete_namespaced_job(name=job_name, namespace=namespace)
-        logger.info(f"Job '{job_name}' deleted successfully.")
-    except Exception as e:
-        logger.error(f"Failed to delete job '{job_name}': {e}")
+    clients.batchV1.delete_namespaced_job(name=job_name, namespace=namespace, body=uidPrecondition(uid))
 
-def deleteDeployment(namespace, deployment_name):
+def deleteDeployment(clients, namespace, deployment_name, uid):
     """Delete a deployment."""
-    config.load_kube_config()
-    apps_v1 = client.AppsV1Api()
-    try:
-        logger.info(f"Deleting deployment '{deployment_name}' in namespace '{namespace}'...")
-        apps_v1.delete_namespaced_deployment(name=deployment_name, namespace=namespace)
-        logger.info(f"Deployment '{deployment_name}' deleted successfully.")
-    except Exception as e:
-        logger.error(f"Failed to delete deployment '{deployment_name}': {e}")
+    clients.appsV1.delete_namespaced_deployment(name=deployment_name, namespace=namespace, body=uidPrecondition(uid))
 
-def scaleDownDeployment(namespace, deployment_name):
+def scaleDownDeployment(clients, namespace, deployment_name, uid):
     """Scale down a deployment to zero replicas."""
-    config.load_kube_config()
-    apps_v1 = client.AppsV1Api()
+    # A JSON patch fails as a whole when its test op does, so a recreated deployment is left alone
+    patch_body = [
+        {"op": "test", "path": "/metadata/uid", "value": uid},
+        {"op": "replace", "path": "/spec/replicas", "value": 0},
+    ]
+    clients.appsV1.patch_namespaced_deployment(name=deployment_name, namespace=namespace, body=patch_body)
+
+ACTIONS = {
+    ("Pod", "delete"): deletePod,
+    ("Job", "delete"): deleteJob,
+    ("Deployment", "delete"): deleteDeployment,
+    ("Deployment", "scaleDown"): scaleDownDeployment,
+}
+
+# Statuses meaning the name now belongs to a newer object than the planned UID:
+# a failed delete precondition is a conflict, a failed JSON patch test op is invalid
+REPLACED_STATUSES = {"delete": 409, "scaleDown": 422}
+
+def lastAge(entry):
+    return entry["lastValues"].get("AGE_LIMIT_APPROACHING", {}).get("ageDays", 0)
+
+def lastRequestedGpus(entry):
+    return entry["lastValues"].get("GPU_REQUEST_EXCEEDED", {}).get("requestedGpus", 0)
+
+def agedOut(entry, hours, ageDays):
+    """The resource was over the age limit in at least two separate hours and is now `ageDays` old."""
+    return hours.get("AGE_LIMIT_APPROACHING", 0) >= AGE_EVIDENCE_HOURS and lastAge(entry) >= ageDays
+
+# Threshold policies evaluated against the hours with violations in the window, strongest first.
+# Each is (action, kinds, predicate(entry, hours)).
+POLICIES = [
+    ("delete", {"Pod"}, lambda entry, hours: hours.get("GPU_UNDERUTILIZED", 0) >= UNDERUTILIZED_DELETE_HOURS),
+    ("delete", {"Job", "Deployment"}, lambda entry, hours: agedOut(entry, hours, AGE_THRESHOLD)),
+    ("scaleDown", {"Deployment"}, lambda entry, hours: agedOut(entry, hours, ALERT_WARNING_AGE)),
+    ("notify", {"Pod"}, lambda entry, hours: lastRequestedGpus(entry) > CRITICAL_GPU_THRESHOLD),
+    ("notify", {"Pod", "Job", "Deployment"}, lambda entry, hours: any(count >= WARNING_HOURS for count in hours.values())),
+]
+
+def decideAction(entry, hours):
+    """Return the first policy action matching a UID's hours with violations, or None."""
+    for action, kinds, predicate in POLICIES:
+        if entry["kind"] in kinds and predicate(entry, hours):
+            return action
+    return None
+
+def buildPlan(aggregator):
+    """Evaluate the policies once per UID and collect the resulting actions."""
+    plan = []
+    for uid, entry in aggregator.resources.items():
+        counts = aggregator.counts(uid)
+        action = decideAction(entry, aggregator.activeHours(uid))
+        if action is None:
+            continue
+        plan.append({
+            "uid": uid,
+            "kind": entry["kind"],
+            "namespace": entry["namespace"],
+            "name": entry["name"],
+            "action": action,
+            "codes": set(counts),
+            "events": sum(counts.values()),
+        })
+    return plan
+
+def estimatePlanSeconds(actions, maxWorkers=ENFORCEMENT_MAX_WORKERS, ratePerSecond=ENFORCEMENT_RATE_PER_SECOND):
+    """Estimate how long executing the API actions would take."""
+    if not actions:
+        return 0.0
+    concurrencyBound = math.ceil(len(actions) / maxWorkers) * ENFORCEMENT_ESTIMATED_CALL_SECONDS
+    rateBound = (len(actions) - 1) / ratePerSecond if ratePerSecond else 0.0
+    return max(concurrencyBound, rateBound)
+
+def executeAction(clients, limiter, entry):
+    """Run one planned action against the planned UID only; a 404 means the resource is already gone."""
+    limiter.acquire()
+    label = f"{entry['kind']} '{entry['name']}' in namespace '{entry['namespace']}'"
     try:
-        logger.info(f"Scaling down deployment '{deployment_name}' in namespace '{namespace}'...")
-        patch_body = {"spec": {"replicas": 0}}
-        apps_v1.patch_namespaced_deployment(name=deployment_name, namespace=namespace, body=patch_body)
-        logger.info(f"Deployment '{deployment_name}' scaled down successfully.")
+        logger.info(f"Applying '{entry['action']}' to {label}...")
+        ACTIONS[(entry["kind"], entry["action"])](clients, entry["namespace"], entry["name"], entry["uid"])
+        logger.info(f"{label} handled successfully.")
+        return "done"
+    except ApiException as e:
+        if e.status == 404:
+            logger.info(f"{label} no longer exists; nothing to do.")
+            return "alreadyGone"
+        if e.status == REPLACED_STATUSES[entry["action"]]:
+            logger.info(f"{label} was already replaced by a new object with the same name; leaving it alone.")
+            return "alreadyReplaced"
+        logger.error(f"Failed to apply '{entry['action']}' to {label}: {e}")
+        return "failed"
     except Exception as e:
-        logger.error(f"Failed to scale down deployment '{deployment_name}': {e}")
+        logger.error(f"Failed to apply '{entry['action']}' to {label}: {e}")
+        return "failed"
+
+def executePlan(plan, dryRun=False, maxWorkers=ENFORCEMENT_MAX_WORKERS, ratePerSecond=ENFORCEMENT_RATE_PER_SECOND, clients=None):
+    """Execute a plan with bounded concurrency and a client-side rate limit."""
+    actions = [entry for entry in plan if entry["action"] != "notify"]
+    for entry in plan:
+        if entry["action"] == "notify":
+            logger.warning(f"{entry['kind']} '{entry['name']}' in namespace '{entry['namespace']}' will not be deleted but needs attention ({', '.join(sorted(entry['codes']))}).")
+
+    estimate = estimatePlanSeconds(actions, maxWorkers, ratePerSecond)
+    if dryRun:
+        print(f"Enforcement plan: {len(actions)} actions for {len(plan)} UIDs (estimated {estimate:.1f}s)")
+        for entry in actions:
+            print(f"  {entry['action']:<10} {entry['kind']:<11} {entry['namespace']}/{entry['name']} "
+                  f"({entry['events']} events: {', '.join(sorted(entry['codes']))})")
+        return {}
 
-def processViolations(violations, parsed_logs):
+    outcomes = {"done": 0, "alreadyGone": 0, "alreadyReplaced": 0, "failed": 0}
+    if not actions:
+        return outcomes
+
+    clients = clients or EnforcementClients()
+    limiter = RateLimiter(ratePerSecond)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+        for entry, outcome in zip(actions, executor.map(lambda entry: executeAction(clients, limiter, entry), actions)):
+            outcomes[outcome] += 1
+            CLEANUP_ACTIONS.inc(action=entry["action"], outcome=outcome)
+    logger.info(f"Executed {len(actions)} actions in {time.perf_counter() - start:.1f}s (estimated {estimate:.1f}s): {outcomes}")
+    return outcomes
+
+def processViolations(aggregator, dryRun=False):
     """Process violations and take action."""
-    for pod in parsed_logs["pods"]:
-        namespace = extractNamespace(pod)
-        pod_name = extractResourceName(pod)
-        if isCriticalViolation(pod):
-            deletePod(namespace, pod_name)
-        else:
-            logger.warning(f"Pod '{pod_name}' in namespace '{namespace}' will not be deleted but needs attention.")
-
-    for job in parsed_logs["jobs"]:
-        namespace = extractNamespace(job)
-        job_name = extractResourceName(job)
-        if isCriticalViolation(job):
-            deleteJob(namespace, job_name)
-        else:
-            logger.warning(f"Job '{job_name}' in namespace '{namespace}' will not be deleted but needs attention.")
-
-    for deployment in parsed_logs["deployments"]:
-        namespace = extractNamespace(deployment)
-        deployment_name = extractResourceName(deployment)
-        if isCriticalViolation(deployment):
-            deleteDeployment(namespace, deployment_name)
-        elif isApproachingThreshold(deployment):
-            scaleDownDeployment(namespace, deployment_name)
-
-def isCriticalViolation(resource_line):
-    """Determine if a resource has a critical violation."""
-    return "GPU underutilized" in resource_line or "exceeds threshold" in resource_line
-
-def isApproachingThreshold(resource_line):
-    """Determine if a resource is approaching critical age threshold."""
-    return f"Age: {ALERT_WARNING_AGE}" in resource_line
-
-def extractNamespace(log_line):
-    """Extract namespace from log line."""
-    match = re.search(r"namespace '([\w\-]+)'", log_line)
-    return match.group(1) if match else None
-
-def extractResourceName(log_line):
-    """Extract resource name from log line."""
-    match = re.search(r"Pod '([\w\-]+)'|Job '([\w\-]+)'|Deployment '([\w\-]+)'", log_line)
-    for group in match.groups():
-        if group:
-            return group
-    return None
+    start = time.perf_counter()
+    plan = buildPlan(aggregator)
+    logger.info(f"Evaluated policies for {len(aggregator.resources)} UIDs in {(time.perf_counter() - start) * 1000:.1f}ms")
+    return executePlan(plan, dryRun=dryRun)
 
-def main():
+def main(dryRun=False):
     logger.info("Starting resource cleanup...")
-    logs = loadLogs()
-    parsed_logs = parseLogs(logs)
-    violations = loadViolations()
-    processViolations(violations, parsed_logs)
+    aggregator = loadAggregates()
+    processViolations(aggregator, dryRun=dryRun)
+    writeMetricsFile("nautilus_cleanup")
     logger.info("Resource cleanup completed.")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Clean up resources with repeated violations.")
+    parser.add_argument("--dry-run", action="store_true", help="Print the enforcement plan without applying it.")
+    args = parser.parse_args()
+    main(dryRun=args.dry_run)
@@ -0,0 +1,135 @@
+import os
+
+# Settings can be overridden through environment variables so the bot can be
+# pointed at a different cluster or backend without code edits.
+
+def envList(name, default):
+    """Read a comma-separated list from the environment."""
+    value = os.environ.get(name)
+    if not value:
+        return list(default)
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def envInt(name, default):
+    """Read an integer from the environment."""
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+def envFloat(name, default):
+    """Read a float from the environment."""
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+# GPU metrics backend: "grafana" (Selenium dashboard scrape) or "prometheus"
+GPU_METRICS_BACKEND = os.environ.get("NAUTILUS_GPU_METRICS_BACKEND", "grafana")
+GPU_METRICS_CACHE_FILE = os.environ.get("NAUTILUS_GPU_METRICS_CACHE_FILE", "logs/gpuMetrics/snapshots.json")
+GPU_METRICS_CACHE_TTL = envFloat("NAUTILUS_GPU_METRICS_CACHE_TTL", 30.0)  # Seconds a snapshot is reused; 0 disables the cache
+
+# Prometheus-compatible query endpoint used by the "prometheus" backend
+PROMETHEUS_URL = os.environ.get("NAUTILUS_PROMETHEUS_URL", "https://prometheus.nrp-nautilus.io")
+PROMETHEUS_CA_BUNDLE = os.environ.get("NAUTILUS_PROMETHEUS_CA_BUNDLE")  # e.g., "cilogon.org.pem"
+PROMETHEUS_TIMEOUT = envFloat("NAUTILUS_PROMETHEUS_TIMEOUT", 30.0)
+PROMETHEUS_POOL_SIZE = envInt("NAUTILUS_PROMETHEUS_POOL_SIZE", 4)
+
+# Grafana dashboard scraped by the "grafana" backend
+GRAFANA_DASHBOARD_URL = os.environ.get(
+    "NAUTILUS_GRAFANA_DASHBOARD_URL",
+    "https://grafana.nrp-nautilus.io/d/dRG9q0Ymz/k8s-compute-resources-namespace-gpus?orgId=1&refresh=30s&var-namespace=",
+)
+GRAFANA_SCRAPE_WORKERS = envInt("NAUTILUS_GRAFANA_SCRAPE_WORKERS", 4)  # Browsers loading namespaces in parallel
+GRAFANA_PAGE_TIMEOUT = envFloat("NAUTILUS_GRAFANA_PAGE_TIMEOUT", 10.0)  # Seconds to wait for panels to render
+GRAFANA_DOM_QUIET_MS = envInt("NAUTILUS_GRAFANA_DOM_QUIET_MS", 300)  # DOM idle time that counts as "rendered"
+
+# CSS selectors of the dashboard panels; Grafana generates its class names, so they may change with upgrades
+GRAFANA_ROW_SELECTOR = os.environ.get("NAUTILUS_GRAFANA_ROW_SELECTOR", "div.css-8fjwhi-row")
+GRAFANA_CELL_SELECTOR = os.environ.get("NAUTILUS_GRAFANA_CELL_SELECTOR", 'div[class*="cellContainerOverflow"]')
+GRAFANA_GAUGE_SELECTOR = os.environ.get("NAUTILUS_GRAFANA_GAUGE_SELECTOR", "span#flotGaugeValue")
+GRAFANA_NO_DATA_SELECTOR = os.environ.get("NAUTILUS_GRAFANA_NO_DATA_SELECTOR", ".css-1k75hwm")
+
+# Browser sessions kept warm across scrape cycles
+GRAFANA_CHROMEDRIVER_PATH = os.environ.get("NAUTILUS_GRAFANA_CHROMEDRIVER_PATH")  # Pinned driver; skips webdriver_manager entirely
+GRAFANA_DRIVER_CACHE_FILE = os.environ.get("NAUTILUS_GRAFANA_DRIVER_CACHE_FILE", "logs/browser/chromedriver.path")
+GRAFANA_BROWSER_PROFILE_DIR = os.environ.get("NAUTILUS_GRAFANA_BROWSER_PROFILE_DIR")  # Persistent profiles keep the login
+GRAFANA_RECYCLE_PAGES = envInt("NAUTILUS_GRAFANA_RECYCLE_PAGES", 200)  # Restart a browser after this many pages; 0 = never
+
+# Violation history
+VIOLATIONS_DB = os.environ.get("NAUTILUS_VIOLATIONS_DB", "logs/violations/violations.db")
+LEGACY_VIOLATIONS_FILE = "logs/violations/violationsByUid.json"
+WEEKLY_VIOLATION_ALERT_THRESHOLD = envInt("NAUTILUS_WEEKLY_VIOLATION_ALERT_THRESHOLD", 3)
+
+# Maximum number of namespace tasks the pipeline runs at once
+PIPELINE_MAX_WORKERS = envInt("NAUTILUS_PIPELINE_MAX_WORKERS", 8)
+
+# Listing: page size, opt-out label and when to use one all-namespaces call
+LIST_PAGE_SIZE = envInt("NAUTILUS_LIST_PAGE_SIZE", 500)
+OPT_OUT_LABEL = os.environ.get("NAUTILUS_OPT_OUT_LABEL", "nautilus-bot/ignore")
+LIST_CLUSTER_WIDE_MIN_NAMESPACES = envInt("NAUTILUS_LIST_CLUSTER_WIDE_MIN_NAMESPACES", 20)
+
+# Structured violation events
+CLUSTER_NAME = os.environ.get("NAUTILUS_CLUSTER_NAME", "nautilus")
+EVENTS_DIR = os.environ.get("NAUTILUS_EVENTS_DIR", "logs/events")
+
+# Per-run snapshots of every monitored resource (the log only carries summaries)
+RUN_SNAPSHOTS_DIR = os.environ.get("NAUTILUS_RUN_SNAPSHOTS_DIR", "logs/runs")
+RUN_SNAPSHOT_COMPRESS = os.environ.get("NAUTILUS_RUN_SNAPSHOT_COMPRESS", "1") == "1"
+
+# Cleanup enforcement
+ENFORCEMENT_MAX_WORKERS = envInt("NAUTILUS_ENFORCEMENT_MAX_WORKERS", 4)
+ENFORCEMENT_RATE_PER_SECOND = envFloat("NAUTILUS_ENFORCEMENT_RATE_PER_SECOND", 5.0)
+ENFORCEMENT_ESTIMATED_CALL_SECONDS = envFloat("NAUTILUS_ENFORCEMENT_ESTIMATED_CALL_SECONDS", 0.2)  # Used for dry-run estimates
+
+# Sliding-window violation aggregates used for cleanup decisions
+AGGREGATES_FILE = os.environ.get("NAUTILUS_AGGREGATES_FILE", "logs/violations/aggregates.json")
+AGGREGATE_WINDOW_HOURS = envInt("NAUTILUS_AGGREGATE_WINDOW_HOURS", 7 * 24)
+
+# Reports are built from per-day violation aggregates
+REPORT_AGGREGATES_DIR = os.environ.get("NAUTILUS_REPORT_AGGREGATES_DIR", "logs/reports")
+REPORT_FORMATS = envList("NAUTILUS_REPORT_FORMATS", ["text"])  # Any of "text", "json", "csv"
+REPORT_FINALIZE_GRACE_HOURS = envFloat("NAUTILUS_REPORT_FINALIZE_GRACE_HOURS", 6.0)  # Quiet time before a past day is frozen
+
+# Shared Kubernetes API client
+KUBE_POOL_MAXSIZE = envInt("NAUTILUS_KUBE_POOL_MAXSIZE", 16)  # Parallel connections to the API server
+KUBE_CONNECT_TIMEOUT = envFloat("NAUTILUS_KUBE_CONNECT_TIMEOUT", 5.0)
+KUBE_READ_TIMEOUT = envFloat("NAUTILUS_KUBE_READ_TIMEOUT", 60.0)
+KUBE_TCP_KEEPALIVE = os.environ.get("NAUTILUS_KUBE_TCP_KEEPALIVE", "1") == "1"
+
+# Optional JSON file replacing the default check rules (see checks/ruleEngine.py); validated on load
+RULES_FILE = os.environ.get("NAUTILUS_RULES_FILE")
+
+# Per-pod utilization history (memory-mapped ring buffer) used for windowed underutilization checks
+UTILIZATION_HISTORY_FILE = os.environ.get("NAUTILUS_UTILIZATION_HISTORY_FILE", "logs/utilization/history.dat")
+UTILIZATION_HISTORY_SLOTS = envInt("NAUTILUS_UTILIZATION_HISTORY_SLOTS", 288)  # Time buckets spanning the window per pod
+UTILIZATION_HISTORY_MAX_PODS = envInt("NAUTILUS_UTILIZATION_HISTORY_MAX_PODS", 4096)
+UTILIZATION_WINDOW_HOURS = envFloat("NAUTILUS_UTILIZATION_WINDOW_HOURS", 6.0)
+
+# Namespaces to monitor: a fixed list, or every namespace matching a label selector when one is set
+NAMESPACES = envList("NAUTILUS_NAMESPACES", ["gilpin-lab", "aiea-auditors", "aiea-interns"])
+NAMESPACE_LABEL_SELECTOR = os.environ.get("NAUTILUS_NAMESPACE_LABEL_SELECTOR")  # e.g., "nautilus-bot/monitor=true"
+NAMESPACE_REFRESH_SECONDS = envFloat("NAUTILUS_NAMESPACE_REFRESH_SECONDS", 600.0)
+
+# Daemon mode: per-(namespace, stage) polling intervals adapt between these bounds
+DAEMON_MIN_INTERVAL = envFloat("NAUTILUS_DAEMON_MIN_INTERVAL", 60.0)
+DAEMON_BASE_INTERVAL = envFloat("NAUTILUS_DAEMON_BASE_INTERVAL", 300.0)
+DAEMON_MAX_INTERVAL = envFloat("NAUTILUS_DAEMON_MAX_INTERVAL", 1800.0)
+DAEMON_JITTER = envFloat("NAUTILUS_DAEMON_JITTER", 0.1)  # Fraction of the interval added or removed at random
+
+# Worker processes the namespaces are sharded over (0 or 1 runs everything in this process)
+SHARD_WORKERS = envInt("NAUTILUS_SHARD_WORKERS", 0)
+
+# Prometheus metrics about the bot itself: served over HTTP (daemon) and/or written for node_exporter's textfile collector
+METRICS_PORT = envInt("NAUTILUS_METRICS_PORT", 0)  # 0 disables the endpoint
+METRICS_ADDRESS = os.environ.get("NAUTILUS_METRICS_ADDRESS", "0.0.0.0")
+METRICS_TEXTFILE_DIR = os.environ.get("NAUTILUS_METRICS_TEXTFILE_DIR")  # e.g., "/var/lib/node_exporter/textfile"
+
+# Opt-in tracing (Chrome trace-event JSON per run) and profiling ("cprofile" or "sample")
+TRACE_ENABLED = os.environ.get("NAUTILUS_TRACE", "0") == "1"
+TRACE_DIR = os.environ.get("NAUTILUS_TRACE_DIR", "logs/traces")
+PROFILE_MODE = os.environ.get("NAUTILUS_PROFILE") or None
+PROFILE_SAMPLE_INTERVAL = envFloat("NAUTILUS_PROFILE_SAMPLE_INTERVAL", 0.005)  # Seconds between stack samples
+
+# Logging; records are written by a background thread
+LOG_LEVEL = os.environ.get("NAUTILUS_LOG_LEVEL", "INFO").upper()  # DEBUG adds tracing of report generation and caches
+LOGS_DIR = os.environ.get("NAUTILUS_LOGS_DIR", "logs/dailyLogs")
+LOG_MAX_BYTES = envInt("NAUTILUS_LOG_MAX_BYTES", 0)  # Split a day's log into parts of this size; 0 = one file per day
+LOG_COMPRESS = os.environ.get("NAUTILUS_LOG_COMPRESS", "1") == "1"  # Gzip finished days and parts
+LOG_BUFFER_BYTES = envInt("NAUTILUS_LOG_BUFFER_BYTES", 65536)
@@ -0,0 +1,109 @@
+import signal
+import sys
+import time
+from monitors.podMonitor import monitorNamespacePods
+from monitors.jobMonitor import monitorNamespaceJobs
+from monitors.deploymentMonitor import monitorNamespaceDeployments
+from utils.config import NAMESPACE_LABEL_SELECTOR, NAMESPACE_REFRESH_SECONDS
+from utils.gpuMetrics import fetchGpuMetrics
+from utils.informer import startInformers, stopInformers
+from utils.kubeClient import coreV1Api, batchV1Api, appsV1Api
+from utils.metricsExporter import STAGE_SECONDS, startMetricsServer, updateViolationGauges
+from utils.namespaces import resolveNamespaces
+from utils.scheduler import AdaptiveScheduler
+from utils.tracing import span
+from utils.trackViolations import trackRunViolations
+from utils.utilizationHistory import getUtilizationHistory
+from utils.violationEvents import writeViolationEvents
+from utils.violationStore import getViolationStore
+from utils.logger import logger
+
+STAGES = ("pods", "jobs", "deployments")
+STAGE_KINDS = {"pods": "Pod", "jobs": "Job", "deployments": "Deployment"}
+REFRESH_KEY = (None, "namespaces")
+
+class Daemon:
+    """Monitor namespaces continuously with one scheduled task per (namespace, stage)."""
+
+    def __init__(self, labelSelector=NAMESPACE_LABEL_SELECTOR):
+        self.labelSelector = labelSelector
+        self.v1 = coreV1Api()
+        self.batchV1 = batchV1Api()
+        self.appsV1 = appsV1Api()
+        self.namespaces = set()
+        self.scheduler = AdaptiveScheduler(self.runTask)
+
+    def runTask(self, key):
+        namespace, stage = key
+        if key == REFRESH_KEY:
+            self.refreshNamespaces()
+            return None
+
+        start = time.perf_counter()
+        if stage == "pods":
+            with span("gpuMetrics", namespace=namespace):
+                gpuMetrics = fetchGpuMetrics([namespace])
+            STAGE_SECONDS.observe(time.perf_counter() - start, stage="gpuMetrics", scope="namespace")
+            start = time.perf_counter()
+        with span(stage, namespace=namespace):
+            if stage == "pods":
+                resources = monitorNamespacePods(namespace, gpuMetrics, self.v1, self.appsV1)
+            elif stage == "jobs":
+                resources = monitorNamespaceJobs(namespace, self.batchV1)
+            else:
+                resources = monitorNamespaceDeployments(namespace, self.appsV1)
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage, scope="namespace")
+
+        updateViolationGauges(resources, [namespace], [STAGE_KINDS[stage]])
+        trackRunViolations(resources)
+        writeViolationEvents(resources)
+        if stage == "pods":
+            history = getUtilizationHistory()
+            history.evict()
+            history.flush()
+        return sum(len(resource["violations"]) for resource in resources)
+
+    def refreshNamespaces(self, namespaces=None):
+        """Schedule newly matching namespaces and drop the ones that disappeared."""
+        namespaces = set(namespaces if namespaces is not None else resolveNamespaces(self.labelSelector))
+        for namespace in namespaces - self.namespaces:
+            logger.info(f"Scheduling namespace '{namespace}'")
+            for stage in STAGES:
+                self.scheduler.add((namespace, stage))
+        for namespace in self.namespaces - namespaces:
+            logger.info(f"Namespace '{namespace}' is no longer monitored")
+            for stage in STAGES:
+                self.scheduler.remove((namespace, stage))
+        self.namespaces = namespaces
+
+    def handleSignal(self, signum, frame):
+        logger.info(f"Received signal {signum}; shutting down after running tasks finish...")
+        self.scheduler.stop()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.handleSignal)
+        signal.signal(signal.SIGINT, self.handleSignal)
+
+        getViolationStore()
+        startMetricsServer()
+        namespaces = resolveNamespaces(self.labelSelector)
+        # A selector can match namespaces later on, so watch cluster-wide instead of per namespace
+        startInformers(None if self.labelSelector else namespaces)
+        self.refreshNamespaces(namespaces)
+        if self.labelSelector:
+            self.scheduler.add(REFRESH_KEY, delay=NAMESPACE_REFRESH_SECONDS, interval=NAMESPACE_REFRESH_SECONDS)
+
+        logger.info(f"Daemon started for {len(self.namespaces)} namespaces.")
+        try:
+            self.scheduler.run()
+        finally:
+            stopInformers()
+            if "utils.browserSession" in sys.modules:
+                sys.modules["utils.browserSession"].closeBrowserPool()
+            history = getUtilizationHistory()
+            history.evict()
+            history.flush()
+            logger.info("Daemon stopped.")
+
+def runDaemon():
+    Daemon().run()
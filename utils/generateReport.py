@@ -1,133 +1,127 @@
-import os
+import argparse
+import csv
+import io
 import json
-from datetime import datetime, timedelta
+import os
+from datetime import datetime
+from utils.config import REPORT_FORMATS
+from utils.reportAggregates import loadDayAggregates, mergeAggregates
+from utils.violationStore import getViolationStore
 from utils.logger import logger
 
-LOGS_DIR = "logs/dailyLogs"
 REPORTS_DIR = "reports"
 
 # Ensure reports directory exists
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
-def loadDailyLogs():
-    """Load all log files from the last 7 days."""
-    log_data = []
-    one_week_ago = datetime.utcnow() - timedelta(weeks=1)
-
-    print(f"[DEBUG] Loading logs from: {LOGS_DIR}")
-    for filename in os.listdir(LOGS_DIR):
-        print(f"[DEBUG] Checking file: {filename}")
-        if filename.endswith(".log"):
-            file_date_str = filename.split("_")[-1].replace(".log", "")
-            try:
-                file_date = datetime.strptime(file_date_str, "%Y-%m-%d")
-                print(f"[DEBUG] File date: {file_date}, One week ago: {one_week_ago}")
-                if file_date >= one_week_ago:
-                    with open(os.path.join(LOGS_DIR, filename), "r") as log_file:
-                        file_lines = log_file.readlines()
-                        print(f"[DEBUG] Loaded {len(file_lines)} lines from {filename}")
-                        log_data.extend(file_lines)
-            except ValueError:
-                logger.warning(f"Invalid date format in log filename: {filename}")
-    
-    print(f"[DEBUG] Total log lines loaded: {len(log_data)}")
-    return log_data
-
-def parseLogData(log_data):
-    """Parse log lines into structured data."""
-    summary = {}
-    print(f"[DEBUG] Parsing {len(log_data)} log lines")
+RESOURCE_TYPES = {"Pod": "Pods", "Job": "Jobs", "Deployment": "Deployments"}
 
-    for line in log_data:
-        # Example format: "2024-11-26 16:00:28,194 - WARNING - WARNING: Pod ..."
-        parts = line.strip().split(" - ", 2)  # Split into 3 parts: timestamp, level, message
-        if len(parts) < 3:
-            print(f"[DEBUG] Skipping malformed line: {line.strip()}")
+def buildSummary(resources):
+    """Group merged per-resource counts as {namespace: {"Pods"|"Jobs"|"Deployments": [resource, ...]}}."""
+    summary = {}
+    for uid, resource in resources.items():
+        resourceType = RESOURCE_TYPES.get(resource["kind"])
+        if not resourceType:
             continue
-
-        timestamp, log_level, message = parts
-        namespace = None
-        resource = None
-        violation = None
-
-        # Extract namespace
-        if "namespace" in message:
-            namespace = message.split("namespace '")[1].split("'")[0]
-            print(f"[DEBUG] Extracted namespace: {namespace}")
-
-        # Determine resource type
-        if "Pod" in message:
-            resource = "Pods"
-        elif "Job" in message:
-            resource = "Jobs"
-        elif "Deployment" in message:
-            resource = "Deployments"
-        print(f"[DEBUG] Determined resource type: {resource}")
-
-        # Extract violations
-        if "violation" in message:
-            violation = message.split("violation: ")[-1].strip()
-            print(f"[DEBUG] Extracted violation: {violation}")
-
-        # Add data to the summary
-        if namespace and resource:
-            if namespace not in summary:
-                summary[namespace] = {"Pods": [], "Jobs": [], "Deployments": []}
-
-            entry = {"timestamp": timestamp, "log_level": log_level, "message": message}
-            if violation:
-                entry["violation"] = violation
-
-            summary[namespace][resource].append(entry)
-            print(f"[DEBUG] Added entry to summary: {entry}")
-
-    print(f"[DEBUG] Parsed summary: {json.dumps(summary, indent=4)}")
+        namespace = summary.setdefault(resource["namespace"], {"Pods": [], "Jobs": [], "Deployments": []})
+        namespace[resourceType].append({
+            "uid": uid,
+            "name": resource["name"],
+            "violations": sum(counts["count"] for counts in resource["codes"].values()),
+            "codes": resource["codes"],
+        })
+    for resourceTypes in summary.values():
+        for entries in resourceTypes.values():
+            entries.sort(key=lambda entry: (-entry["violations"], entry["name"]))
+    logger.debug(f"Summarized {len(resources)} resources into {len(summary)} namespaces")
     return summary
 
-def beautifySummary(summary):
+def beautifySummary(summary, start, end):
     """Beautify the summary for the weekly report."""
-    lines = ["Weekly Report Summary", "=" * 30]
-    print(f"[DEBUG] Beautifying summary with namespaces: {list(summary.keys())}")
+    lines = [f"Weekly Report Summary ({start} to {end})", "=" * 30]
 
-    for namespace, resources in summary.items():
+    for namespace, resources in sorted(summary.items()):
         lines.append(f"\nNamespace: {namespace}")
         lines.append("-" * 30)
         for resource_type, resource_data in resources.items():
             lines.append(f"\n{resource_type}:")
-            if resource_data:
-                for resource in resource_data:
-                    lines.append(f"  - {resource['message']}")
-            else:
+            if not resource_data:
                 lines.append("  - No violations")
-    
-    beautified_content = "\n".join(lines)
-    print(f"[DEBUG] Beautified report content:\n{beautified_content}")
-    return beautified_content
+            for resource in resource_data:
+                lines.append(f"  - '{resource['name']}': {resource['violations']} violations")
+                for code, counts in sorted(resource["codes"].items(), key=lambda item: -item[1]["count"]):
+                    lines.append(f"      {counts['severity'].upper()} {code} x{counts['count']} (latest: {counts['lastMessage']})")
+
+    return "\n".join(lines)
+
+def summarizeViolationCounts():
+    """Summarize this week's violation counts per namespace from the violation store."""
+    counts = getViolationStore().countsByNamespace()
+    lines = ["\n\nViolation Counts (last 7 days)", "=" * 30]
+    if not counts:
+        lines.append("  - No violations recorded")
+    for namespace, typeCounts in sorted(counts.items()):
+        lines.append(f"\nNamespace: {namespace}")
+        for violation_type, count in sorted(typeCounts.items(), key=lambda item: -item[1]):
+            lines.append(f"  - {violation_type}: {count}")
+    return "\n".join(lines)
+
+def jsonReport(summary, start, end):
+    return json.dumps({"start": str(start), "end": str(end), "namespaces": summary}, indent=2)
+
+def csvReport(summary):
+    """One row per resource and violation code."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["namespace", "kind", "name", "uid", "code", "severity", "count", "lastMessage"])
+    for namespace, resources in sorted(summary.items()):
+        for resource_type, resource_data in resources.items():
+            for resource in resource_data:
+                for code, counts in sorted(resource["codes"].items()):
+                    writer.writerow([namespace, resource_type, resource["name"], resource["uid"], code,
+                                     counts["severity"], counts["count"], counts["lastMessage"]])
+    return output.getvalue()
 
-def saveReport(report_content):
+def saveReport(report_content, extension="txt"):
     """Save the weekly report to the reports directory."""
-    report_filename = f"weekly_report_{datetime.utcnow().date()}.txt"
+    report_filename = f"weekly_report_{datetime.utcnow().date()}.{extension}"
     report_path = os.path.join(REPORTS_DIR, report_filename)
 
     with open(report_path, "w") as report_file:
         report_file.write(report_content)
-    
+
     logger.info(f"Weekly report saved at: {report_path}")
-    print(f"[DEBUG] Report saved at: {report_path}")
+    return report_path
+
+def generateWeeklyReport(days=7, formats=REPORT_FORMATS):
+    """Generate a report over the last `days` UTC days in each of `formats` ("text", "json", "csv").
 
-def generateWeeklyReport():
-    """Generate a weekly report based on daily logs."""
+    Only the per-day aggregates are read; each event is parsed once, when
+    its day's aggregate is first brought up to date.
+    """
     logger.info("Generating weekly report...")
-    print("[DEBUG] Starting weekly report generation")
-    daily_logs = loadDailyLogs()
-    if not daily_logs:
-        logger.warning("No logs found for the past week.")
-        print("[DEBUG] No logs found for the past week")
-        return
-    
-    summary = parseLogData(daily_logs)
-    beautified_report = beautifySummary(summary)
-    saveReport(beautified_report)
+    aggregates = loadDayAggregates(days)
+    summary = buildSummary(mergeAggregates(aggregates))
+    if not summary:
+        logger.warning(f"No violation events found for the past {days} days.")
+        return []
+
+    start, end = aggregates[0].date, aggregates[-1].date
+    paths = []
+    for reportFormat in formats:
+        if reportFormat == "text":
+            paths.append(saveReport(beautifySummary(summary, start, end) + summarizeViolationCounts(), "txt"))
+        elif reportFormat == "json":
+            paths.append(saveReport(jsonReport(summary, start, end), "json"))
+        elif reportFormat == "csv":
+            paths.append(saveReport(csvReport(summary), "csv"))
+        else:
+            raise ValueError(f"Unsupported report format: {reportFormat}")
+    return paths
 
 if __name__ == "__main__":
-    generateWeeklyReport()
+    parser = argparse.ArgumentParser(description="Generate the violation report from the per-day aggregates.")
+    parser.add_argument("--days", type=int, default=7, help="Number of UTC days the report covers.")
+    parser.add_argument("--format", default=",".join(REPORT_FORMATS), help="Comma-separated output formats (text, json, csv).")
+    args = parser.parse_args()
+    generateWeeklyReport(args.days, args.format.split(","))
@@ -0,0 +1,30 @@
+from utils.config import GPU_METRICS_BACKEND
+from utils.gpuMetricsCache import getGpuMetricsCache, indexByPod
+from utils.metricsExporter import GPU_SCRAPE_FAILURES
+
+SCRAPE_ERROR_MESSAGE = "Error while scraping this namespace"
+
+def fetchFromBackend(namespaces):
+    if GPU_METRICS_BACKEND == "prometheus":
+        from utils.prometheusMetrics import queryGpuMetrics
+        results = queryGpuMetrics(namespaces)
+    elif GPU_METRICS_BACKEND == "grafana":
+        from utils.scrapeGrafana import scrapeGpuMetrics
+        results = scrapeGpuMetrics(namespaces)
+    else:
+        raise ValueError(f"Unsupported GPU metrics backend: {GPU_METRICS_BACKEND}")
+
+    for namespace, result in results.items():
+        if result.get("message") == SCRAPE_ERROR_MESSAGE:
+            GPU_SCRAPE_FAILURES.inc(backend=GPU_METRICS_BACKEND, namespace=namespace)
+    return results
+
+def fetchGpuMetrics(namespaces):
+    """Fetch GPU metrics through the backend selected by GPU_METRICS_BACKEND.
+
+    Namespaces with a snapshot younger than GPU_METRICS_CACHE_TTL are served
+    from the cache. Each result also carries "podMetrics", its rows keyed by
+    pod name.
+    """
+    results = getGpuMetricsCache().fetch(namespaces, fetchFromBackend, GPU_METRICS_BACKEND)
+    return {namespace: {**result, "podMetrics": indexByPod(result)} for namespace, result in results.items()}
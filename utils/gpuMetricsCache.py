@@ -0,0 +1,95 @@
+import json
+import os
+import threading
+import time
+from utils.config import GPU_METRICS_CACHE_FILE, GPU_METRICS_CACHE_TTL
+from utils.tracing import traced
+from utils.logger import logger
+
+def indexByPod(result):
+    """Map pod name -> GPU metrics row of one namespace result."""
+    return {row["podName"]: row for row in result.get("gpuMetrics", [])}
+
+class GpuMetricsCache:
+    """Per-namespace GPU metrics snapshots with a TTL, shared through a JSON file.
+
+    The dashboard itself only refreshes every 30 seconds, so a snapshot
+    younger than `ttl` is served as is. Every process writing the file
+    merges its snapshots with the ones already on disk and replaces the
+    file atomically, so concurrent runs never read a partial file.
+    """
+
+    def __init__(self, path=GPU_METRICS_CACHE_FILE, ttl=GPU_METRICS_CACHE_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.snapshots = {}
+
+    def read(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable GPU metrics cache '{self.path}': {e}")
+            return {}
+
+    def load(self):
+        with self.lock:
+            self.snapshots = self.read()
+        return self
+
+    @traced("save gpu metrics cache", "io")
+    def save(self):
+        with self.lock:
+            for namespace, snapshot in self.read().items():
+                if snapshot["fetchedAt"] > self.snapshots.get(namespace, {}).get("fetchedAt", 0):
+                    self.snapshots[namespace] = snapshot
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmpPath = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmpPath, "w") as file:
+                json.dump(self.snapshots, file, separators=(",", ":"))
+            os.replace(tmpPath, self.path)
+
+    def fresh(self, namespace, source, now):
+        snapshot = self.snapshots.get(namespace)
+        if snapshot and snapshot["source"] == source and now - snapshot["fetchedAt"] < self.ttl:
+            return snapshot["result"]
+        return None
+
+    def fetch(self, namespaces, fetcher, source):
+        """Return {namespace: result}, calling `fetcher` only for namespaces without a fresh snapshot.
+
+        Failed scrapes (results with a "message" but no metrics) are not cached.
+        """
+        now = time.time()
+        with self.lock:
+            results = {namespace: self.fresh(namespace, source, now) for namespace in namespaces}
+        stale = [namespace for namespace, result in results.items() if result is None]
+        if len(stale) < len(namespaces):
+            logger.info(f"Using cached GPU metrics for {len(namespaces) - len(stale)} of {len(namespaces)} namespaces")
+        if not stale:
+            return results
+
+        fetched = fetcher(stale)
+        fetchedAt = time.time()
+        with self.lock:
+            for namespace, result in fetched.items():
+                if "gpuMetrics" in result or result.get("message") == "No monitored instances to scrape":
+                    self.snapshots[namespace] = {"source": source, "fetchedAt": fetchedAt, "result": result}
+        if self.ttl > 0:
+            self.save()
+        results.update(fetched)
+        return results
+
+_cache = None
+_cacheLock = threading.Lock()
+
+def getGpuMetricsCache():
+    """Return the process-wide GPU metrics cache, loading it on first use."""
+    global _cache
+    with _cacheLock:
+        if _cache is None:
+            _cache = GpuMetricsCache().load()
+        return _cache
@@ -0,0 +1,208 @@
+import threading
+import time
+from kubernetes import watch
+from kubernetes.client.rest import ApiException
+from utils.kubeClient import coreV1Api, batchV1Api, appsV1Api
+from utils.logger import logger
+
+WATCH_TIMEOUT_SECONDS = 300  # Server-side watch timeout before the stream is re-opened
+RETRY_DELAY_SECONDS = 5
+
+class ResourceStore:
+    """Thread-safe in-memory store indexed by namespace, UID and owner UID."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.byUid = {}
+        self.byNamespace = {}
+        self.byOwner = {}
+
+    def upsert(self, obj):
+        with self.lock:
+            uid = obj.metadata.uid
+            if uid in self.byUid:
+                self.removeIndexes(self.byUid[uid])
+            self.byUid[uid] = obj
+            self.byNamespace.setdefault(obj.metadata.namespace, {})[uid] = obj
+            for owner in obj.metadata.owner_references or []:
+                self.byOwner.setdefault(owner.uid, set()).add(uid)
+
+    def delete(self, obj):
+        with self.lock:
+            existing = self.byUid.pop(obj.metadata.uid, None)
+            if existing is not None:
+                self.removeIndexes(existing)
+
+    def removeIndexes(self, obj):
+        uid = obj.metadata.uid
+        self.byNamespace.get(obj.metadata.namespace, {}).pop(uid, None)
+        for owner in obj.metadata.owner_references or []:
+            self.byOwner.get(owner.uid, set()).discard(uid)
+
+    def replace(self, objs, namespace=None):
+        """Replace the contents (of one namespace, or all) after a relist."""
+        with self.lock:
+            stale = self.byNamespace.get(namespace, {}) if namespace else self.byUid
+            for obj in list(stale.values()):
+                self.delete(obj)
+            for obj in objs:
+                self.upsert(obj)
+
+    def get(self, uid):
+        with self.lock:
+            return self.byUid.get(uid)
+
+    def listByNamespace(self, namespace):
+        with self.lock:
+            return list(self.byNamespace.get(namespace, {}).values())
+
+    def listByOwner(self, ownerUid):
+        with self.lock:
+            return [self.byUid[uid] for uid in self.byOwner.get(ownerUid, ()) if uid in self.byUid]
+
+def eventResourceVersion(obj):
+    """The resourceVersion of a watch event object.
+
+    The client only deserializes ADDED/MODIFIED/DELETED objects; BOOKMARK
+    (and ERROR) objects are left as the raw dicts.
+    """
+    if isinstance(obj, dict):
+        return obj.get("metadata", {}).get("resourceVersion")
+    if obj is not None and getattr(obj, "metadata", None) is not None:
+        return obj.metadata.resource_version
+    return None
+
+def defaultWatchStream(listFunc, resourceVersion, **kwargs):
+    """Open a watch stream with resourceVersion bookmarks through the Kubernetes client."""
+    return watch.Watch().stream(
+        listFunc,
+        resource_version=resourceVersion,
+        allow_watch_bookmarks=True,
+        timeout_seconds=WATCH_TIMEOUT_SECONDS,
+        **kwargs,
+    )
+
+class Informer:
+    """List a resource kind once, then follow its watch stream into a ResourceStore.
+
+    `watchStream(listFunc, resourceVersion, **kwargs)` can be replaced to feed
+    a fake event stream; it must yield {"type": ..., "object": ...} events and
+    may raise ApiException(status=410) to force a relist.
+    """
+
+    def __init__(self, kind, listFunc, store, namespace=None, watchStream=defaultWatchStream):
+        self.kind = kind
+        self.listFunc = listFunc
+        self.store = store
+        self.namespace = namespace
+        self.watchStream = watchStream
+        self.resourceVersion = None
+        self.synced = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def listArgs(self):
+        return {"namespace": self.namespace} if self.namespace else {}
+
+    def relist(self):
+        """Fetch a full list and reset the store and resourceVersion."""
+        result = self.listFunc(**self.listArgs())
+        self.store.replace(result.items, self.namespace)
+        self.resourceVersion = result.metadata.resource_version
+        self.synced.set()
+        scope = f"namespace '{self.namespace}'" if self.namespace else "all namespaces"
+        logger.info(f"Listed {len(result.items)} {self.kind} in {scope} (resourceVersion {self.resourceVersion})")
+
+    def handleEvent(self, event):
+        eventType = event["type"]
+        obj = event["object"]
+        if eventType in ("ADDED", "MODIFIED"):
+            self.store.upsert(obj)
+        elif eventType == "DELETED":
+            self.store.delete(obj)
+        # BOOKMARK events only advance the resourceVersion
+        resourceVersion = eventResourceVersion(obj)
+        if resourceVersion:
+            self.resourceVersion = resourceVersion
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                if self.resourceVersion is None:
+                    self.relist()
+                for event in self.watchStream(self.listFunc, self.resourceVersion, **self.listArgs()):
+                    if self.stopped.is_set():
+                        return
+                    self.handleEvent(event)
+            except ApiException as e:
+                if e.status == 410:
+                    logger.warning(f"Watch for {self.kind} expired (410 Gone); relisting.")
+                    self.resourceVersion = None
+                    continue
+                logger.error(f"Watch for {self.kind} failed: {e}")
+                self.stopped.wait(RETRY_DELAY_SECONDS)
+            except Exception as e:
+                logger.error(f"Watch for {self.kind} failed: {e}")
+                self.stopped.wait(RETRY_DELAY_SECONDS)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name=f"informer-{self.kind}", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def waitForSync(self, timeout=None):
+        return self.synced.wait(timeout)
+
+# Active informers and their shared stores, keyed by resource kind
+informers = {}
+stores = {}
+
+def informerListFuncs():
+    """Cluster-wide and namespaced list functions for each watched kind."""
+    coreV1 = coreV1Api()
+    batchV1 = batchV1Api()
+    appsV1 = appsV1Api()
+    return {
+        "pods": (coreV1.list_pod_for_all_namespaces, coreV1.list_namespaced_pod),
+        "jobs": (batchV1.list_job_for_all_namespaces, batchV1.list_namespaced_job),
+        "deployments": (appsV1.list_deployment_for_all_namespaces, appsV1.list_namespaced_deployment),
+    }
+
+def startInformers(namespaces=None, listFuncs=None, watchStream=defaultWatchStream, syncTimeout=60):
+    """Start informers for pods, jobs and deployments.
+
+    With `namespaces=None` one cluster-wide informer runs per kind; otherwise
+    one informer per namespace feeds the kind's shared store.
+    """
+    if listFuncs is None:
+        listFuncs = informerListFuncs()
+
+    for kind, (listAll, listNamespaced) in listFuncs.items():
+        store = stores.setdefault(kind, ResourceStore())
+        if namespaces is None:
+            kindInformers = [Informer(kind, listAll, store, watchStream=watchStream).start()]
+        else:
+            kindInformers = [
+                Informer(kind, listNamespaced, store, namespace=namespace, watchStream=watchStream).start()
+                for namespace in namespaces
+            ]
+        informers[kind] = kindInformers
+
+    deadline = time.monotonic() + syncTimeout
+    for kindInformers in informers.values():
+        for informer in kindInformers:
+            informer.waitForSync(max(0, deadline - time.monotonic()))
+
+def stopInformers():
+    for kindInformers in informers.values():
+        for informer in kindInformers:
+            informer.stop()
+    informers.clear()
+    stores.clear()
+
+def hasSynced(kind):
+    kindInformers = informers.get(kind)
+    return bool(kindInformers) and all(informer.synced.is_set() for informer in kindInformers)
@@ -1,6 +1,107 @@
-from kubernetes import config
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+from kubernetes import client, config
+from urllib3.connection import HTTPConnection
+from utils.config import KUBE_POOL_MAXSIZE, KUBE_CONNECT_TIMEOUT, KUBE_READ_TIMEOUT, KUBE_TCP_KEEPALIVE
+from utils.metricsExporter import API_REQUESTS, API_REQUEST_SECONDS
+from utils.tracing import span
+
+_lock = threading.Lock()
+_configLoaded = False
+_apiClient = None
 
 def loadKubeConfig():
-    """Load Kubernetes configuration."""
-    config.load_kube_config()
+    """Load Kubernetes configuration once per process."""
+    global _configLoaded
+    with _lock:
+        if not _configLoaded:
+            config.load_kube_config()
+            _configLoaded = True
+
+class ApiStats:
+    """Thread-safe counters for requests made through the shared client."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.totalSeconds = 0.0
+        self.maxSeconds = 0.0
+
+    def record(self, seconds, failed):
+        with self.lock:
+            self.requests += 1
+            self.errors += int(failed)
+            self.totalSeconds += seconds
+            self.maxSeconds = max(self.maxSeconds, seconds)
+        API_REQUESTS.inc(outcome="error" if failed else "success")
+        API_REQUEST_SECONDS.observe(seconds)
+
+apiStats = ApiStats()
+
+class InstrumentedApiClient(client.ApiClient):
+    """ApiClient applying default timeouts and recording request latency."""
+
+    def request(self, method, url, query_params=None, headers=None,
+                post_params=None, body=None, _preload_content=True,
+                _request_timeout=None):
+        # Streaming calls (watches) manage their own server-side timeout
+        if _request_timeout is None and _preload_content:
+            _request_timeout = (KUBE_CONNECT_TIMEOUT, KUBE_READ_TIMEOUT)
+        start = time.perf_counter()
+        failed = True
+        try:
+            with span(f"{method} {urlsplit(url).path}", "api"):
+                response = super().request(method, url, query_params, headers, post_params, body, _preload_content, _request_timeout)
+            failed = False
+            return response
+        finally:
+            apiStats.record(time.perf_counter() - start, failed)
+
+def getApiClient():
+    """Return the process-wide ApiClient, creating it on first use."""
+    global _apiClient
+    loadKubeConfig()
+    with _lock:
+        if _apiClient is None:
+            configuration = client.Configuration.get_default_copy()
+            configuration.connection_pool_maxsize = KUBE_POOL_MAXSIZE
+            _apiClient = InstrumentedApiClient(configuration)
+            if KUBE_TCP_KEEPALIVE:
+                # Applies to every connection pool the manager creates from now on
+                _apiClient.rest_client.pool_manager.connection_pool_kw["socket_options"] = (
+                    HTTPConnection.default_socket_options + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+                )
+        return _apiClient
+
+def coreV1Api():
+    return client.CoreV1Api(getApiClient())
+
+def batchV1Api():
+    return client.BatchV1Api(getApiClient())
+
+def appsV1Api():
+    return client.AppsV1Api(getApiClient())
+
+def customObjectsApi():
+    return client.CustomObjectsApi(getApiClient())
 
+def getApiStats():
+    """Return request, connection reuse and latency counters of the shared client."""
+    with apiStats.lock:
+        stats = {
+            "requests": apiStats.requests,
+            "errors": apiStats.errors,
+            "totalSeconds": apiStats.totalSeconds,
+            "maxSeconds": apiStats.maxSeconds,
+            "meanSeconds": apiStats.totalSeconds / apiStats.requests if apiStats.requests else 0.0,
+        }
+    connections = 0
+    if _apiClient is not None:
+        pools = _apiClient.rest_client.pool_manager.pools
+        connections = sum(pools[key].num_connections for key in pools.keys())
+    stats["connectionsOpened"] = connections
+    stats["reusedRequests"] = max(0, stats["requests"] - connections)
+    return stats
@@ -0,0 +1,78 @@
+from utils.config import LIST_PAGE_SIZE, OPT_OUT_LABEL
+from utils.informer import ResourceStore, hasSynced, stores
+from utils.logger import logger
+
+# Server-side field selectors applied per kind
+FIELD_SELECTORS = {
+    "pods": "status.phase=Running",
+}
+
+# Results of cluster-wide prefetches for the current run, keyed by kind
+prefetched = {}
+
+def labelSelector():
+    """Exclude resources carrying the opt-out label."""
+    return f"!{OPT_OUT_LABEL}" if OPT_OUT_LABEL else None
+
+def selectorArgs(kind):
+    args = {}
+    if FIELD_SELECTORS.get(kind):
+        args["field_selector"] = FIELD_SELECTORS[kind]
+    if labelSelector():
+        args["label_selector"] = labelSelector()
+    return args
+
+def matchesSelectors(kind, obj):
+    """Client-side equivalent of selectorArgs for objects served from a store."""
+    if kind == "pods" and obj.status.phase != "Running":
+        return False
+    if OPT_OUT_LABEL and OPT_OUT_LABEL in (obj.metadata.labels or {}):
+        return False
+    return True
+
+def iterPages(listFunc, pageSize=LIST_PAGE_SIZE, **kwargs):
+    """Yield list results page by page using limit/continue."""
+    continueToken = None
+    while True:
+        if continueToken:
+            kwargs["_continue"] = continueToken
+        page = listFunc(limit=pageSize, **kwargs)
+        yield page.items
+        continueToken = page.metadata._continue
+        if not continueToken:
+            return
+
+def iterItems(listFunc, pageSize=LIST_PAGE_SIZE, **kwargs):
+    """Yield list items one page at a time so only one page is held in memory."""
+    for items in iterPages(listFunc, pageSize, **kwargs):
+        yield from items
+
+def prefetchClusterWide(kind, listAllFunc, namespaces, applySelectors=True):
+    """List a kind once across all namespaces and keep only the configured ones."""
+    wanted = set(namespaces)
+    store = ResourceStore()
+    args = selectorArgs(kind) if applySelectors else {}
+    count = 0
+    for obj in iterItems(listAllFunc, **args):
+        if obj.metadata.namespace in wanted:
+            store.upsert(obj)
+            count += 1
+    prefetched[kind] = store
+    logger.info(f"Prefetched {count} {kind} across {len(wanted)} namespaces with one paged call")
+
+def clearPrefetched():
+    prefetched.clear()
+
+def listResources(kind, namespace, listFunc, applySelectors=True):
+    """Iterate over a kind in one namespace.
+
+    Served from the informer store when one has synced, then from a
+    cluster-wide prefetch, and otherwise from a paged, server-filtered list.
+    """
+    if hasSynced(kind):
+        items = stores[kind].listByNamespace(namespace)
+        return (obj for obj in items if not applySelectors or matchesSelectors(kind, obj))
+    if kind in prefetched and applySelectors:
+        return iter(prefetched[kind].listByNamespace(namespace))
+    args = selectorArgs(kind) if applySelectors else {}
+    return iterItems(listFunc, namespace=namespace, **args)
@@ -1,28 +1,227 @@
+import atexit
+import fcntl
+import glob
+import gzip
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import re
+import shutil
+import sys
+import threading
+from datetime import datetime, timezone
+from utils.config import LOG_LEVEL, LOGS_DIR, LOG_MAX_BYTES, LOG_COMPRESS, LOG_BUFFER_BYTES
 
-LOGS_DIR = "logs/dailyLogs"
-DAILY_LOG_FILE = os.path.join(LOGS_DIR, f"daily_log_{datetime.utcnow().date()}.log")
+# Callers only put records on an in-memory queue; a background thread
+# formats them and writes them out, so monitoring loops never wait on the
+# disk or the console.
 
-# Ensure logs directory exists
-os.makedirs(LOGS_DIR, exist_ok=True)
+LOG_NAME_PATTERN = re.compile(r"daily_log_(?P<date>\d{4}-\d{2}-\d{2})(?:\.(?P<part>\d+))?\.log$")
+
+def sameFile(stream, path):
+    """Whether `path` still names the file `stream` has open."""
+    try:
+        return os.path.samestat(os.fstat(stream.fileno()), os.stat(path))
+    except FileNotFoundError:
+        return False
+
+def utcDate(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).date()
+
+class DailyFileHandler(logging.Handler):
+    """Buffered file handler writing to daily_log_<UTC date>.log.
+
+    The file is chosen from each record's timestamp, so a long-running
+    process moves to a new file at UTC midnight. With `maxBytes` a day is
+    split into numbered parts, and with `compress` finished days and parts
+    are gzipped.
+    """
+
+    def __init__(self, directory=LOGS_DIR, maxBytes=LOG_MAX_BYTES, compress=LOG_COMPRESS, bufferBytes=LOG_BUFFER_BYTES):
+        super().__init__()
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.compress = compress
+        self.bufferBytes = bufferBytes
+        self.stream = None
+        self.date = None
+        self.part = 0
+        self.dayEnd = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def pathFor(self, date, part):
+        suffix = f".{part}" if part else ""
+        return os.path.join(self.directory, f"daily_log_{date}{suffix}.log")
+
+    def partExists(self, part):
+        path = self.pathFor(self.date, part)
+        return os.path.exists(path) or os.path.exists(f"{path}.gz")
+
+    def openFor(self, created):
+        self.closeStream()
+        self.date = utcDate(created)
+        self.dayEnd = (created // 86400 + 1) * 86400
+        self.part = 0
+        self.openCurrent()
+
+    def openCurrent(self):
+        """Open the current part with a shared lock, so no process compresses it while it is written."""
+        while True:
+            if self.maxBytes:
+                # Continue after the parts an earlier process wrote today; never reopen a compressed one
+                while self.partExists(self.part + 1):
+                    self.part += 1
+                if os.path.exists(f"{self.pathFor(self.date, self.part)}.gz"):
+                    self.part += 1
+            path = self.pathFor(self.date, self.part)
+            stream = open(path, "a", buffering=self.bufferBytes, encoding="utf-8")
+            fcntl.flock(stream.fileno(), fcntl.LOCK_SH)
+            # Another process may have compressed and removed the file between the checks
+            # and the flock; then this open either found the old file or created a new one
+            if sameFile(stream, path) and not os.path.exists(f"{path}.gz"):
+                self.stream = stream
+                break
+            stream.close()
+        if self.compress:
+            self.compressFinished()
+
+    def closeStream(self):
+        if self.stream is not None:
+            self.stream.close()  # Also releases the lock
+            self.stream = None
+
+    def compressFinished(self):
+        """Gzip the files of past days and the finished parts of today that no process has open."""
+        for path in glob.glob(os.path.join(self.directory, "daily_log_*.log")):
+            match = LOG_NAME_PATTERN.match(os.path.basename(path))
+            if not match or (match["date"], int(match["part"] or 0)) >= (str(self.date), self.part):
+                continue
+            try:
+                with open(path, "rb") as source:
+                    try:
+                        fcntl.flock(source.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        continue  # Still being written by another process, or compressed by one
+                    if not sameFile(source, path):
+                        continue  # Compressed by another process since the glob
+                    gzPath = f"{path}.gz"
+                    if os.path.exists(gzPath):
+                        # Left empty by a writer that found the part already compressed
+                        if os.fstat(source.fileno()).st_size == 0:
+                            os.remove(path)
+                        else:
+                            logging.getLogger("NautilusBot").warning(f"Not compressing log file '{path}': '{gzPath}' already exists")
+                        continue
+                    tmpPath = f"{gzPath}.{os.getpid()}.tmp"
+                    with gzip.open(tmpPath, "wb") as target:
+                        shutil.copyfileobj(source, target)
+                    os.replace(tmpPath, gzPath)
+                    os.remove(path)
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logging.getLogger("NautilusBot").warning(f"Could not compress log file '{path}': {e}")
+
+    def emit(self, record):
+        try:
+            if self.stream is None or record.created >= self.dayEnd:
+                self.openFor(record.created)
+            elif self.maxBytes and self.stream.tell() >= self.maxBytes:
+                self.closeStream()
+                self.part += 1
+                self.openCurrent()
+            self.stream.write(self.format(record) + "\n")
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        if self.stream is not None:
+            self.stream.flush()
+
+    def close(self):
+        self.closeStream()
+        super().close()
+
+class AsyncLogWriter:
+    """Drain the log queue on a background thread, flushing after each batch."""
+
+    def __init__(self, handlers):
+        self.queue = queue.SimpleQueue()
+        self.handlers = list(handlers)
+        self.thread = threading.Thread(target=self.run, name="log-writer", daemon=True)
+        self.stopped = False
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def handle(self, record):
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def run(self):
+        while True:
+            record = self.queue.get()
+            # Write everything already queued before paying for a flush
+            while record is not None:
+                self.handle(record)
+                try:
+                    record = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            for handler in self.handlers:
+                handler.flush()
+            if record is None:
+                return
+
+    def stop(self):
+        """Write out every queued record and close the handlers."""
+        if self.stopped:
+            return
+        self.stopped = True
+        self.queue.put(None)
+        self.thread.join()
+        for handler in self.handlers:
+            handler.close()
+
+class ConsoleHandler(logging.StreamHandler):
+    """Write to whatever sys.stderr is when the record is written, as it may be replaced after setup."""
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self):
+        return sys.stderr
+
+class QueueHandler(logging.handlers.QueueHandler):
+    """Queue records without formatting them; the writer thread formats."""
+
+    def prepare(self, record):
+        # Render %-style arguments now, in case the objects change before the writer gets to them
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        return record
 
 def setupLogger():
-    """Setup logger with file and console handlers."""
+    """Setup logger with file and console handlers behind a background writer."""
     logger = logging.getLogger("NautilusBot")
-    logger.setLevel(logging.INFO)
+    logger.setLevel(LOG_LEVEL)
 
     # File handler
-    fileHandler = logging.FileHandler(DAILY_LOG_FILE)
+    fileHandler = DailyFileHandler()
     fileHandler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
 
     # Console handler
-    consoleHandler = logging.StreamHandler()
+    consoleHandler = ConsoleHandler()
     consoleHandler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
 
-    logger.addHandler(fileHandler)
-    logger.addHandler(consoleHandler)
-    return logger
+    writer = AsyncLogWriter([fileHandler, consoleHandler]).start()
+    logger.addHandler(QueueHandler(writer.queue))
+    atexit.register(writer.stop)
+    return logger, writer
 
-logger = setupLogger()
+logger, logWriter = setupLogger()
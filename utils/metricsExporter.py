@@ -0,0 +1,161 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from utils.config import METRICS_PORT, METRICS_ADDRESS, METRICS_TEXTFILE_DIR
+from utils.logger import logger
+
+# Minimal Prometheus text-format metrics. Updating a metric is a dict
+# operation under a lock, so they are always recorded and only exported
+# when the HTTP endpoint or the textfile is enabled.
+
+registry = []
+
+def escapeLabelValue(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def formatLabels(labelNames, labelValues, extra=()):
+    pairs = list(zip(labelNames, labelValues)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{escapeLabelValue(value)}"' for name, value in pairs) + "}"
+
+class Metric:
+    metricType = None
+
+    def __init__(self, name, description, labelNames=()):
+        self.name = name
+        self.description = description
+        self.labelNames = tuple(labelNames)
+        self.lock = threading.Lock()
+        self.values = {}
+        registry.append(self)
+
+    def key(self, labels):
+        return tuple(str(labels[name]) for name in self.labelNames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.metricType}"]
+
+    def render(self):
+        with self.lock:
+            values = sorted(self.values.items())
+        return self.header() + [f"{self.name}{formatLabels(self.labelNames, key)} {value:g}" for key, value in values]
+
+class Counter(Metric):
+    metricType = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    metricType = "gauge"
+
+    def set(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def clear(self, **match):
+        """Drop every series whose labels match `match` (all series without arguments)."""
+        positions = [(self.labelNames.index(name), str(value)) for name, value in match.items()]
+        with self.lock:
+            for key in [key for key in self.values if all(key[index] == value for index, value in positions)]:
+                del self.values[key]
+
+class Histogram(Metric):
+    metricType = "histogram"
+
+    def __init__(self, name, description, labelNames=(), buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)):
+        super().__init__(name, description, labelNames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        with self.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = {"buckets": [0] * len(self.buckets), "count": 0, "sum": 0.0}
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][index] += 1
+            state["count"] += 1
+            state["sum"] += value
+
+    def render(self):
+        with self.lock:
+            values = sorted((key, dict(state, buckets=list(state["buckets"]))) for key, state in self.values.items())
+        lines = self.header()
+        for key, state in values:
+            for bound, count in zip(self.buckets, state["buckets"]):
+                lines.append(f"{self.name}_bucket{formatLabels(self.labelNames, key, [('le', f'{bound:g}')])} {count}")
+            lines.append(f"{self.name}_bucket{formatLabels(self.labelNames, key, [('le', '+Inf')])} {state['count']}")
+            lines.append(f"{self.name}_sum{formatLabels(self.labelNames, key)} {state['sum']:g}")
+            lines.append(f"{self.name}_count{formatLabels(self.labelNames, key)} {state['count']}")
+        return lines
+
+# `scope` tells apart a stage over every namespace of a run, over one shard's
+# namespaces, and over a single namespace in daemon mode
+STAGE_SECONDS = Histogram("nautilus_stage_duration_seconds", "Wall-clock duration of a monitoring stage.", ["stage", "scope"])
+API_REQUESTS = Counter("nautilus_api_requests_total", "Kubernetes API requests by outcome.", ["outcome"])
+API_REQUEST_SECONDS = Histogram(
+    "nautilus_api_request_duration_seconds", "Kubernetes API request latency.",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+GPU_SCRAPE_FAILURES = Counter("nautilus_gpu_scrape_failures_total", "Namespaces whose GPU metrics could not be fetched.", ["backend", "namespace"])
+GPU_SCRAPE_SECONDS = Gauge("nautilus_gpu_scrape_last_duration_seconds", "Duration of the latest GPU dashboard scrape of a namespace.", ["namespace"])
+VIOLATIONS = Gauge("nautilus_violations", "Violations found by the latest check of a namespace.", ["namespace", "kind", "code"])
+CLEANUP_ACTIONS = Counter("nautilus_cleanup_actions_total", "Cleanup actions applied, by action and outcome.", ["action", "outcome"])
+
+def updateViolationGauges(resources, namespaces, kinds):
+    """Replace the violation gauges of the checked namespaces and kinds with this run's counts."""
+    for namespace in namespaces:
+        for kind in kinds:
+            VIOLATIONS.clear(namespace=namespace, kind=kind)
+    counts = {}
+    for resource in resources:
+        for violation in resource.get("violationDetails", []):
+            key = (resource["namespace"], resource["kind"], violation["code"])
+            counts[key] = counts.get(key, 0) + 1
+    for (namespace, kind, code), count in counts.items():
+        VIOLATIONS.set(count, namespace=namespace, kind=kind, code=code)
+
+def renderMetrics():
+    """Render every registered metric in the Prometheus text exposition format."""
+    return "\n".join(line for metric in registry for line in metric.render()) + "\n"
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = renderMetrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Prometheus scrapes would flood the daily log
+
+def startMetricsServer(port=METRICS_PORT, address=METRICS_ADDRESS):
+    """Serve /metrics from a background thread; does nothing when `port` is 0."""
+    if not port:
+        return None
+    server = ThreadingHTTPServer((address, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"Serving Prometheus metrics on http://{address}:{port}/metrics")
+    return server
+
+def writeMetricsFile(name, directory=METRICS_TEXTFILE_DIR):
+    """Write the metrics to `<directory>/<name>.prom` for node_exporter's textfile collector (for one-shot runs)."""
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.prom")
+    tmpPath = f"{path}.tmp"
+    with open(tmpPath, "w") as file:
+        file.write(renderMetrics())
+    os.replace(tmpPath, path)
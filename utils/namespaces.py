@@ -0,0 +1,16 @@
+from utils.config import NAMESPACES, NAMESPACE_LABEL_SELECTOR
+from utils.kubeClient import coreV1Api
+from utils.logger import logger
+
+def resolveNamespaces(labelSelector=NAMESPACE_LABEL_SELECTOR):
+    """Return the namespaces to monitor.
+
+    With a label selector every matching namespace is monitored; otherwise
+    the NAMESPACES list from the configuration is used.
+    """
+    if not labelSelector:
+        return list(NAMESPACES)
+    result = coreV1Api().list_namespace(label_selector=labelSelector)
+    namespaces = sorted(namespace.metadata.name for namespace in result.items)
+    logger.info(f"Resolved {len(namespaces)} namespaces matching '{labelSelector}'")
+    return namespaces
@@ -0,0 +1,56 @@
+from utils.kubeClient import appsV1Api
+from utils.listing import iterItems, listResources
+from utils.tracing import traced
+from utils.logger import logger
+
+def controllerReference(obj):
+    """Return the controlling ownerReference of an object, or its first one."""
+    ownerReferences = obj.metadata.owner_references or []
+    controller = next((owner for owner in ownerReferences if owner.controller), None)
+    return controller or (ownerReferences[0] if ownerReferences else None)
+
+def directOwner(obj):
+    """Return (kind, name) of an object's direct owner, or None."""
+    owner = controllerReference(obj)
+    return (owner.kind, owner.name) if owner else None
+
+class OwnerIndex:
+    """Resolve a pod's top-level owner through real ownerReferences.
+
+    ReplicaSets and Deployments are listed once per namespace, after which a
+    ReplicaSet -> Deployment lookup is a dict access.
+    """
+
+    def __init__(self, namespace, replicaSets, deployments):
+        self.namespace = namespace
+        deploymentsByUid = {deployment.metadata.uid: deployment.metadata.name for deployment in deployments}
+        self.replicaSetOwners = {}
+        for replicaSet in replicaSets:
+            for owner in replicaSet.metadata.owner_references or []:
+                if owner.kind == "Deployment" and owner.uid in deploymentsByUid:
+                    self.replicaSetOwners[replicaSet.metadata.uid] = deploymentsByUid[owner.uid]
+                    break
+
+    def resolveOwner(self, ownerReference):
+        """Return (kind, name) of the top-level owner for an ownerReference."""
+        if ownerReference.kind == "ReplicaSet":
+            deploymentName = self.replicaSetOwners.get(ownerReference.uid)
+            if deploymentName:
+                return "Deployment", deploymentName
+        return ownerReference.kind, ownerReference.name
+
+    def resolvePodOwner(self, pod):
+        """Return (kind, name) of the pod's top-level owner, or None for independent pods."""
+        owner = controllerReference(pod)
+        if owner is None:
+            return None
+        return self.resolveOwner(owner)
+
+@traced("owner index")
+def buildOwnerIndex(namespace, appsV1=None):
+    """List ReplicaSets and Deployments in a namespace once and index them."""
+    appsV1 = appsV1 or appsV1Api()
+    replicaSets = list(iterItems(appsV1.list_namespaced_replica_set, namespace=namespace))
+    deployments = list(listResources("deployments", namespace, appsV1.list_namespaced_deployment, applySelectors=False))
+    logger.info(f"Indexed {len(replicaSets)} ReplicaSets and {len(deployments)} Deployments in namespace '{namespace}'")
+    return OwnerIndex(namespace, replicaSets, deployments)
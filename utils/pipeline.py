@@ -0,0 +1,118 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from monitors.podMonitor import monitorNamespacePods
+from monitors.jobMonitor import monitorNamespaceJobs
+from monitors.deploymentMonitor import monitorNamespaceDeployments
+from utils.config import PIPELINE_MAX_WORKERS, LIST_CLUSTER_WIDE_MIN_NAMESPACES
+from utils.gpuMetrics import fetchGpuMetrics
+from utils.kubeClient import coreV1Api, batchV1Api, appsV1Api, getApiStats
+from utils.listing import prefetchClusterWide, clearPrefetched
+from utils.metricsExporter import STAGE_SECONDS
+from utils.tracing import span
+from utils.logger import logger
+
+class StageTimer:
+    """Record wall-clock and CPU time of a stage and of each namespace inside it."""
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.wallSeconds = 0.0
+        self.cpuSeconds = 0.0
+        self.namespaces = {}
+
+    def timeNamespace(self, namespace, func, *args):
+        wallStart = time.perf_counter()
+        cpuStart = time.thread_time()
+        try:
+            with span(self.stage, namespace=namespace):
+                return func(namespace, *args)
+        finally:
+            self.namespaces[namespace] = {
+                "wallSeconds": time.perf_counter() - wallStart,
+                "cpuSeconds": time.thread_time() - cpuStart,
+            }
+
+    def asDict(self):
+        return {
+            "wallSeconds": self.wallSeconds,
+            "cpuSeconds": self.cpuSeconds,
+            "namespaces": self.namespaces,
+        }
+
+def runStage(stage, func, namespaces, executor, *args):
+    """Fan a per-namespace function out over the shared executor and merge the results."""
+    timer = StageTimer(stage)
+    wallStart = time.perf_counter()
+    futures = [executor.submit(timer.timeNamespace, namespace, func, *args) for namespace in namespaces]
+
+    results = []
+    for namespace, future in zip(namespaces, futures):
+        try:
+            results.extend(future.result())
+        except Exception as e:
+            logger.error(f"Stage '{stage}' failed for namespace '{namespace}': {e}")
+
+    timer.wallSeconds = time.perf_counter() - wallStart
+    timer.cpuSeconds = sum(timing["cpuSeconds"] for timing in timer.namespaces.values())
+    STAGE_SECONDS.observe(timer.wallSeconds, stage=stage, scope="run")
+    logger.info(f"Stage '{stage}' finished in {timer.wallSeconds:.2f}s wall, {timer.cpuSeconds:.2f}s CPU")
+    return results, timer
+
+def runGpuStage(namespaces):
+    timer = StageTimer("gpuMetrics")
+    wallStart = time.perf_counter()
+    cpuStart = time.thread_time()
+    with span("gpuMetrics", namespaces=len(namespaces)):
+        gpuMetrics = fetchGpuMetrics(namespaces)
+    timer.wallSeconds = time.perf_counter() - wallStart
+    timer.cpuSeconds = time.thread_time() - cpuStart
+    STAGE_SECONDS.observe(timer.wallSeconds, stage="gpuMetrics", scope="run")
+    logger.info(f"Stage 'gpuMetrics' finished in {timer.wallSeconds:.2f}s wall, {timer.cpuSeconds:.2f}s CPU")
+    return gpuMetrics, timer
+
+def runPipeline(namespaces, maxWorkers=PIPELINE_MAX_WORKERS):
+    """Run the GPU scrape and the monitors with independent stages in parallel.
+
+    Jobs and deployments do not depend on GPU data, so they run while the
+    GPU metrics are fetched; pods start once the GPU metrics are available.
+    Returns (podData, jobData, deploymentData, timings).
+    """
+    v1 = coreV1Api()
+    batchV1 = batchV1Api()
+    appsV1 = appsV1Api()
+
+    wallStart = time.perf_counter()
+    try:
+        # Stage coordinators and namespace tasks use separate pools so a stage
+        # waiting on its namespaces never starves them of workers.
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="stage") as stages, \
+                ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix="namespace") as executor:
+            gpuFuture = stages.submit(runGpuStage, namespaces)
+
+            # With many namespaces one filtered all-namespaces call per kind is cheaper than one call per namespace
+            if len(namespaces) >= LIST_CLUSTER_WIDE_MIN_NAMESPACES:
+                prefetches = [
+                    executor.submit(prefetchClusterWide, "pods", v1.list_pod_for_all_namespaces, namespaces),
+                    executor.submit(prefetchClusterWide, "jobs", batchV1.list_job_for_all_namespaces, namespaces),
+                    executor.submit(prefetchClusterWide, "deployments", appsV1.list_deployment_for_all_namespaces, namespaces),
+                ]
+                for future in prefetches:
+                    future.result()
+
+            jobFuture = stages.submit(runStage, "jobs", monitorNamespaceJobs, namespaces, executor, batchV1)
+            deploymentFuture = stages.submit(runStage, "deployments", monitorNamespaceDeployments, namespaces, executor, appsV1)
+
+            gpuMetrics, gpuTimer = gpuFuture.result()
+            podData, podTimer = runStage("pods", monitorNamespacePods, namespaces, executor, gpuMetrics, v1, appsV1)
+            jobData, jobTimer = jobFuture.result()
+            deploymentData, deploymentTimer = deploymentFuture.result()
+    finally:
+        # A failed prefetch or stage must not leave stale listings for the next run
+        clearPrefetched()
+
+    timings = {timer.stage: timer.asDict() for timer in (gpuTimer, podTimer, jobTimer, deploymentTimer)}
+    timings["total"] = {"wallSeconds": time.perf_counter() - wallStart}
+    timings["api"] = getApiStats()
+    logger.info(f"Pipeline finished in {timings['total']['wallSeconds']:.2f}s "
+                f"({timings['api']['requests']} API requests over {timings['api']['connectionsOpened']} connections)")
+    return podData, jobData, deploymentData, timings
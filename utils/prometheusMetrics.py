@@ -0,0 +1,110 @@
+import re
+import requests
+from requests.adapters import HTTPAdapter
+from utils.config import PROMETHEUS_URL, PROMETHEUS_CA_BUNDLE, PROMETHEUS_TIMEOUT, PROMETHEUS_POOL_SIZE
+from utils.gpuMetrics import SCRAPE_ERROR_MESSAGE
+from utils.tracing import traced
+from utils.logger import logger
+
+# PromQL equivalents of the panels on the Grafana
+# "k8s-compute-resources-namespace-gpus" dashboard.
+GPU_REQUESTED_QUERY = (
+    'sum by (namespace, pod) (kube_pod_container_resource_requests'
+    '{{resource="nvidia_com_gpu", namespace=~"{namespaces}"}})'
+)
+GPU_UTILIZATION_QUERY = (
+    'avg by (namespace, pod, modelName) (DCGM_FI_DEV_GPU_UTIL{{namespace=~"{namespaces}"}})'
+)
+NAMESPACE_GPU_USAGE_QUERY = (
+    'avg by (namespace) (DCGM_FI_DEV_GPU_UTIL{{namespace=~"{namespaces}"}})'
+)
+
+_session = None
+
+def getSession():
+    """Return a pooled HTTP session shared by every query."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=PROMETHEUS_POOL_SIZE)
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+        if PROMETHEUS_CA_BUNDLE:
+            _session.verify = PROMETHEUS_CA_BUNDLE
+    return _session
+
+# Characters with a meaning in RE2; re.escape would also escape "-", and
+# "\-" is not a valid escape inside a PromQL string literal
+REGEX_METACHARACTERS = re.compile(r"([\\.+*?()|\[\]{}^$])")
+
+def namespaceRegex(namespaces):
+    """Build a regex matching exactly the given namespaces, quoted for a PromQL string literal."""
+    pattern = "|".join(REGEX_METACHARACTERS.sub(r"\\\1", namespace) for namespace in namespaces)
+    return pattern.replace("\\", "\\\\").replace('"', '\\"')
+
+@traced("prometheus query", "http")
+def runQuery(query, baseUrl=PROMETHEUS_URL):
+    """Run an instant PromQL query and return its result vector."""
+    response = getSession().post(
+        f"{baseUrl.rstrip('/')}/api/v1/query",
+        data={"query": query},
+        timeout=PROMETHEUS_TIMEOUT,
+    )
+    response.raise_for_status()
+    payload = response.json()
+    if payload.get("status") != "success":
+        raise RuntimeError(f"Prometheus query failed: {payload.get('error', 'unknown error')}")
+    return payload["data"]["result"]
+
+def formatPercentage(value):
+    """Format a sample value like the Grafana panels do (e.g., '42.5%')."""
+    return f"{float(value):.1f}%"
+
+def queryGpuMetrics(namespaces, baseUrl=PROMETHEUS_URL):
+    """Fetch GPU metrics for all namespaces with one query per panel.
+
+    Returns the same {namespace: {"gpuMetrics": [...], "currentGpuUsage": ...}}
+    shape as scrapeGpuMetrics.
+    """
+    results = {}
+    regex = namespaceRegex(namespaces)
+    logger.info(f"Querying Prometheus GPU metrics for {len(namespaces)} namespaces...")
+
+    try:
+        requested = runQuery(GPU_REQUESTED_QUERY.format(namespaces=regex), baseUrl)
+        utilization = runQuery(GPU_UTILIZATION_QUERY.format(namespaces=regex), baseUrl)
+        usage = runQuery(NAMESPACE_GPU_USAGE_QUERY.format(namespaces=regex), baseUrl)
+    except (requests.RequestException, RuntimeError, ValueError) as e:
+        logger.error(f"Error while querying Prometheus GPU metrics: {e}")
+        return {namespace: {"message": SCRAPE_ERROR_MESSAGE} for namespace in namespaces}
+
+    requestedByPod = {
+        (sample["metric"]["namespace"], sample["metric"]["pod"]): sample["value"][1]
+        for sample in requested
+    }
+    gpuData = {namespace: [] for namespace in namespaces}
+    for sample in utilization:
+        namespace = sample["metric"].get("namespace")
+        podName = sample["metric"].get("pod")
+        if namespace not in gpuData or not podName:
+            continue
+        gpuData[namespace].append({
+            "model": sample["metric"].get("modelName", ""),
+            "podName": podName,
+            "gpuRequested": str(int(float(requestedByPod.get((namespace, podName), 0)))),
+            "gpuUtilizationPercentage": formatPercentage(sample["value"][1]),
+        })
+    usageByNamespace = {sample["metric"]["namespace"]: formatPercentage(sample["value"][1]) for sample in usage}
+
+    for namespace in namespaces:
+        if not gpuData[namespace]:
+            logger.error(f"Namespace '{namespace}' has no monitored instances to scrape.")
+            results[namespace] = {"message": "No monitored instances to scrape"}
+            continue
+        results[namespace] = {
+            "gpuMetrics": gpuData[namespace],
+            "currentGpuUsage": usageByNamespace.get(namespace),
+        }
+
+    logger.info("Prometheus query complete.")
+    return results
@@ -0,0 +1,109 @@
+import json
+import os
+from datetime import datetime, timedelta
+from utils.config import REPORT_AGGREGATES_DIR, REPORT_FINALIZE_GRACE_HOURS
+from utils.tracing import traced
+from utils.violationEvents import eventFilePath, readEvents
+from utils.logger import logger
+
+class DayAggregate:
+    """Violation counts of one UTC day, per resource and violation code.
+
+    The day's event file is folded in from the byte offset reached last
+    time, so each event is parsed once. Once the day has ended and its file
+    has not changed for REPORT_FINALIZE_GRACE_HOURS, the aggregate is marked
+    final and the event file is never opened again.
+    """
+
+    def __init__(self, date, directory=REPORT_AGGREGATES_DIR):
+        self.date = date
+        self.path = os.path.join(directory, f"day_{date}.json")
+        self.offset = 0
+        self.final = False
+        self.events = 0
+        self.resources = {}
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, "r") as file:
+                state = json.load(file)
+            self.offset = state["offset"]
+            self.final = state["final"]
+            self.events = state["events"]
+            self.resources = state["resources"]
+        return self
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmpPath = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmpPath, "w") as file:
+            json.dump({"date": str(self.date), "offset": self.offset, "final": self.final, "events": self.events,
+                       "resources": self.resources}, file, separators=(",", ":"))
+        os.replace(tmpPath, self.path)
+
+    def add(self, event):
+        entry = self.resources.setdefault(event["uid"], {
+            "namespace": event["namespace"],
+            "kind": event["kind"],
+            "name": event["name"],
+            "codes": {},
+        })
+        code = entry["codes"].setdefault(event["code"], {"count": 0, "severity": event["severity"], "lastMessage": None})
+        code["count"] += 1
+        code["severity"] = event["severity"]
+        code["lastMessage"] = event["message"]
+        self.events += 1
+
+    def update(self, now):
+        """Fold in the events appended since the last update; returns how many were added."""
+        if self.final:
+            return 0
+        path = eventFilePath(self.date)
+        added = 0
+        if os.path.exists(path):
+            events, self.offset = readEvents(path, self.offset)
+            for event in events:
+                self.add(event)
+            added = len(events)
+        # A run straddling midnight may still append to the day, and its file may
+        # show up late, so the day is frozen only after both the day and the file
+        # have been quiet for the grace period
+        grace = timedelta(hours=REPORT_FINALIZE_GRACE_HOURS)
+        dayEnd = datetime.combine(self.date + timedelta(days=1), datetime.min.time())
+        lastWrite = datetime.utcfromtimestamp(os.path.getmtime(path)) if os.path.exists(path) else dayEnd
+        self.final = now - max(dayEnd, lastWrite) >= grace
+        if added or self.final:
+            self.save()
+        logger.debug(f"Folded {added} events of {self.date} into its aggregate (final: {self.final})")
+        return added
+
+@traced("load report aggregates", "io")
+def loadDayAggregates(days=7, now=None, directory=REPORT_AGGREGATES_DIR):
+    """Return the up-to-date aggregates of the last `days` UTC days, oldest first."""
+    now = now or datetime.utcnow()
+    today = now.date()
+    aggregates = []
+    for daysAgo in range(days - 1, -1, -1):
+        aggregate = DayAggregate(today - timedelta(days=daysAgo), directory).load()
+        aggregate.update(now)
+        aggregates.append(aggregate)
+    return aggregates
+
+def mergeAggregates(aggregates):
+    """Merge day aggregates into {uid: {namespace, kind, name, codes: {code: {count, severity, lastMessage}}}}."""
+    merged = {}
+    for aggregate in aggregates:
+        for uid, resource in aggregate.resources.items():
+            entry = merged.setdefault(uid, {
+                "namespace": resource["namespace"],
+                "kind": resource["kind"],
+                "name": resource["name"],
+                "codes": {},
+            })
+            for code, counts in resource["codes"].items():
+                total = entry["codes"].setdefault(code, {"count": 0, "severity": counts["severity"], "lastMessage": None})
+                total["count"] += counts["count"]
+                # Aggregates are merged oldest first, so the newest day's values win
+                total["severity"] = counts["severity"]
+                total["lastMessage"] = counts["lastMessage"]
+    return merged
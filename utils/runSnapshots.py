@@ -0,0 +1,103 @@
+import fcntl
+import gzip
+import json
+import os
+import uuid
+from datetime import datetime
+from utils.config import RUN_SNAPSHOTS_DIR, RUN_SNAPSHOT_COMPRESS
+from utils.tracing import traced
+from utils.logger import logger
+
+# Every run appends its resource records, one compact JSON object per line,
+# to the day's snapshot file and one line locating them to runs_index.jsonl.
+# Compressed runs are written as separate gzip members, so a run can be read
+# by seeking to its offset and decompressing only `length` bytes.
+
+INDEX_FILE = "runs_index.jsonl"
+
+def snapshotFileName(date, compress):
+    return f"runs_{date}.jsonl" + (".gz" if compress else "")
+
+def snapshotRecord(resource, runId):
+    return {
+        "runId": runId,
+        "kind": resource["kind"],
+        "namespace": resource["namespace"],
+        "name": resource["name"],
+        "uid": resource["uid"],
+        "age": resource["age"],
+        "status": resource.get("status", ""),
+        "owner": resource.get("owner"),
+        "requestedResources": resource.get("requestedResources", {}),
+        "utilizedResources": resource.get("utilizedResources", {}),
+        "violations": resource["violations"],
+    }
+
+@traced("write run snapshot", "io")
+def writeRunSnapshot(resources, directory=RUN_SNAPSHOTS_DIR, compress=RUN_SNAPSHOT_COMPRESS):
+    """Stream the resource records of a run to the snapshot file and index them; returns the index entry."""
+    now = datetime.utcnow()
+    runId = f"{now.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    fileName = snapshotFileName(now.date(), compress)
+    os.makedirs(directory, exist_ok=True)
+
+    counts = {}
+    with open(os.path.join(directory, fileName), "ab") as snapshotFile:
+        # Other processes may append to the same file; hold it while this run is written
+        fcntl.flock(snapshotFile, fcntl.LOCK_EX)
+        offset = snapshotFile.seek(0, os.SEEK_END)
+        stream = gzip.GzipFile(fileobj=snapshotFile, mode="wb") if compress else snapshotFile
+        for resource in resources:
+            stream.write(json.dumps(snapshotRecord(resource, runId), separators=(",", ":")).encode() + b"\n")
+            counts[resource["kind"]] = counts.get(resource["kind"], 0) + 1
+        if compress:
+            stream.close()
+        snapshotFile.flush()
+        length = snapshotFile.tell() - offset
+
+    entry = {
+        "runId": runId,
+        "timestamp": now.isoformat(),
+        "file": fileName,
+        "offset": offset,
+        "length": length,
+        "compressed": compress,
+        "counts": counts,
+        "violations": sum(len(resource["violations"]) for resource in resources),
+    }
+    with open(os.path.join(directory, INDEX_FILE), "a") as indexFile:
+        indexFile.write(json.dumps(entry, separators=(",", ":")) + "\n")
+    return entry
+
+def loadRunIndex(directory=RUN_SNAPSHOTS_DIR):
+    """Return the index entries of every recorded run, oldest first."""
+    path = os.path.join(directory, INDEX_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as indexFile:
+        return [json.loads(line) for line in indexFile if line.strip()]
+
+def readRunSnapshot(entry, directory=RUN_SNAPSHOTS_DIR):
+    """Return the resource records of the run described by an index entry."""
+    with open(os.path.join(directory, entry["file"]), "rb") as snapshotFile:
+        snapshotFile.seek(entry["offset"])
+        data = snapshotFile.read(entry["length"])
+    if entry["compressed"]:
+        data = gzip.decompress(data)
+    return [json.loads(line) for line in data.splitlines() if line]
+
+def logRunSummary(resources, namespaces, entry):
+    """Log one summary line per namespace instead of the full records."""
+    totals = {}
+    for resource in resources:
+        total = totals.setdefault((resource["namespace"], resource["kind"]), [0, 0])
+        total[0] += 1
+        total[1] += 1 if resource["violations"] else 0
+    for namespace in namespaces:
+        parts = []
+        for kind, label in (("Pod", "pods"), ("Job", "jobs"), ("Deployment", "deployments")):
+            count, flagged = totals.get((namespace, kind), (0, 0))
+            parts.append(f"{count} {label} ({flagged} with violations)")
+        logger.info(f"Namespace '{namespace}': {', '.join(parts)}")
+    logger.info(f"Run {entry['runId']}: {sum(entry['counts'].values())} resource records written to "
+                f"'{os.path.join(RUN_SNAPSHOTS_DIR, entry['file'])}' at offset {entry['offset']}")
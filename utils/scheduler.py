@@ -0,0 +1,124 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.config import PIPELINE_MAX_WORKERS, DAEMON_MIN_INTERVAL, DAEMON_BASE_INTERVAL, DAEMON_MAX_INTERVAL, DAEMON_JITTER
+from utils.logger import logger
+
+BACKOFF_FACTOR = 1.5  # Interval growth when a task's result does not change
+
+class AdaptiveScheduler:
+    """Run keyed tasks repeatedly with per-key adaptive intervals.
+
+    `runTask(key)` returns a number describing the result (e.g., the number
+    of violations found). When it rises the key is polled twice as often,
+    when it stays the same the interval backs off, and when it falls the
+    interval is kept. A due task whose previous run for the same key is
+    still in flight is skipped.
+    """
+
+    def __init__(self, runTask, maxWorkers=PIPELINE_MAX_WORKERS, minInterval=DAEMON_MIN_INTERVAL,
+                 baseInterval=DAEMON_BASE_INTERVAL, maxInterval=DAEMON_MAX_INTERVAL, jitter=DAEMON_JITTER):
+        self.runTask = runTask
+        self.maxWorkers = maxWorkers
+        self.minInterval = minInterval
+        self.baseInterval = baseInterval
+        self.maxInterval = maxInterval
+        self.jitter = jitter
+        self.condition = threading.Condition()
+        self.queue = []
+        self.sequence = itertools.count()
+        self.keys = set()
+        self.intervals = {}
+        self.lastResults = {}
+        self.running = set()
+        self.stopped = threading.Event()
+
+    def jittered(self, interval):
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def push(self, key, delay):
+        heapq.heappush(self.queue, (time.monotonic() + delay, next(self.sequence), key))
+        self.condition.notify()
+
+    def add(self, key, delay=None, interval=None):
+        """Start scheduling `key`; by default the first runs are spread out by the jitter."""
+        with self.condition:
+            if key in self.keys:
+                return
+            self.keys.add(key)
+            self.intervals[key] = interval or self.baseInterval
+            self.push(key, random.uniform(0, self.intervals[key] * self.jitter) if delay is None else delay)
+
+    def remove(self, key):
+        """Stop scheduling `key`; a run already in flight is allowed to finish."""
+        with self.condition:
+            self.keys.discard(key)
+            self.intervals.pop(key, None)
+            self.lastResults.pop(key, None)
+
+    def adapt(self, key, result):
+        """Return the next interval of `key` given the result of its last run."""
+        interval = self.intervals.get(key, self.baseInterval)
+        previous = self.lastResults.get(key)
+        if previous is not None and result is not None:
+            if result > previous:
+                interval = max(self.minInterval, interval / 2)
+            elif result == previous:
+                interval = min(self.maxInterval, interval * BACKOFF_FACTOR)
+        self.lastResults[key] = result
+        self.intervals[key] = interval
+        return interval
+
+    def execute(self, key):
+        result = None
+        try:
+            result = self.runTask(key)
+        except Exception as e:
+            logger.error(f"Scheduled task {key} failed: {e}")
+        finally:
+            with self.condition:
+                self.running.discard(key)
+                if key in self.keys and not self.stopped.is_set():
+                    interval = self.adapt(key, result) if result is not None else self.intervals[key]
+                    self.push(key, self.jittered(interval))
+                    logger.info(f"Next run of {key} in {interval:.0f}s (result: {result})")
+
+    def nextDueKey(self):
+        """Block until a key is due or the scheduler stops; returns None on stop."""
+        with self.condition:
+            while not self.stopped.is_set():
+                if self.queue:
+                    due, _, key = self.queue[0]
+                    wait = due - time.monotonic()
+                    if wait <= 0:
+                        heapq.heappop(self.queue)
+                        if key not in self.keys:
+                            continue
+                        if key in self.running:
+                            # The running task reschedules the key when it finishes
+                            logger.warning(f"Skipping {key}: the previous run is still in progress")
+                            continue
+                        self.running.add(key)
+                        return key
+                else:
+                    wait = None
+                self.condition.wait(wait)
+            return None
+
+    def run(self):
+        """Dispatch due tasks until stop() is called, then wait for running tasks."""
+        with ThreadPoolExecutor(max_workers=self.maxWorkers, thread_name_prefix="scheduled") as executor:
+            while True:
+                key = self.nextDueKey()
+                if key is None:
+                    break
+                executor.submit(self.execute, key)
+            logger.info(f"Scheduler stopping; waiting for {len(self.running)} running tasks...")
+
+    def stop(self):
+        self.stopped.set()
+        with self.condition:
+            self.condition.notify_all()
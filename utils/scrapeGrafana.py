@@ -1,27 +1,76 @@
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
+import importlib.util
 import time
 import traceback
+from utils.config import (
+    GRAFANA_DASHBOARD_URL, GRAFANA_SCRAPE_WORKERS, GRAFANA_PAGE_TIMEOUT, GRAFANA_DOM_QUIET_MS,
+    GRAFANA_ROW_SELECTOR, GRAFANA_CELL_SELECTOR, GRAFANA_GAUGE_SELECTOR, GRAFANA_NO_DATA_SELECTOR,
+)
+from utils.browserSession import getBrowserPool
+from utils.gpuMetrics import SCRAPE_ERROR_MESSAGE
+from utils.metricsExporter import GPU_SCRAPE_SECONDS
+from utils.tracing import span
 from utils.logger import logger
 
+# The C-backed lxml parser is used for the page_source fallback when it is installed
+HTML_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+
+# Collects the table cells and gauge value in the browser and returns them as
+# one small JSON-able object, instead of serializing the whole page.
+EXTRACT_METRICS_SCRIPT = """
+const [rowSelector, cellSelector, gaugeSelector] = arguments;
+const rows = Array.from(document.querySelectorAll(rowSelector), row =>
+    Array.from(row.querySelectorAll(cellSelector), cell => cell.textContent.trim())
+);
+const gauge = document.querySelector(gaugeSelector);
+return {rows: rows, gauge: gauge ? gauge.textContent.trim() : null};
+"""
+
+# Resolves once the DOM has seen no mutations for `quietMs` milliseconds, or
+# when `timeoutMs` elapses, whichever comes first.
+WAIT_FOR_DOM_QUIET_SCRIPT = """
+const quietMs = arguments[0];
+const timeoutMs = arguments[1];
+const done = arguments[arguments.length - 1];
+let quietTimer = null;
+const observer = new MutationObserver(() => {
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(finish, quietMs);
+});
+const hardTimer = setTimeout(finish, timeoutMs);
+function finish() {
+    observer.disconnect();
+    clearTimeout(quietTimer);
+    clearTimeout(hardTimer);
+    done(true);
+}
+observer.observe(document.body, {childList: true, subtree: true, characterData: true});
+quietTimer = setTimeout(finish, quietMs);
+"""
+
+# Per-namespace scrape latency (seconds) of the most recent scrape
+lastScrapeLatencies = {}
+
+def waitForDomQuiet(driver, quietMs=GRAFANA_DOM_QUIET_MS, timeout=GRAFANA_PAGE_TIMEOUT):
+    """Wait until the page stops mutating instead of sleeping a fixed time."""
+    driver.set_script_timeout(timeout + 1)
+    driver.execute_async_script(WAIT_FOR_DOM_QUIET_SCRIPT, quietMs, int(timeout * 1000))
+
 def scrollToBottom(driver):
     """Scroll to the bottom of the page to ensure all elements are rendered."""
-    scroll_pause_time = 1  # Pause to allow content to load
     last_height = driver.execute_script("return document.body.scrollHeight")
 
     while True:
         # Scroll down to the bottom
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
 
-        # Wait for the page to load
-        time.sleep(scroll_pause_time)
+        # Wait for lazily rendered panels to settle
+        waitForDomQuiet(driver)
 
         # Calculate new scroll height and compare with last height
         new_height = driver.execute_script("return document.body.scrollHeight")
@@ -29,105 +78,128 @@ def scrollToBottom(driver):
             break
         last_height = new_height
 
+def metricsFromRows(rows, gauge):
+    """Build the per-namespace result from table rows of cell texts and the gauge text."""
+    gpu_data = [
+        {
+            "model": cells[0],
+            "podName": cells[1],
+            "gpuRequested": cells[2],
+            "gpuUtilizationPercentage": cells[3],
+        }
+        for cells in rows
+        if len(cells) >= 4
+    ]
+    return {
+        "gpuMetrics": gpu_data,
+        "currentGpuUsage": gauge,
+    }
+
+def extractMetricsInBrowser(driver):
+    """Extract the table and gauge with one in-browser script."""
+    extracted = driver.execute_script(EXTRACT_METRICS_SCRIPT, GRAFANA_ROW_SELECTOR, GRAFANA_CELL_SELECTOR, GRAFANA_GAUGE_SELECTOR)
+    return metricsFromRows(extracted["rows"], extracted["gauge"])
+
+def extractMetrics(page_source):
+    """Parse pod-level GPU metrics and the namespace gauge from rendered HTML."""
+    soup = BeautifulSoup(page_source, HTML_PARSER)
+    rows = [
+        [cell.get_text().strip() for cell in row.select(GRAFANA_CELL_SELECTOR)]
+        for row in soup.select(GRAFANA_ROW_SELECTOR)
+    ]
+    gauge = soup.select_one(GRAFANA_GAUGE_SELECTOR)
+    return metricsFromRows(rows, gauge.get_text().strip() if gauge else None)
+
+def scrapeNamespace(driver, namespace, retries=2):
+    """Scrape a single namespace dashboard on the given driver."""
+    url = f"{GRAFANA_DASHBOARD_URL}{namespace}"
+    logger.info(f"Scraping namespace '{namespace}'...")
+
+    for attempt in range(retries):
+        try:
+            with span("grafana page load", "browser", namespace=namespace, attempt=attempt + 1):
+                # Load namespace page
+                driver.get(url)
 
-def scrapeGpuMetrics(namespaces, retries=2):
-    base_url = "https://grafana.nrp-nautilus.io/d/dRG9q0Ymz/k8s-compute-resources-namespace-gpus?orgId=1&refresh=30s&var-namespace="
-    results = {}
-
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")  # Enable headless mode; remove for debugging
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--window-size=1920,1080")
-    chrome_options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/113.0.0.0 Safari/537.36")
+                # Wait for either the table rows or the "No data" placeholder, whichever renders first
+                WebDriverWait(driver, GRAFANA_PAGE_TIMEOUT).until(
+                    EC.any_of(
+                        EC.presence_of_element_located((By.CSS_SELECTOR, GRAFANA_ROW_SELECTOR)),
+                        EC.text_to_be_present_in_element((By.CSS_SELECTOR, GRAFANA_NO_DATA_SELECTOR), "No data"),
+                    )
+                )
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+            # Check if "No data" is present
+            no_data_elements = driver.find_elements(By.CSS_SELECTOR, GRAFANA_NO_DATA_SELECTOR)
+            if any("No data" in element.text for element in no_data_elements) and not driver.find_elements(By.CSS_SELECTOR, GRAFANA_ROW_SELECTOR):
+                logger.error(f"Namespace '{namespace}' has no monitored instances to scrape.")
+                return {"message": "No monitored instances to scrape"}
 
-    for namespace in namespaces:
-        url = f"{base_url}{namespace}"
-        logger.info(f"Scraping namespace '{namespace}'...")
+            # Scroll to the bottom to ensure all elements are rendered
+            scrollToBottom(driver)
 
-        success = False
-        for attempt in range(retries):
+            # Read the table in the browser; parse the serialized page only if that fails
             try:
-                # Load namespace page
-                driver.get(url)
+                return extractMetricsInBrowser(driver)
+            except (WebDriverException, KeyError, TypeError) as e:
+                logger.warning(f"In-browser extraction failed for namespace '{namespace}', parsing the page source instead: {e}")
+                return extractMetrics(driver.page_source)
 
-                # Scroll to the bottom to ensure all elements are rendered
-                scrollToBottom(driver)
+        except TimeoutException:
+            logger.error(f"Timeout while scraping namespace '{namespace}' on attempt {attempt + 1}")
+        except Exception as e:
+            logger.error(f"Error while scraping namespace '{namespace}' on attempt {attempt + 1}: {traceback.format_exc()}")
 
-                # Check if "No data" is present
-                try:
-                    no_data_element = WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.CLASS_NAME, "css-1k75hwm"))
-                    )
-                    if "No data" in no_data_element.text:
-                        logger.error(f"Namespace '{namespace}' has no monitored instances to scrape.")
-                        results[namespace] = {"message": "No monitored instances to scrape"}
-                        success = True
-                        break
-                except TimeoutException:
-                    pass
-
-                # Wait dynamically for rows or specific identifiers to load
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_all_elements_located((By.CLASS_NAME, "css-8fjwhi-row"))
-                )
+    return {"message": SCRAPE_ERROR_MESSAGE}
 
-                # Parse the rendered HTML
-                soup = BeautifulSoup(driver.page_source, "html.parser")
-
-                # Extract Pod-level GPU metrics
-                gpu_data = []
-                rows = soup.find_all("div", class_="css-8fjwhi-row")
-
-                for row in rows:
-                    columns = row.find_all("div", class_=lambda value: value and "cellContainerOverflow" in value)
-                    if len(columns) >= 4:
-                        model = columns[0].text.strip()
-                        pod_name = columns[1].text.strip()
-                        gpu_requested = columns[2].text.strip()
-                        gpu_utilization_percentage = columns[3].text.strip()
-
-                        gpu_data.append({
-                            "model": model,
-                            "podName": pod_name,
-                            "gpuRequested": gpu_requested,
-                            "gpuUtilizationPercentage": gpu_utilization_percentage
-                        })
-
-                # Extract Current GPU Usage
-                current_gpu_usage = None
-                gpu_usage_span = soup.find("span", id="flotGaugeValue")
-                if gpu_usage_span:
-                    current_gpu_usage = gpu_usage_span.text.strip()
-
-                results[namespace] = {
-                    "gpuMetrics": gpu_data,
-                    "currentGpuUsage": current_gpu_usage
-                }
-                success = True
-                break  # Exit retry loop if successful
-
-            except TimeoutException:
-                logger.error(f"Timeout while scraping namespace '{namespace}' on attempt {attempt + 1}")
-            except Exception as e:
-                logger.error(f"Error while scraping namespace '{namespace}' on attempt {attempt + 1}: {traceback.format_exc()}")
-
-        if not success and namespace not in results:
-            results[namespace] = {"message": "Error while scraping this namespace"}
-
-    logger.info("Scrape complete.")
-    driver.quit()
+def scrapeGpuMetrics(namespaces, retries=2, workers=GRAFANA_SCRAPE_WORKERS):
+    """Scrape GPU metrics for all namespaces on up to `workers` warm browsers.
+
+    The browsers stay open between calls; they are restarted when they stop
+    responding or have loaded GRAFANA_RECYCLE_PAGES pages.
+    """
+    results = {}
+    if not namespaces:
+        return results
+    # The pool is sized for the configured workers whatever this call's batch size:
+    # the daemon scrapes one namespace per call, from several threads at once
+    pool = getBrowserPool(max(1, workers))
+    workers = max(1, min(workers, len(namespaces)))
+
+    def scrapeWithPooledDriver(namespace):
+        session = pool.checkout()
+        start = time.perf_counter()
+        try:
+            return scrapeNamespace(session.acquire(), namespace, retries)
+        except Exception:
+            logger.error(f"Could not start a browser for namespace '{namespace}': {traceback.format_exc()}")
+            session.quit()
+            return {"message": SCRAPE_ERROR_MESSAGE}
+        finally:
+            lastScrapeLatencies[namespace] = time.perf_counter() - start
+            GPU_SCRAPE_SECONDS.set(lastScrapeLatencies[namespace], namespace=namespace)
+            logger.info(f"Scraped namespace '{namespace}' in {lastScrapeLatencies[namespace]:.2f}s")
+            pool.checkin(session)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for namespace, result in zip(namespaces, executor.map(scrapeWithPooledDriver, namespaces)):
+            results[namespace] = result
+
+    elapsed = time.perf_counter() - start
+    slowest = max(namespaces, key=lambda namespace: lastScrapeLatencies.get(namespace, 0))
+    logger.info(f"Scrape complete in {elapsed:.2f}s using {workers} browsers (slowest: '{slowest}' at {lastScrapeLatencies[slowest]:.2f}s).")
     return results
 
 
 # Example Usage
 if __name__ == "__main__":
+    from utils.gpuMetricsCache import getGpuMetricsCache
+
     # namespaces = ["gilpin-lab", "aiea-auditors", "aiea-interns"]
     namespaces = ["gilpin-lab", "aiea-auditors", "aiea-interns"]
 
-    gpu_metrics = scrapeGpuMetrics(namespaces)
+    gpu_metrics = getGpuMetricsCache().fetch(namespaces, scrapeGpuMetrics, "grafana")
     for namespace, metrics in gpu_metrics.items():
         print(f"Namespace: {namespace}")
         print(metrics)
@@ -0,0 +1,155 @@
+import bisect
+import hashlib
+import multiprocessing
+import os
+import queue
+import time
+from utils.config import SHARD_WORKERS, UTILIZATION_HISTORY_FILE
+from utils.metricsExporter import STAGE_SECONDS, API_REQUESTS, GPU_SCRAPE_FAILURES
+from utils.logger import logger
+
+VIRTUAL_NODES = 64  # Points per shard on the hash ring; more points spread namespaces more evenly
+
+def ringHash(key):
+    return int(hashlib.md5(key.encode()).hexdigest()[:16], 16)
+
+class HashRing:
+    """Consistent-hash ring assigning namespaces to shards.
+
+    Removing a shard only moves the namespaces it owned, so the others keep
+    their namespaces (and their per-shard utilization history).
+    """
+
+    def __init__(self, shards, virtualNodes=VIRTUAL_NODES):
+        self.virtualNodes = virtualNodes
+        self.points = []
+        self.owners = {}
+        for shard in shards:
+            self.add(shard)
+
+    def add(self, shard):
+        for replica in range(self.virtualNodes):
+            point = ringHash(f"{shard}#{replica}")
+            bisect.insort(self.points, point)
+            self.owners[point] = shard
+
+    def remove(self, shard):
+        self.points = [point for point in self.points if self.owners[point] != shard]
+        self.owners = {point: owner for point, owner in self.owners.items() if owner != shard}
+
+    def shards(self):
+        return set(self.owners.values())
+
+    def assign(self, key):
+        index = bisect.bisect(self.points, ringHash(key)) % len(self.points)
+        return self.owners[self.points[index]]
+
+    def partition(self, keys):
+        """Group keys by the shard owning them."""
+        partitions = {}
+        for key in keys:
+            partitions.setdefault(self.assign(key), []).append(key)
+        return partitions
+
+def shardHistoryPath(shard):
+    root, extension = os.path.splitext(UTILIZATION_HISTORY_FILE)
+    return f"{root}-{shard}{extension}"
+
+def shardWorker(shard, namespaces, results):
+    """Run the monitors for one shard in a worker process and send back the records."""
+    # Imported here so the spawned process builds its own API client and history
+    from utils.pipeline import runPipeline
+    from utils.utilizationHistory import UtilizationHistory, setUtilizationHistory
+
+    history = UtilizationHistory(path=shardHistoryPath(shard)).open()
+    setUtilizationHistory(history)
+    podData, jobData, deploymentData, timings = runPipeline(namespaces)
+    history.evict()
+    history.flush()
+    # The spawned process starts with empty metrics, so these are this shard's failures only
+    timings["gpuScrapeFailures"] = [
+        {**dict(zip(GPU_SCRAPE_FAILURES.labelNames, key)), "count": count}
+        for key, count in GPU_SCRAPE_FAILURES.values.items()
+    ]
+    results.put((shard, podData, jobData, deploymentData, timings))
+
+def runShards(context, partitions, results):
+    """Start one process per shard; return the received results and the shards that died."""
+    processes = {
+        shard: context.Process(target=shardWorker, args=(shard, namespaces, results), name=f"nautilus-{shard}")
+        for shard, namespaces in partitions.items()
+    }
+    for process in processes.values():
+        process.start()
+
+    received = {}
+    failed = set()
+    while len(received) + len(failed) < len(processes):
+        try:
+            shard, *data = results.get(timeout=1)
+            received[shard] = data
+            continue
+        except queue.Empty:
+            pass
+        # Results are queued before a worker exits, so drain them before declaring it dead
+        while True:
+            try:
+                shard, *data = results.get_nowait()
+                received[shard] = data
+            except queue.Empty:
+                break
+        for shard, process in processes.items():
+            if shard not in received and shard not in failed and not process.is_alive():
+                logger.error(f"Worker for {shard} exited with code {process.exitcode} before reporting results")
+                failed.add(shard)
+
+    for process in processes.values():
+        process.join()
+    return received, failed
+
+def runShardedPipeline(namespaces, workers=SHARD_WORKERS):
+    """Run the pipeline with namespaces spread over `workers` processes.
+
+    Each worker lists, scrapes and checks its shard with its own API client;
+    this process merges the records. When a worker dies its namespaces are
+    rehashed over the remaining shards and run again.
+    Returns (podData, jobData, deploymentData, timings).
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    ring = HashRing([f"shard-{index}" for index in range(workers)])
+    podData, jobData, deploymentData = [], [], []
+    timings = {"shards": {}}
+
+    wallStart = time.perf_counter()
+    pending = list(namespaces)
+    while pending:
+        partitions = ring.partition(pending)
+        logger.info(f"Running {len(pending)} namespaces on {len(partitions)} worker processes")
+        received, failed = runShards(context, partitions, results)
+
+        for shard, (shardPods, shardJobs, shardDeployments, shardTimings) in received.items():
+            podData.extend(shardPods)
+            jobData.extend(shardJobs)
+            deploymentData.extend(shardDeployments)
+            timings["shards"].setdefault(shard, []).append({"namespaces": partitions[shard], **shardTimings})
+            # Worker metrics die with the worker, so fold its stage, API and scrape failure totals into this process
+            for stage in ("gpuMetrics", "pods", "jobs", "deployments"):
+                STAGE_SECONDS.observe(shardTimings[stage]["wallSeconds"], stage=stage, scope="shard")
+            API_REQUESTS.inc(shardTimings["api"]["requests"] - shardTimings["api"]["errors"], outcome="success")
+            API_REQUESTS.inc(shardTimings["api"]["errors"], outcome="error")
+            for failure in shardTimings["gpuScrapeFailures"]:
+                GPU_SCRAPE_FAILURES.inc(failure["count"], backend=failure["backend"], namespace=failure["namespace"])
+
+        pending = [namespace for shard in failed for namespace in partitions[shard]]
+        for shard in failed:
+            ring.remove(shard)
+        if pending and not ring.shards():
+            logger.error(f"All worker processes failed; {len(pending)} namespaces were not monitored")
+            break
+        if pending:
+            logger.warning(f"Rebalancing {len(pending)} namespaces over {len(ring.shards())} remaining shards")
+
+    timings["total"] = {"wallSeconds": time.perf_counter() - wallStart}
+    logger.info(f"Sharded pipeline finished in {timings['total']['wallSeconds']:.2f}s")
+    return podData, jobData, deploymentData, timings
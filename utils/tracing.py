@@ -0,0 +1,205 @@
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from functools import wraps
+from utils.config import TRACE_ENABLED, TRACE_DIR, PROFILE_MODE, PROFILE_SAMPLE_INTERVAL
+from utils.logger import logger
+
+# Spans are recorded only while tracing is enabled; otherwise span() returns
+# one shared no-op context manager, so instrumented code pays a single
+# attribute check per call.
+
+_disabledSpan = nullcontext()
+
+class Tracer:
+    """Collect spans as Chrome trace events ("X" complete events)."""
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.events = []
+        self.origin = time.perf_counter()
+
+    def enable(self):
+        with self.lock:
+            self.enabled = True
+            self.events = []
+            self.origin = time.perf_counter()
+
+    def record(self, name, category, start, end, args):
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self.origin) * 1e6,
+            "dur": (end - start) * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        }
+        if args:
+            event["args"] = args
+        with self.lock:
+            self.events.append(event)
+
+    @contextmanager
+    def span(self, name, category, args):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, category, start, time.perf_counter(), args)
+
+    def export(self, path):
+        """Write the collected spans as a Chrome trace-event JSON file (chrome://tracing, Perfetto)."""
+        threadNames = [
+            {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": thread.ident, "args": {"name": thread.name}}
+            for thread in threading.enumerate()
+        ]
+        with self.lock:
+            events = threadNames + list(self.events)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file, separators=(",", ":"))
+        logger.info(f"Wrote {len(events) - len(threadNames)} trace spans to '{path}'")
+        return path
+
+tracer = Tracer()
+
+def span(name, category="stage", **args):
+    """Time a block as a trace span when tracing is enabled."""
+    if not tracer.enabled:
+        return _disabledSpan
+    return tracer.span(name, category, args)
+
+def traced(name=None, category="stage"):
+    """Decorator tracing every call of a function as a span."""
+    def decorator(func):
+        spanName = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(spanName, category, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class SamplingProfiler:
+    """Sample the stacks of every thread at a fixed interval into collapsed-stack counts.
+
+    The output can be rendered with flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.samples = Counter()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def sample(self):
+        ownIdent = threading.get_ident()
+        threadNames = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == ownIdent:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(f"{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(threadNames.get(ident, str(ident)))
+            self.samples[";".join(reversed(stack))] += 1
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="sampling-profiler", daemon=True)
+        self.thread.start()
+
+    def stop(self, path):
+        self.stopped.set()
+        self.thread.join()
+        with open(path, "w") as file:
+            for stack, count in self.samples.most_common():
+                file.write(f"{stack} {count}\n")
+        return path
+
+class ThreadedCProfile:
+    """cProfile every thread started while active and merge the results.
+
+    Pipeline work runs on executor threads, so profiling only the main
+    thread would show little more than waiting on futures.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.profiles = []
+
+    def startThread(self, *args):
+        profile = cProfile.Profile()
+        with self.lock:
+            self.profiles.append(profile)
+        profile.enable()
+
+    def start(self):
+        threading.setprofile(self.startThread)
+        self.startThread()
+
+    def stop(self, path):
+        threading.setprofile(None)
+        self.profiles[0].disable()  # The starting thread; the others stopped with their threads
+        with self.lock:
+            profiles = list(self.profiles)
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            try:
+                stats.add(profile)
+            except TypeError:
+                pass  # A profile of a thread that never ran any code
+        stats.dump_stats(path)
+        return path
+
+PROFILERS = {
+    "cprofile": (ThreadedCProfile, "prof"),
+    "sample": (SamplingProfiler, "folded"),
+}
+
+_profiler = None
+
+def runStamp():
+    return datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+
+def startTracing(trace=TRACE_ENABLED, profile=PROFILE_MODE):
+    """Enable span collection and/or start the profiler selected by `profile` ("cprofile" or "sample")."""
+    global _profiler
+    if trace:
+        tracer.enable()
+    if profile:
+        if profile not in PROFILERS:
+            raise ValueError(f"Unsupported profiler: {profile}")
+        _profiler = PROFILERS[profile][0]()
+        _profiler.start()
+        logger.info(f"Profiling this run with '{profile}'")
+
+def stopTracing(name="run"):
+    """Write the trace and profile of this run to TRACE_DIR and disable both."""
+    global _profiler
+    stamp = runStamp()
+    if tracer.enabled:
+        tracer.export(os.path.join(TRACE_DIR, f"{name}_{stamp}.trace.json"))
+        tracer.enabled = False
+    if _profiler is not None:
+        extension = next(extension for profiler, extension in PROFILERS.values() if isinstance(_profiler, profiler))
+        os.makedirs(TRACE_DIR, exist_ok=True)
+        path = _profiler.stop(os.path.join(TRACE_DIR, f"{name}_{stamp}.{extension}"))
+        logger.info(f"Wrote profile to '{path}'")
+        _profiler = None
@@ -1,68 +1,33 @@
-import json
-import os
-from datetime import datetime, timedelta
+from datetime import datetime
+from utils.config import WEEKLY_VIOLATION_ALERT_THRESHOLD
+from utils.violationStore import getViolationStore
 from utils.logger import logger
 
-LOG_FILE = "logs/violations/violationsByUid.json"
-
-ONE_WEEK_AGO = datetime.utcnow() - timedelta(weeks=1)
-
-def loadViolations():
-    """Load existing violations from file."""
-    if not os.path.exists(LOG_FILE):
-        return {}
-    with open(LOG_FILE, "r") as file:
-        return json.load(file)
-
-def saveViolations(data):
-    """Save violations to file."""
-    with open(LOG_FILE, "w") as file:
-        json.dump(data, file, indent=4)
-
-def cleanOldViolations(violations):
-    """Remove violations older than a week."""
-    return [
-        v for v in violations
-        if datetime.fromisoformat(v["timestamp"]) >= ONE_WEEK_AGO
+def trackRunViolations(resources):
+    """Record the violations of every resource in a run with one transaction."""
+    records = [
+        (resource["uid"], resource["namespace"], resource["name"], resource["violations"])
+        for resource in resources
+        if resource["violations"]
     ]
-
-def updateUidViolationLog(uid, namespace, name, violations):
-    """Update violations log for a UID."""
-    if not violations:
+    if not records:
         return
 
-    data = loadViolations()
-    if uid not in data:
-        data[uid] = {
-            "namespace": namespace,
-            "name": name,
-            "violations": [],
-            "weeklyCounts": {},
-            "totalCounts": {},
-        }
-
-    data[uid]["violations"] = cleanOldViolations(data[uid]["violations"])
-    timestamp = datetime.utcnow().isoformat()
-
-    for violation in violations:
-        data[uid]["violations"].append({"timestamp": timestamp, "type": violation})
-
-        # Update counts
-        data[uid]["weeklyCounts"][violation] = data[uid]["weeklyCounts"].get(violation, 0) + 1
-        data[uid]["totalCounts"][violation] = data[uid]["totalCounts"].get(violation, 0) + 1
-
-        # Check for critical thresholds
-        if data[uid]["weeklyCounts"][violation] >= 3:
-            logger.critical(
-                f"CRITICAL ALERT: User '{name}' (UID: {uid}) in namespace '{namespace}' "
-                f"has exceeded 3 violations of type '{violation}' this week."
-            )
-
-    saveViolations(data)
-
-def resetWeeklyCounts():
-    """Reset weekly counts at the end of the week."""
-    data = loadViolations()
-    for uid in data:
-        data[uid]["weeklyCounts"] = {}
-    saveViolations(data)
+    store = getViolationStore()
+    now = datetime.utcnow()
+    store.recordViolations(records, timestamp=now.isoformat())
+
+    # Alert on resources that had the same violation on enough separate days this
+    # week, once a day: a daemon records every few minutes, so raw row counts
+    # would cross the threshold within minutes and then alert on every run
+    uids = [record[0] for record in records]
+    weeklyDays = store.activeDays(uids=uids)
+    earlierToday = store.activeDays(uids=uids, since=datetime.combine(now.date(), datetime.min.time()), until=now)
+    for uid, namespace, name, violations in records:
+        for violation in set(violations):
+            days = weeklyDays.get(uid, {}).get(violation, 0)
+            if days >= WEEKLY_VIOLATION_ALERT_THRESHOLD and violation not in earlierToday.get(uid, {}):
+                logger.critical(
+                    f"CRITICAL ALERT: User '{name}' (UID: {uid}) in namespace '{namespace}' "
+                    f"has had violations of type '{violation}' on {days} days this week."
+                )
@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+import time
+import numpy as np
+from utils.config import UTILIZATION_HISTORY_FILE, UTILIZATION_HISTORY_SLOTS, UTILIZATION_HISTORY_MAX_PODS, UTILIZATION_WINDOW_HOURS
+from utils.tracing import traced
+from utils.logger import logger
+
+# One sample: when it was taken, CPU cores, memory bytes and GPU utilization percent (NaN if unknown)
+SAMPLE_DTYPE = np.dtype([("timestamp", "f8"), ("cpu", "f4"), ("memory", "f4"), ("gpu", "f4")])
+
+class UtilizationHistory:
+    """Fixed-size ring buffer of utilization samples per pod UID.
+
+    Samples live in a memory-mapped array of `maxPods` rows by `slots`
+    samples, so the memory budget is fixed and the history survives
+    restarts. The UID to row mapping is kept in a small JSON index next
+    to it.
+
+    Each slot is a fixed time bucket of `windowHours / slots` and keeps the
+    latest sample taken in it, so a row always spans `windowHours` however
+    often pods are sampled, and the window mean weighs time, not samples.
+    """
+
+    def __init__(self, path=UTILIZATION_HISTORY_FILE, slots=UTILIZATION_HISTORY_SLOTS, maxPods=UTILIZATION_HISTORY_MAX_PODS,
+                 windowHours=UTILIZATION_WINDOW_HOURS):
+        self.path = path
+        self.indexPath = f"{path}.index.json"
+        self.slots = slots
+        self.maxPods = maxPods
+        self.bucketSeconds = windowHours * 3600 / slots
+        self.lock = threading.Lock()
+        self.rows = {}
+        self.freeRows = []
+        self.samples = None
+
+    def open(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        index = None
+        if os.path.exists(self.indexPath) and os.path.exists(self.path):
+            with open(self.indexPath, "r") as file:
+                index = json.load(file)
+            if (index.get("slots"), index.get("maxPods"), index.get("bucketSeconds")) != (self.slots, self.maxPods, self.bucketSeconds):
+                logger.warning(f"Utilization history layout changed; starting a new history at '{self.path}'")
+                index = None
+
+        mode = "r+" if index is not None else "w+"
+        self.samples = np.memmap(self.path, dtype=SAMPLE_DTYPE, mode=mode, shape=(self.maxPods, self.slots))
+        self.rows = index["rows"] if index is not None else {}
+        used = set(self.rows.values())
+        self.freeRows = [row for row in reversed(range(self.maxPods)) if row not in used]
+        logger.info(f"Utilization history keeps {self.slots} buckets of {self.bucketSeconds:g}s per pod "
+                    f"({self.slots * self.bucketSeconds / 3600:g}h)")
+        return self
+
+    @traced("flush utilization history", "io")
+    def flush(self):
+        """Persist the samples and the UID index."""
+        with self.lock:
+            self.samples.flush()
+            tmpPath = f"{self.indexPath}.tmp"
+            with open(tmpPath, "w") as file:
+                json.dump({"slots": self.slots, "maxPods": self.maxPods, "bucketSeconds": self.bucketSeconds, "rows": self.rows},
+                          file, separators=(",", ":"))
+            os.replace(tmpPath, self.indexPath)
+
+    def freeRow(self, reserved):
+        """Return an unused row, evicting the least recently sampled UID when full."""
+        if self.freeRows:
+            return self.freeRows.pop()
+        lastSeen = self.samples["timestamp"].max(axis=1)
+        lastSeen[list(reserved)] = np.inf  # Never evict a UID of the batch being recorded
+        row = int(lastSeen.argmin())
+        uid = next(uid for uid, uidRow in self.rows.items() if uidRow == row)
+        logger.warning(f"Utilization history is full ({self.maxPods} pods); evicting pod UID '{uid}'")
+        del self.rows[uid]
+        return row
+
+    def assignRows(self, uids):
+        rows = []
+        for uid in uids:
+            row = self.rows.get(uid)
+            if row is None:
+                row = self.rows[uid] = self.freeRow(rows)
+                self.samples[row] = (0.0, np.nan, np.nan, np.nan)
+            rows.append(row)
+        return np.array(rows, dtype=np.intp)
+
+    def record(self, uids, cpu, memory, gpu, timestamp=None):
+        """Store one sample per UID in the slot of its time bucket; `cpu`, `memory` and `gpu` are equal-length arrays.
+
+        A later sample in the same bucket replaces the earlier one, and a
+        bucket reused after a full turn of the ring replaces the old sample.
+        """
+        if not len(uids):
+            return
+        timestamp = timestamp or time.time()
+        slot = int(timestamp // self.bucketSeconds) % self.slots
+        with self.lock:
+            rows = self.assignRows(uids)
+            self.samples[rows, slot] = np.array(
+                list(zip([timestamp] * len(rows), cpu, memory, gpu)), dtype=SAMPLE_DTYPE
+            )
+
+    def window(self, uids, field, hours, now=None):
+        """Return a (len(uids), slots) array of `field` with NaN outside the window."""
+        cutoff = (now or time.time()) - hours * 3600
+        values = np.full((len(uids), self.slots), np.nan, dtype=np.float64)
+        with self.lock:
+            known = [(index, self.rows[uid]) for index, uid in enumerate(uids) if uid in self.rows]
+            if known:
+                indexes, rows = (np.array(column, dtype=np.intp) for column in zip(*known))
+                rowSamples = self.samples[rows]
+                values[indexes] = np.where(rowSamples["timestamp"] >= cutoff, rowSamples[field], np.nan)
+        return values
+
+    def windowMean(self, uids, field, hours=UTILIZATION_WINDOW_HOURS, now=None):
+        """Mean of `field` over the last `hours` per UID, NaN without samples."""
+        values = self.window(uids, field, hours, now)
+        counts = np.count_nonzero(~np.isnan(values), axis=1)
+        # Avoid np.nanmean: its empty-row warning would need warnings.catch_warnings, which is not thread-safe
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, np.nansum(values, axis=1) / counts, np.nan)
+
+    def windowPercentile(self, uids, field, percentile, hours=UTILIZATION_WINDOW_HOURS, now=None):
+        """Percentile of `field` over the last `hours` per UID, NaN without samples."""
+        values = self.window(uids, field, hours, now)
+        result = np.full(len(uids), np.nan)
+        sampled = ~np.isnan(values).all(axis=1)
+        if sampled.any():
+            result[sampled] = np.nanpercentile(values[sampled], percentile, axis=1)
+        return result
+
+    def evict(self, uids=(), maxAgeHours=UTILIZATION_WINDOW_HOURS, now=None):
+        """Forget the given UIDs and every UID without a sample in the last `maxAgeHours`.
+
+        Terminated pods stop producing samples, so they age out on their own.
+        """
+        cutoff = (now or time.time()) - maxAgeHours * 3600
+        with self.lock:
+            lastSeen = self.samples["timestamp"].max(axis=1)
+            stale = {uid for uid, row in self.rows.items() if lastSeen[row] < cutoff} | (set(uids) & set(self.rows))
+            for uid in stale:
+                row = self.rows.pop(uid)
+                self.samples[row]["timestamp"] = 0.0
+                self.freeRows.append(row)
+        if stale:
+            logger.info(f"Evicted {len(stale)} pod UIDs from the utilization history")
+        return len(stale)
+
+_history = None
+_historyLock = threading.Lock()
+
+def setUtilizationHistory(history):
+    """Replace the process-wide utilization history (e.g., with a per-shard file)."""
+    global _history
+    with _historyLock:
+        _history = history
+
+def getUtilizationHistory():
+    """Return the process-wide utilization history, opening it on first use."""
+    global _history
+    with _historyLock:
+        if _history is None:
+            _history = UtilizationHistory().open()
+        return _history
@@ -0,0 +1,118 @@
+import subprocess
+import time
+from kubernetes.client.rest import ApiException
+from utils.kubeClient import customObjectsApi
+from utils.resourceUtil import parseCpu, parseMemory
+from utils.tracing import traced
+from utils.logger import logger
+
+METRICS_GROUP = "metrics.k8s.io"
+METRICS_VERSION = "v1beta1"
+METRICS_API_RETRY_SECONDS = 60  # First wait before trying the metrics API again after it was unavailable
+METRICS_API_MAX_RETRY_SECONDS = 900  # The wait doubles on every further failure up to this
+
+def formatCpu(cores):
+    """Format CPU cores the way 'kubectl top' does (e.g., 0.25 to '250m')."""
+    return f"{int(round(cores * 1000))}m"
+
+def formatMemory(memoryBytes):
+    """Format memory bytes the way 'kubectl top' does (e.g., '128Mi')."""
+    return f"{int(memoryBytes // (1024 * 1024))}Mi"
+
+def aggregateContainers(containers):
+    """Sum per-container usage quantities into a pod-level entry.
+
+    Raw cores and bytes are summed before formatting, so rounding each
+    container to whole millicores or MiB does not add up in the pod total.
+    """
+    usages = {name: (parseCpu(usage["cpu"]), parseMemory(usage["memory"])) for name, usage in containers.items()}
+    return {
+        "cpu": formatCpu(sum(cpu for cpu, _ in usages.values())),
+        "memory": formatMemory(sum(memory for _, memory in usages.values())),
+        "containers": {name: {"cpu": formatCpu(cpu), "memory": formatMemory(memory)} for name, (cpu, memory) in usages.items()},
+    }
+
+class MetricsApiUtilizationProvider:
+    """Fetch utilization for a whole namespace with one PodMetrics list call.
+
+    Falls back to a single namespace-wide 'kubectl top pod' when the
+    metrics.k8s.io API is not served by the cluster, and tries the API again
+    after a growing delay, so a restarting metrics-server is only skipped
+    while it is down.
+    """
+
+    def __init__(self, api=None):
+        self.api = api
+        self.retryAt = 0.0
+        self.retryDelay = METRICS_API_RETRY_SECONDS
+
+    def getApi(self):
+        if self.api is None:
+            self.api = customObjectsApi()
+        return self.api
+
+    def getNamespaceUtilization(self, namespace):
+        """Return {podName: {"cpu", "memory", "containers"}} for a namespace."""
+        if time.monotonic() >= self.retryAt:
+            try:
+                utilization = self.fetchFromMetricsApi(namespace)
+                self.retryDelay = METRICS_API_RETRY_SECONDS
+                return utilization
+            except ApiException as e:
+                if e.status not in (403, 404, 503):
+                    raise
+                logger.error(f"Metrics API unavailable ({e.status}), falling back to 'kubectl top' for namespace '{namespace}' "
+                             f"and retrying the API in {self.retryDelay:g}s")
+                self.retryAt = time.monotonic() + self.retryDelay
+                self.retryDelay = min(self.retryDelay * 2, METRICS_API_MAX_RETRY_SECONDS)
+        return self.fetchFromKubectl(namespace)
+
+    def fetchFromMetricsApi(self, namespace):
+        podMetrics = self.getApi().list_namespaced_custom_object(
+            METRICS_GROUP, METRICS_VERSION, namespace, "pods"
+        )
+        utilization = {}
+        for item in podMetrics.get("items", []):
+            containers = {container["name"]: container["usage"] for container in item.get("containers", [])}
+            utilization[item["metadata"]["name"]] = aggregateContainers(containers)
+        return utilization
+
+    @traced("kubectl top", "subprocess")
+    def fetchFromKubectl(self, namespace):
+        try:
+            output = subprocess.check_output(
+                ["kubectl", "top", "pod", "-n", namespace, "--containers", "--no-headers"],
+                universal_newlines=True,
+            )
+        except subprocess.CalledProcessError:
+            logger.error(f"Failed to fetch utilization with 'kubectl top' for namespace '{namespace}'")
+            return {}
+
+        podContainers = {}
+        for line in output.splitlines():
+            try:
+                podName, containerName, cpuUsage, memoryUsage = line.split()
+            except ValueError:
+                logger.error(f"Error parsing 'kubectl top' line in namespace '{namespace}': {line}")
+                continue
+            podContainers.setdefault(podName, {})[containerName] = {"cpu": cpuUsage, "memory": memoryUsage}
+
+        return {podName: aggregateContainers(containers) for podName, containers in podContainers.items()}
+
+_provider = None
+
+def setUtilizationProvider(provider):
+    """Replace the active provider; any object with getNamespaceUtilization(namespace) works."""
+    global _provider
+    _provider = provider
+
+def getUtilizationProvider():
+    """Return the active provider, creating the metrics API provider on first use."""
+    global _provider
+    if _provider is None:
+        _provider = MetricsApiUtilizationProvider()
+    return _provider
+
+def getNamespaceUtilization(namespace):
+    """Fetch utilization for every pod in a namespace through the active provider."""
+    return getUtilizationProvider().getNamespaceUtilization(namespace)
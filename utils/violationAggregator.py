@@ -0,0 +1,116 @@
+import json
+import os
+from datetime import datetime, timedelta
+from utils.config import AGGREGATES_FILE, AGGREGATE_WINDOW_HOURS, EVENTS_DIR
+from utils.tracing import traced
+from utils.violationEvents import readEvents
+from utils.logger import logger
+
+def hourBucket(timestamp):
+    """Map an ISO timestamp to an hour index."""
+    return int(datetime.fromisoformat(timestamp).timestamp() // 3600)
+
+class ViolationAggregator:
+    """Per-UID sliding-window counters, one per violation code.
+
+    Counts are kept in hourly buckets so events leaving the window can be
+    evicted without re-reading them. The state is persisted with the byte
+    offset read so far in each event file, so each run folds in exactly the
+    lines appended since the last one, even when those were written while
+    the previous run was reading.
+    """
+
+    def __init__(self, path=AGGREGATES_FILE, windowHours=AGGREGATE_WINDOW_HOURS):
+        self.path = path
+        self.windowHours = windowHours
+        self.offsets = {}
+        self.resources = {}
+
+    def load(self):
+        if os.path.exists(self.path):
+            with open(self.path, "r") as file:
+                state = json.load(file)
+            # State saved with a timestamp watermark is rebuilt from the event files
+            if state.get("windowHours") == self.windowHours and "offsets" in state:
+                self.offsets = state["offsets"]
+                self.resources = state["resources"]
+        return self
+
+    @traced("save aggregates", "io")
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmpPath = f"{self.path}.tmp"
+        with open(tmpPath, "w") as file:
+            json.dump({"windowHours": self.windowHours, "offsets": self.offsets, "resources": self.resources}, file, separators=(",", ":"))
+        os.replace(tmpPath, self.path)
+
+    def add(self, event):
+        entry = self.resources.setdefault(event["uid"], {
+            "kind": event["kind"],
+            "namespace": event["namespace"],
+            "name": event["name"],
+            "counters": {},
+            "lastValues": {},
+        })
+        bucket = str(hourBucket(event["timestamp"]))
+        counter = entry["counters"].setdefault(event["code"], {})
+        counter[bucket] = counter.get(bucket, 0) + 1
+        entry["lastValues"][event["code"]] = event["values"]
+
+    def evict(self, now=None):
+        """Drop buckets that have left the window and UIDs with nothing left."""
+        oldest = int((now or datetime.utcnow()).timestamp() // 3600) - self.windowHours
+        for uid in list(self.resources):
+            counters = self.resources[uid]["counters"]
+            for code in list(counters):
+                counters[code] = {bucket: count for bucket, count in counters[code].items() if int(bucket) > oldest}
+                if not counters[code]:
+                    del counters[code]
+                    self.resources[uid]["lastValues"].pop(code, None)
+            if not counters:
+                del self.resources[uid]
+
+    def eventFiles(self, now=None):
+        """Event files that can hold events inside the window, oldest first."""
+        if not os.path.isdir(EVENTS_DIR):
+            return []
+        oldestDate = str(((now or datetime.utcnow()) - timedelta(hours=self.windowHours)).date())
+        return sorted(
+            filename for filename in os.listdir(EVENTS_DIR)
+            if filename.startswith("violations_") and filename.endswith(".jsonl")
+            and filename[len("violations_"):-len(".jsonl")] >= oldestDate
+        )
+
+    def update(self, now=None):
+        """Fold in the lines appended to the event files since the last update, evict old buckets and persist."""
+        oldest = ((now or datetime.utcnow()) - timedelta(hours=self.windowHours)).isoformat()
+        filenames = self.eventFiles(now)
+        added = 0
+        for filename in filenames:
+            events, self.offsets[filename] = readEvents(os.path.join(EVENTS_DIR, filename), self.offsets.get(filename, 0))
+            for event in events:
+                if event["timestamp"] >= oldest:
+                    self.add(event)
+                    added += 1
+        self.offsets = {filename: offset for filename, offset in self.offsets.items() if filename in filenames}
+        self.evict(now)
+        self.save()
+        logger.info(f"Aggregated {added} new violation events; tracking {len(self.resources)} UIDs")
+        return added
+
+    def activeHours(self, uid):
+        """Return {code: number of distinct hours with at least one event} within the window for a UID.
+
+        Unlike event counts, this does not grow with how often the bot polls.
+        """
+        return {code: len(buckets) for code, buckets in self.resources.get(uid, {}).get("counters", {}).items()}
+
+    def counts(self, uid):
+        """Return {code: count} within the window for a UID."""
+        return {code: sum(buckets.values()) for code, buckets in self.resources.get(uid, {}).get("counters", {}).items()}
+
+def loadAggregates():
+    """Load the persisted aggregates and fold in new events."""
+    aggregator = ViolationAggregator().load()
+    aggregator.update()
+    return aggregator
@@ -0,0 +1,70 @@
+import json
+import os
+import threading
+from datetime import datetime
+from utils.config import CLUSTER_NAME, EVENTS_DIR
+from utils.tracing import traced
+from utils.logger import logger
+
+_writeLock = threading.Lock()
+
+def eventFilePath(date):
+    return os.path.join(EVENTS_DIR, f"violations_{date}.jsonl")
+
+def buildViolationEvents(resource, timestamp):
+    """Turn one monitored resource into one event record per violation."""
+    return [
+        {
+            "timestamp": timestamp,
+            "cluster": CLUSTER_NAME,
+            "namespace": resource["namespace"],
+            "kind": resource["kind"],
+            "name": resource["name"],
+            "uid": resource["uid"],
+            "owner": resource.get("owner"),
+            "code": violation["code"],
+            "severity": violation["severity"],
+            "message": violation["message"],
+            "values": violation["values"],
+        }
+        for violation in resource.get("violationDetails", [])
+    ]
+
+@traced("write violation events", "io")
+def writeViolationEvents(resources):
+    """Append the violations of a run to today's JSONL event file."""
+    now = datetime.utcnow()
+    timestamp = now.isoformat()
+    lines = [
+        json.dumps(event, separators=(",", ":"))
+        for resource in resources
+        for event in buildViolationEvents(resource, timestamp)
+    ]
+    if not lines:
+        return 0
+
+    os.makedirs(EVENTS_DIR, exist_ok=True)
+    with _writeLock, open(eventFilePath(now.date()), "a") as eventFile:
+        eventFile.write("\n".join(lines) + "\n")
+    return len(lines)
+
+def readEvents(path, offset=0):
+    """Return (events, offset after the last complete line) for an event file read from `offset`.
+
+    A line that does not decode (e.g., cut short by a crash) is logged and
+    skipped. A final line without a newline may still be being written, so
+    it is left for the next read.
+    """
+    with open(path, "rb") as eventFile:
+        eventFile.seek(offset)
+        data = eventFile.read()
+    complete = data[:data.rfind(b"\n") + 1]
+    events = []
+    for lineNumber, line in enumerate(complete.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            events.append(json.loads(line))
+        except ValueError:
+            logger.warning(f"Skipping undecodable violation event in '{path}' (line {lineNumber} after byte {offset})")
+    return events, offset + len(complete)
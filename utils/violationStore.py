@@ -0,0 +1,196 @@
+import json
+import os
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+from utils.config import VIOLATIONS_DB, LEGACY_VIOLATIONS_FILE
+from utils.tracing import traced
+from utils.logger import logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    uid TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS violations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    uid TEXT NOT NULL,
+    namespace TEXT NOT NULL,
+    type TEXT NOT NULL,
+    timestamp TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS totals (
+    uid TEXT NOT NULL,
+    type TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (uid, type)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_violations_uid ON violations (uid);
+CREATE INDEX IF NOT EXISTS idx_violations_namespace ON violations (namespace);
+CREATE INDEX IF NOT EXISTS idx_violations_type ON violations (type);
+CREATE INDEX IF NOT EXISTS idx_violations_timestamp ON violations (timestamp);
+"""
+
+# Individual violations are only queried for the past week; older rows are
+# dropped as new ones are recorded, while `totals` keeps the all-time counts
+RETENTION = timedelta(weeks=1)
+
+class ViolationStore:
+    """SQLite-backed violation history with weekly and total counts per UID."""
+
+    def __init__(self, path=VIOLATIONS_DB):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with closing(self.connect()) as connection:
+            connection.executescript(SCHEMA)
+
+    def connect(self):
+        # The timeout makes overlapping runs wait for each other's transaction
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    @traced("record violations", "io")
+    def recordViolations(self, records, timestamp=None):
+        """Record violations for many resources in one transaction, dropping rows older than RETENTION.
+
+        `records` is an iterable of (uid, namespace, name, violations).
+        """
+        timestamp = timestamp or datetime.utcnow().isoformat()
+        resourceRows = []
+        violationRows = []
+        totalRows = []
+        for uid, namespace, name, violations in records:
+            if not violations:
+                continue
+            resourceRows.append((uid, namespace, name))
+            for violation in violations:
+                violationRows.append((uid, namespace, violation, timestamp))
+                totalRows.append((uid, violation))
+
+        if not violationRows:
+            return 0
+
+        with closing(self.connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.executemany(
+                    "INSERT INTO resources (uid, namespace, name) VALUES (?, ?, ?) "
+                    "ON CONFLICT(uid) DO UPDATE SET namespace = excluded.namespace, name = excluded.name",
+                    resourceRows,
+                )
+                connection.executemany(
+                    "INSERT INTO violations (uid, namespace, type, timestamp) VALUES (?, ?, ?, ?)",
+                    violationRows,
+                )
+                connection.executemany(
+                    "INSERT INTO totals (uid, type, count) VALUES (?, ?, 1) "
+                    "ON CONFLICT(uid, type) DO UPDATE SET count = count + 1",
+                    totalRows,
+                )
+                connection.execute(
+                    "DELETE FROM violations WHERE timestamp < ?",
+                    ((datetime.utcnow() - RETENTION).isoformat(),),
+                )
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+        return len(violationRows)
+
+    def activeDays(self, uids=None, since=None, until=None):
+        """Return {uid: {type: distinct UTC days with a violation}} between `since` (default one week ago) and `until`.
+
+        Unlike row counts, this does not grow with how often the bot runs.
+        """
+        since = since or datetime.utcnow() - timedelta(weeks=1)
+        query = "SELECT uid, type, COUNT(DISTINCT substr(timestamp, 1, 10)) FROM violations WHERE timestamp >= ?"
+        params = [since.isoformat()]
+        if until is not None:
+            query += " AND timestamp < ?"
+            params.append(until.isoformat())
+        if uids is not None:
+            uids = list(uids)
+            query += f" AND uid IN ({','.join('?' * len(uids))})"
+            params.extend(uids)
+        query += " GROUP BY uid, type"
+        days = {}
+        with closing(self.connect()) as connection:
+            for uid, violationType, count in connection.execute(query, params):
+                days.setdefault(uid, {})[violationType] = count
+        return days
+
+    def totalCounts(self, uid):
+        with closing(self.connect()) as connection:
+            rows = connection.execute("SELECT type, count FROM totals WHERE uid = ?", (uid,))
+            return {violationType: count for violationType, count in rows}
+
+    def countsByNamespace(self, since=None):
+        """Return {namespace: {type: count}} for violations since `since` (default one week ago)."""
+        since = since or datetime.utcnow() - timedelta(weeks=1)
+        counts = {}
+        with closing(self.connect()) as connection:
+            rows = connection.execute(
+                "SELECT namespace, type, COUNT(*) FROM violations WHERE timestamp >= ? GROUP BY namespace, type",
+                (since.isoformat(),),
+            )
+            for namespace, violationType, count in rows:
+                counts.setdefault(namespace, {})[violationType] = count
+        return counts
+
+    def importLegacyJson(self, path=LEGACY_VIOLATIONS_FILE):
+        """One-time import of the old violationsByUid.json file."""
+        if not os.path.exists(path):
+            return 0
+        # Cheap check for the common case; it is repeated inside the write transaction
+        with closing(self.connect()) as connection:
+            if connection.execute("SELECT 1 FROM meta WHERE key = 'legacyJsonImported'").fetchone():
+                return 0
+
+        with open(path, "r") as file:
+            data = json.load(file)
+
+        with closing(self.connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                # Another run may have imported the file while this one was reading it
+                if connection.execute("SELECT 1 FROM meta WHERE key = 'legacyJsonImported'").fetchone():
+                    connection.execute("ROLLBACK")
+                    return 0
+                for uid, entry in data.items():
+                    connection.execute(
+                        "INSERT OR REPLACE INTO resources (uid, namespace, name) VALUES (?, ?, ?)",
+                        (uid, entry["namespace"], entry["name"]),
+                    )
+                    connection.executemany(
+                        "INSERT INTO violations (uid, namespace, type, timestamp) VALUES (?, ?, ?, ?)",
+                        [(uid, entry["namespace"], v["type"], v["timestamp"]) for v in entry.get("violations", [])],
+                    )
+                    connection.executemany(
+                        "INSERT INTO totals (uid, type, count) VALUES (?, ?, ?) "
+                        "ON CONFLICT(uid, type) DO UPDATE SET count = count + excluded.count",
+                        [(uid, violationType, count) for violationType, count in entry.get("totalCounts", {}).items()],
+                    )
+                connection.execute("INSERT INTO meta (key, value) VALUES ('legacyJsonImported', ?)", (datetime.utcnow().isoformat(),))
+                connection.execute("COMMIT")
+            except Exception:
+                connection.execute("ROLLBACK")
+                raise
+
+        logger.info(f"Imported {len(data)} UIDs from legacy violations file '{path}'")
+        return len(data)
+
+_store = None
+
+def getViolationStore():
+    """Return the process-wide store, importing the legacy JSON file on first use."""
+    global _store
+    if _store is None:
+        _store = ViolationStore()
+        _store.importLegacyJson()
+    return _store